@@ -3,6 +3,7 @@
 import sys
 
 from aup.chunking import chunk_by_max_chars, chunk_by_tokens
+from aup.loadtest import LatencyModel, MockProvider, run_load
 from aup.prompts import PromptTemplate
 from aup.retries import with_retry
 from aup.tokens import estimate_cost, estimate_tokens
@@ -93,6 +94,25 @@ def token_demo() -> None:
         print(f"  {model}: ${cost:.4f}")
 
 
+def load_demo() -> None:
+    """Demonstrate load testing against the mock provider."""
+    print("=== Load Test Demo ===\n")
+
+    provider = MockProvider(
+        latency=LatencyModel("lognormal", mean=0.02, spread=0.5),
+        throttle_rate=0.05,
+        seed=42,
+    )
+    trace = [[{"role": "user", "content": f"Question {i}"}] for i in range(200)]
+
+    for mode in ["call", "retry"]:
+        report = run_load(trace, provider, concurrency=16, mode=mode, retries=2, backoff=0.01)
+        print(f"Mode: {mode}")
+        for line in report.format().splitlines():
+            print(f"  {line}")
+        print()
+
+
 def main() -> None:
     """Main CLI entry point."""
     if len(sys.argv) < 2:
@@ -106,6 +126,7 @@ def main() -> None:
         "chunk-demo": chunk_demo,
         "retry-demo": retry_demo,
         "token-demo": token_demo,
+        "load-demo": load_demo,
     }
 
     if command == "--help" or command == "-h":
@@ -133,6 +154,7 @@ def print_help() -> None:
     print("  chunk-demo     Demonstrate text chunking")
     print("  retry-demo     Demonstrate retry logic")
     print("  token-demo     Demonstrate token estimation")
+    print("  load-demo      Demonstrate load testing against the mock provider")
     print("\nOptions:")
     print("  --help, -h     Show this help message")
 
@@ -29,3 +29,15 @@ class TokenEstimationError(AUPError):
     """Error related to token estimation."""
 
     pass
+
+
+class DeadlineExceededError(AUPError):
+    """Error raised when a queued call's deadline passes before it runs."""
+
+    pass
+
+
+class PrefixCacheWarning(UserWarning):
+    """Warning that a template's variable placement prevents prompt-prefix caching."""
+
+    pass
@@ -0,0 +1,18 @@
+"""Local stand-in provider and load-test harness."""
+
+from aup.loadtest.driver import LoadReport, load_trace, percentile, run_load
+from aup.loadtest.mock import LatencyModel, MockProvider, MockProviderError
+from aup.loadtest.server import MockHTTPServer, http_provider, http_stream_provider
+
+__all__ = [
+    "LatencyModel",
+    "MockProvider",
+    "MockProviderError",
+    "MockHTTPServer",
+    "http_provider",
+    "http_stream_provider",
+    "LoadReport",
+    "load_trace",
+    "percentile",
+    "run_load",
+]
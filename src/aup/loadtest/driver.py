@@ -0,0 +1,206 @@
+"""Load driver replaying request traces through AUP call helpers."""
+
+import json
+import math
+import threading
+import time
+from collections import Counter
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from aup.models.byo_client import call_with_client
+from aup.models.interfaces import ProviderCall
+from aup.retries.retry import fallback_models, with_retry
+
+MODES = ("call", "retry", "fallback")
+
+
+def load_trace(path: str | Path) -> list[list[dict[str, str]]]:
+    """
+    Read a JSONL request trace.
+
+    Each non-empty line is either a message list or an object with a
+    ``"messages"`` key.
+
+    Args:
+        path: Path of the JSONL file
+
+    Returns:
+        List of message lists
+    """
+    requests: list[list[dict[str, str]]] = []
+    with Path(path).open(encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            messages = record["messages"] if isinstance(record, dict) else record
+            if not isinstance(messages, list):
+                raise ValueError(f"Line {line_no}: expected a message list")
+            requests.append(messages)
+    return requests
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    """
+    Nearest-rank percentile of an already sorted list.
+
+    Args:
+        sorted_values: Values in ascending order
+        q: Percentile in [0, 100]
+
+    Returns:
+        The percentile value (0.0 for an empty list)
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+@dataclass(frozen=True)
+class LoadReport:
+    """
+    Results of a load run. Latencies are in seconds.
+
+    Attributes:
+        requests: Requests replayed
+        successes: Requests that returned a response
+        failures: Requests that raised
+        duration: Wall-clock time of the run
+        throughput: Successful requests per second
+        p50: Median latency
+        p95: 95th percentile latency
+        p99: 99th percentile latency
+        mean: Mean latency
+        errors: Failure counts by exception type name
+    """
+
+    requests: int
+    successes: int
+    failures: int
+    duration: float
+    throughput: float
+    p50: float
+    p95: float
+    p99: float
+    mean: float
+    errors: dict[str, int] = field(default_factory=dict)
+
+    def format(self) -> str:
+        """Human-readable one-block summary."""
+        lines = [
+            f"requests:   {self.requests} ({self.successes} ok, {self.failures} failed)",
+            f"duration:   {self.duration:.3f}s",
+            f"throughput: {self.throughput:.1f} req/s",
+            f"latency:    p50 {self.p50 * 1000:.1f}ms  p95 {self.p95 * 1000:.1f}ms  "
+            f"p99 {self.p99 * 1000:.1f}ms  mean {self.mean * 1000:.1f}ms",
+        ]
+        if self.errors:
+            lines.append(
+                "errors:     " + ", ".join(f"{name}={count}" for name, count in self.errors.items())
+            )
+        return "\n".join(lines)
+
+
+def run_load(
+    trace: str | Path | Iterable[list[dict[str, str]]],
+    call: ProviderCall | None = None,
+    concurrency: int = 8,
+    mode: str = "call",
+    retries: int = 2,
+    backoff: float = 0.1,
+    models: dict[str, ProviderCall] | None = None,
+) -> LoadReport:
+    """
+    Replay a request trace at a fixed concurrency and measure latency.
+
+    Modes:
+        - ``"call"``: each request goes through call_with_client(call, messages)
+        - ``"retry"``: the same, wrapped in with_retry(retries, backoff)
+        - ``"fallback"``: fallback_models over ``models`` (name -> ProviderCall),
+          in insertion order
+
+    Latency is measured per request, including retries and fallbacks.
+
+    Args:
+        trace: JSONL trace path (see load_trace) or an iterable of message lists
+        call: ProviderCall under test (required for "call" and "retry")
+        concurrency: Number of requests in flight at once
+        mode: One of "call", "retry" or "fallback"
+        retries: Retries per request ("retry") or per model ("fallback")
+        backoff: Base backoff in seconds for retries
+        models: Model name to ProviderCall mapping (required for "fallback")
+
+    Returns:
+        LoadReport with throughput and latency percentiles
+
+    Example:
+        >>> provider = MockProvider(throttle_rate=0.05, seed=7)
+        >>> report = run_load("trace.jsonl", provider, concurrency=32, mode="retry")
+        >>> print(report.format())
+    """
+    if mode not in MODES:
+        raise ValueError(f"mode must be one of {', '.join(MODES)}")
+    if mode == "fallback" and not models:
+        raise ValueError("models is required for fallback mode")
+    if mode != "fallback" and call is None:
+        raise ValueError(f"call is required for {mode} mode")
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+
+    requests = load_trace(trace) if isinstance(trace, (str, Path)) else list(trace)
+
+    def execute(messages: list[dict[str, str]]) -> str:
+        if mode == "fallback":
+            assert models is not None
+            return fallback_models(
+                list(models),
+                lambda model: call_with_client(models[model], messages),
+                retries_per_model=retries,
+                backoff=backoff,
+            )
+        assert call is not None
+        if mode == "retry":
+            return with_retry(
+                lambda: call_with_client(call, messages), retries=retries, backoff=backoff
+            )
+        return call_with_client(call, messages)
+
+    latencies: list[float] = []
+    errors: Counter[str] = Counter()
+    lock = threading.Lock()
+
+    def timed(messages: list[dict[str, str]]) -> None:
+        start = time.perf_counter()
+        try:
+            execute(messages)
+        except Exception as e:
+            with lock:
+                errors[type(e).__name__] += 1
+            return
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies.append(elapsed)
+
+    run_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="aup-load") as pool:
+        list(pool.map(timed, requests))
+    duration = time.perf_counter() - run_start
+
+    latencies.sort()
+    successes = len(latencies)
+    return LoadReport(
+        requests=len(requests),
+        successes=successes,
+        failures=len(requests) - successes,
+        duration=duration,
+        throughput=successes / duration if duration > 0 else 0.0,
+        p50=percentile(latencies, 50),
+        p95=percentile(latencies, 95),
+        p99=percentile(latencies, 99),
+        mean=sum(latencies) / successes if successes else 0.0,
+        errors=dict(errors),
+    )
@@ -0,0 +1,173 @@
+"""In-process mock provider with configurable latency and failures."""
+
+import asyncio
+import random
+import threading
+import time
+from collections.abc import AsyncIterator, Callable, Iterator
+from dataclasses import dataclass
+
+from aup.errors import AUPError
+
+
+class MockProviderError(AUPError):
+    """Injected provider failure, carrying the HTTP status it stands for."""
+
+    def __init__(self, message: str, status_code: int = 500):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+@dataclass(frozen=True)
+class LatencyModel:
+    """
+    Distribution of simulated response latency, in seconds.
+
+    Attributes:
+        distribution: One of "fixed", "uniform", "normal" or "lognormal"
+        mean: Mean latency
+        spread: Half-width for "uniform", standard deviation for "normal",
+            sigma of the underlying normal for "lognormal"; ignored for "fixed"
+    """
+
+    distribution: str = "lognormal"
+    mean: float = 0.05
+    spread: float = 0.5
+
+    def sample(self, rng: random.Random) -> float:
+        """Draw one latency (never negative)."""
+        if self.distribution == "fixed":
+            value = self.mean
+        elif self.distribution == "uniform":
+            value = rng.uniform(self.mean - self.spread, self.mean + self.spread)
+        elif self.distribution == "normal":
+            value = rng.gauss(self.mean, self.spread)
+        elif self.distribution == "lognormal":
+            # Parameterized so the distribution's mean equals self.mean
+            mu = -(self.spread**2) / 2
+            value = self.mean * rng.lognormvariate(mu, self.spread)
+        else:
+            raise ValueError(f"Unknown latency distribution: {self.distribution}")
+        return max(0.0, value)
+
+
+def _echo(messages: list[dict[str, str]]) -> str:
+    content = messages[-1].get("content", "") if messages else ""
+    return f"Echo: {content}"
+
+
+class MockProvider:
+    """
+    Stand-in provider for offline load tests.
+
+    Each call sleeps for a latency drawn from ``latency``, then fails with a
+    429 (probability ``throttle_rate``) or 500 (probability ``error_rate``)
+    MockProviderError, or returns ``respond(messages)``. With a fixed ``seed``
+    the sequence of latencies and failures is reproducible.
+
+    The instance is a ProviderCall; ``stream`` and the async methods offer the
+    streaming and async protocols over the same behavior.
+
+    Example:
+        >>> provider = MockProvider(
+        ...     latency=LatencyModel("lognormal", mean=0.2),
+        ...     throttle_rate=0.05,
+        ...     seed=42,
+        ... )
+        >>> result = call_with_client(provider, messages)
+    """
+
+    def __init__(
+        self,
+        latency: LatencyModel | None = None,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        respond: Callable[[list[dict[str, str]]], str] = _echo,
+        chunk_size: int = 4,
+        inter_chunk_latency: float = 0.0,
+        seed: int | None = None,
+    ):
+        """
+        Initialize the mock provider.
+
+        Args:
+            latency: Latency model (defaults to LatencyModel())
+            error_rate: Probability of a 500 error per call
+            throttle_rate: Probability of a 429 error per call
+            respond: Function producing the response text
+            chunk_size: Characters per delta when streaming
+            inter_chunk_latency: Delay between streamed deltas, in seconds
+            seed: Random seed for reproducible latencies and failures
+        """
+        if not 0 <= error_rate + throttle_rate <= 1:
+            raise ValueError("error_rate + throttle_rate must be between 0 and 1")
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+
+        self.latency = latency or LatencyModel()
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.respond = respond
+        self.chunk_size = chunk_size
+        self.inter_chunk_latency = inter_chunk_latency
+
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+        self.throttles = 0
+
+    def _plan(self) -> tuple[float, MockProviderError | None]:
+        """Draw this call's latency and injected failure."""
+        with self._lock:
+            self.calls += 1
+            delay = self.latency.sample(self._rng)
+            roll = self._rng.random()
+            if roll < self.throttle_rate:
+                self.throttles += 1
+                return delay, MockProviderError("Rate limit exceeded", status_code=429)
+            if roll < self.throttle_rate + self.error_rate:
+                self.errors += 1
+                return delay, MockProviderError("Internal server error", status_code=500)
+            return delay, None
+
+    def _chunks(self, text: str) -> list[str]:
+        return [text[i : i + self.chunk_size] for i in range(0, len(text), self.chunk_size)]
+
+    def __call__(self, messages: list[dict[str, str]]) -> str:
+        """Simulate a provider call."""
+        delay, error = self._plan()
+        time.sleep(delay)
+        if error is not None:
+            raise error
+        return self.respond(messages)
+
+    def stream(self, messages: list[dict[str, str]]) -> Iterator[str]:
+        """Simulate a streaming call; the latency applies to the first delta."""
+        delay, error = self._plan()
+        time.sleep(delay)
+        if error is not None:
+            raise error
+        for i, chunk in enumerate(self._chunks(self.respond(messages))):
+            if i and self.inter_chunk_latency:
+                time.sleep(self.inter_chunk_latency)
+            yield chunk
+
+    async def acall(self, messages: list[dict[str, str]]) -> str:
+        """Async counterpart of calling the provider."""
+        delay, error = self._plan()
+        await asyncio.sleep(delay)
+        if error is not None:
+            raise error
+        return self.respond(messages)
+
+    async def astream(self, messages: list[dict[str, str]]) -> AsyncIterator[str]:
+        """Async counterpart of stream()."""
+        delay, error = self._plan()
+        await asyncio.sleep(delay)
+        if error is not None:
+            raise error
+        for i, chunk in enumerate(self._chunks(self.respond(messages))):
+            if i and self.inter_chunk_latency:
+                await asyncio.sleep(self.inter_chunk_latency)
+            yield chunk
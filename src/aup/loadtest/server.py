@@ -0,0 +1,180 @@
+"""Optional localhost HTTP front-end for MockProvider."""
+
+import json
+import threading
+import urllib.error
+import urllib.request
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+from aup.loadtest.mock import MockProvider, MockProviderError
+from aup.models.interfaces import ProviderCall, StreamingProviderCall
+
+
+def _make_handler(provider: MockProvider) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+        def _send_json(self, status: int, body: dict[str, Any]) -> None:
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_POST(self) -> None:
+            length = int(self.headers.get("Content-Length", 0))
+            try:
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                messages = payload["messages"]
+            except (ValueError, KeyError):
+                self._send_json(400, {"error": "Body must be JSON with a 'messages' list"})
+                return
+
+            if not payload.get("stream"):
+                try:
+                    content = provider(messages)
+                except MockProviderError as e:
+                    self._send_json(e.status_code, {"error": str(e)})
+                    return
+                self._send_json(200, {"content": content})
+                return
+
+            # Streaming: newline-delimited JSON deltas, connection closed at the end
+            deltas = provider.stream(messages)
+            try:
+                first = next(deltas, None)
+            except MockProviderError as e:
+                self._send_json(e.status_code, {"error": str(e)})
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.end_headers()
+            if first is not None:
+                self._write_delta(first)
+                for delta in deltas:
+                    self._write_delta(delta)
+
+        def _write_delta(self, delta: str) -> None:
+            self.wfile.write(json.dumps({"delta": delta}).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+    return Handler
+
+
+class MockHTTPServer:
+    """
+    Serves a MockProvider on localhost.
+
+    ``POST /`` with a JSON body ``{"messages": [...], "stream": false}``
+    returns ``{"content": ...}``; with ``"stream": true`` the response is
+    newline-delimited JSON ``{"delta": ...}`` objects. Injected failures are
+    returned with their status code (429 or 500).
+
+    Example:
+        >>> with MockHTTPServer(MockProvider(seed=1)) as server:
+        ...     call = http_provider(server.url)
+        ...     result = call_with_client(call, messages)
+    """
+
+    def __init__(self, provider: MockProvider, host: str = "127.0.0.1", port: int = 0):
+        """
+        Bind the server (port 0 picks a free port).
+
+        Args:
+            provider: MockProvider answering requests
+            host: Interface to bind
+            port: Port to bind
+        """
+        self.provider = provider
+        self._server = ThreadingHTTPServer((host, port), _make_handler(provider))
+        self._server.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        """Base URL of the server."""
+        host, port = self._server.socket.getsockname()[:2]
+        return f"http://{host}:{port}/"
+
+    def start(self) -> "MockHTTPServer":
+        """Serve requests on a background thread."""
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="aup-mock-http", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving and release the port."""
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "MockHTTPServer":
+        return self.start()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.stop()
+
+
+def _post(url: str, body: dict[str, Any], timeout: float) -> Any:
+    request = urllib.request.Request(
+        url,
+        data=json.dumps(body).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+    try:
+        return urllib.request.urlopen(request, timeout=timeout)
+    except urllib.error.HTTPError as e:
+        try:
+            message = json.loads(e.read()).get("error", e.reason)
+        except ValueError:
+            message = e.reason
+        raise MockProviderError(str(message), status_code=e.code) from None
+
+
+def http_provider(url: str, timeout: float = 30.0) -> ProviderCall:
+    """
+    ProviderCall talking to a MockHTTPServer.
+
+    Args:
+        url: Server URL
+        timeout: Socket timeout in seconds
+
+    Returns:
+        A ProviderCall raising MockProviderError on 4xx/5xx responses
+    """
+
+    def call(messages: list[dict[str, str]]) -> str:
+        with _post(url, {"messages": messages}, timeout) as response:
+            content: str = json.loads(response.read())["content"]
+            return content
+
+    return call
+
+
+def http_stream_provider(url: str, timeout: float = 30.0) -> StreamingProviderCall:
+    """
+    StreamingProviderCall talking to a MockHTTPServer.
+
+    Args:
+        url: Server URL
+        timeout: Socket timeout in seconds
+
+    Returns:
+        A StreamingProviderCall yielding deltas as they arrive
+    """
+
+    def stream(messages: list[dict[str, str]]) -> Iterator[str]:
+        with _post(url, {"messages": messages, "stream": True}, timeout) as response:
+            for line in response:
+                if line.strip():
+                    yield json.loads(line)["delta"]
+
+    return stream
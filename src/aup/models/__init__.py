@@ -1,6 +1,75 @@
 """Provider-agnostic model interfaces and BYO client patterns."""
 
-from aup.models.byo_client import BYOClient, call_with_client
-from aup.models.interfaces import ProviderCall
+from aup.models.adapters import LoopThread, async_to_sync, sync_to_async
+from aup.models.batching import BatchCall, MicroBatcher
+from aup.models.byo_client import BYOClient, call_with_client, call_with_client_async
+from aup.models.cache import (
+    CachedProviderCall,
+    CacheStats,
+    ResponseCache,
+    SQLiteCacheStore,
+    cache_key,
+)
+from aup.models.coalesce import AsyncSingleFlight, CoalesceStats, SingleFlight
+from aup.models.interfaces import (
+    AsyncProviderCall,
+    AsyncStreamingProviderCall,
+    ProviderCall,
+    StreamingProviderCall,
+)
+from aup.models.pool import ClientPool, PoolStats
+from aup.models.scheduler import DEFAULT_WEIGHTS, FairScheduler, SchedulerStats
+from aup.models.semantic_cache import (
+    Embedder,
+    SemanticCache,
+    SemanticCachedCall,
+    SemanticCacheStats,
+)
+from aup.models.streaming import (
+    StreamTimings,
+    acall_to_stream,
+    astream_to_call,
+    call_to_stream,
+    instrument_stream,
+    instrument_stream_async,
+    stream_to_call,
+)
 
-__all__ = ["ProviderCall", "BYOClient", "call_with_client"]
+__all__ = [
+    "ProviderCall",
+    "AsyncProviderCall",
+    "BYOClient",
+    "call_with_client",
+    "call_with_client_async",
+    "sync_to_async",
+    "async_to_sync",
+    "LoopThread",
+    "StreamingProviderCall",
+    "AsyncStreamingProviderCall",
+    "StreamTimings",
+    "instrument_stream",
+    "instrument_stream_async",
+    "stream_to_call",
+    "astream_to_call",
+    "call_to_stream",
+    "acall_to_stream",
+    "cache_key",
+    "CacheStats",
+    "ResponseCache",
+    "SQLiteCacheStore",
+    "CachedProviderCall",
+    "SingleFlight",
+    "AsyncSingleFlight",
+    "CoalesceStats",
+    "BatchCall",
+    "MicroBatcher",
+    "Embedder",
+    "SemanticCache",
+    "SemanticCacheStats",
+    "SemanticCachedCall",
+    "DEFAULT_WEIGHTS",
+    "FairScheduler",
+    "SchedulerStats",
+    "ClientPool",
+    "PoolStats",
+]
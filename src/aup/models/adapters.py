@@ -0,0 +1,151 @@
+"""Adapters between synchronous and asynchronous provider calls."""
+
+import asyncio
+import threading
+from collections.abc import Coroutine
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, TypeVar
+
+from aup.models.interfaces import AsyncProviderCall, ProviderCall
+
+T = TypeVar("T")
+
+
+class LoopThread:
+    """
+    An asyncio event loop running forever in a dedicated daemon thread.
+
+    Lets synchronous code submit coroutines and wait for their results
+    without starting a new event loop per call.
+
+    Example:
+        >>> loop_thread = LoopThread()
+        >>> result = loop_thread.run(async_call(messages))
+        >>> loop_thread.stop()
+    """
+
+    def __init__(self, name: str = "aup-loop"):
+        """
+        Start the loop thread.
+
+        Args:
+            name: Name of the thread
+        """
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def run(self, coro: Coroutine[Any, Any, T], timeout: float | None = None) -> T:
+        """
+        Run a coroutine on the loop and block until it finishes.
+
+        Args:
+            coro: Coroutine to run
+            timeout: Maximum time to wait in seconds (None waits forever)
+
+        Returns:
+            Result of the coroutine
+
+        Raises:
+            RuntimeError: If called from the loop thread itself (it would deadlock)
+            TimeoutError: If the coroutine did not finish within timeout
+        """
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("LoopThread.run cannot be called from its own loop thread")
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        try:
+            return future.result(timeout)
+        except TimeoutError:
+            future.cancel()
+            raise
+
+    def stop(self) -> None:
+        """Stop the loop and wait for the thread to exit."""
+        if self.loop.is_closed():
+            return
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
+
+
+_default_loop_thread: LoopThread | None = None
+_default_loop_lock = threading.Lock()
+
+
+def _get_default_loop_thread() -> LoopThread:
+    global _default_loop_thread
+    with _default_loop_lock:
+        if _default_loop_thread is None:
+            _default_loop_thread = LoopThread()
+        return _default_loop_thread
+
+
+def sync_to_async(
+    call: ProviderCall,
+    max_workers: int = 32,
+    executor: Executor | None = None,
+) -> AsyncProviderCall:
+    """
+    Wrap a synchronous provider call so it can be awaited.
+
+    Calls run on a bounded thread pool, so at most ``max_workers`` blocking
+    calls are in flight; further awaits queue until a worker is free.
+
+    Args:
+        call: Synchronous ProviderCall
+        max_workers: Size of the thread pool created when no executor is given
+        executor: Optional executor to run calls on (its size is the bound)
+
+    Returns:
+        An AsyncProviderCall
+
+    Example:
+        >>> async_call = sync_to_async(openai_call, max_workers=16)
+        >>> result = await async_call(messages)
+    """
+    if executor is None:
+        executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="aup-sync")
+    pool = executor
+
+    async def async_call(messages: list[dict[str, str]]) -> str:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(pool, call, messages)
+
+    return async_call
+
+
+def async_to_sync(
+    call: AsyncProviderCall,
+    loop_thread: LoopThread | None = None,
+    timeout: float | None = None,
+) -> ProviderCall:
+    """
+    Wrap an async provider call so it can be called synchronously.
+
+    Coroutines run on a dedicated event loop thread (shared across adapters
+    unless ``loop_thread`` is given), so any number of threads can use the
+    wrapped call concurrently while the async client keeps a single loop.
+
+    Args:
+        call: AsyncProviderCall
+        loop_thread: Optional LoopThread to run on
+        timeout: Maximum time per call in seconds (None waits forever)
+
+    Returns:
+        A synchronous ProviderCall
+
+    Example:
+        >>> sync_call = async_to_sync(async_openai_call)
+        >>> result = call_with_client(sync_call, messages)
+    """
+
+    def sync_call(messages: list[dict[str, str]]) -> str:
+        runner = loop_thread or _get_default_loop_thread()
+        return runner.run(call(messages), timeout)
+
+    return sync_call
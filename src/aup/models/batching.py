@@ -0,0 +1,223 @@
+"""Micro-batching dispatcher for batch-capable provider endpoints."""
+
+import asyncio
+import queue
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any
+
+from aup.tokens.estimate import estimate_tokens
+
+# A batch callable receives several message lists and returns one response per list
+BatchCall = Callable[[list[list[dict[str, str]]]], list[str]]
+
+_STOP = object()
+
+
+class _Request:
+    """One caller's messages and the future its response is delivered to."""
+
+    __slots__ = ("messages", "tokens", "future")
+
+    def __init__(self, messages: list[dict[str, str]], tokens: int):
+        self.messages = messages
+        self.tokens = tokens
+        self.future: Future[str] = Future()
+
+
+class MicroBatcher:
+    """
+    Collects individual requests into batches for a batch-capable endpoint.
+
+    A dispatcher thread starts a batch with the first waiting request and
+    keeps adding requests until the batch holds ``max_batch_size`` requests,
+    would exceed ``max_batch_tokens`` estimated tokens, or ``max_wait``
+    seconds have passed. The batch is then handed to ``batch_call`` and each
+    response is routed back to the future of the request it belongs to.
+
+    The batcher is itself a ProviderCall, so it can be used anywhere a
+    single-request client is expected.
+
+    Example:
+        >>> def embed_batch(batch):
+        ...     response = client.embeddings.create(
+        ...         model="text-embedding-3-small",
+        ...         input=[messages[-1]["content"] for messages in batch],
+        ...     )
+        ...     return [json.dumps(item.embedding) for item in response.data]
+        ...
+        >>> with MicroBatcher(embed_batch, max_batch_size=64, max_wait=0.005) as batcher:
+        ...     result = call_with_client(batcher, messages)
+    """
+
+    def __init__(
+        self,
+        batch_call: BatchCall,
+        max_batch_size: int = 32,
+        max_wait: float = 0.01,
+        max_batch_tokens: int | None = None,
+        max_concurrent_batches: int = 4,
+        chars_per_token: float = 4.0,
+    ):
+        """
+        Initialize the batcher and start its dispatcher thread.
+
+        Args:
+            batch_call: Callable taking a list of message lists and returning one
+                response per list, in the same order
+            max_batch_size: Maximum requests per batch
+            max_wait: Maximum seconds the first request of a batch waits for company
+            max_batch_tokens: Maximum estimated tokens per batch (None for no limit).
+                A single request above the limit is still sent, alone.
+            max_concurrent_batches: Batches that may be in flight at once
+            chars_per_token: Characters per token used when estimating request size
+
+        Raises:
+            ValueError: If a size or wait limit is out of range
+        """
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        if max_wait < 0:
+            raise ValueError("max_wait must be non-negative")
+        if max_concurrent_batches < 1:
+            raise ValueError("max_concurrent_batches must be at least 1")
+
+        self.batch_call = batch_call
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.max_batch_tokens = max_batch_tokens
+        self.chars_per_token = chars_per_token
+
+        self._queue: queue.Queue[Any] = queue.Queue()
+        self._closed = False
+        self._close_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrent_batches, thread_name_prefix="aup-batch"
+        )
+        self._thread = threading.Thread(target=self._dispatch_loop, name="aup-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, messages: list[dict[str, str]]) -> "Future[str]":
+        """
+        Queue a request for the next batch.
+
+        Args:
+            messages: List of message dictionaries
+
+        Returns:
+            Future resolving to the response text
+
+        Raises:
+            RuntimeError: If the batcher has been closed
+        """
+        tokens = 0
+        if self.max_batch_tokens is not None:
+            text = "".join(message.get("content", "") for message in messages)
+            tokens = estimate_tokens(text, self.chars_per_token)
+
+        request = _Request(messages, tokens)
+        with self._close_lock:
+            if self._closed:
+                raise RuntimeError("MicroBatcher is closed")
+            self._queue.put(request)
+        return request.future
+
+    def __call__(self, messages: list[dict[str, str]]) -> str:
+        """Submit a request and block until its batch returns."""
+        return self.submit(messages).result()
+
+    async def acall(self, messages: list[dict[str, str]]) -> str:
+        """Submit a request and await its response without blocking the event loop."""
+        return await asyncio.wrap_future(self.submit(messages))
+
+    def close(self, wait: bool = True) -> None:
+        """
+        Stop accepting requests; already queued requests are still dispatched.
+
+        Args:
+            wait: If True, block until every queued request has been answered;
+                otherwise return at once and let them finish in the background
+        """
+        with self._close_lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(_STOP)
+        if wait:
+            # The dispatcher shuts the executor down once the queue is drained
+            self._thread.join()
+            self._executor.shutdown(wait=True)
+
+    def __enter__(self) -> "MicroBatcher":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def _dispatch_loop(self) -> None:
+        try:
+            self._dispatch()
+        finally:
+            self._executor.shutdown(wait=False)
+
+    def _dispatch(self) -> None:
+        carry: _Request | None = None
+        stopping = False
+
+        while not stopping or carry is not None:
+            if carry is not None:
+                first, carry = carry, None
+            else:
+                item = self._queue.get()
+                if item is _STOP:
+                    return
+                first = item
+
+            batch = [first]
+            tokens = first.tokens
+            deadline = time.monotonic() + self.max_wait
+
+            while len(batch) < self.max_batch_size and not stopping:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = (
+                        self._queue.get(timeout=remaining)
+                        if remaining > 0
+                        else self._queue.get_nowait()
+                    )
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                if (
+                    self.max_batch_tokens is not None
+                    and tokens + item.tokens > self.max_batch_tokens
+                ):
+                    carry = item
+                    break
+                batch.append(item)
+                tokens += item.tokens
+
+            self._executor.submit(self._run_batch, batch)
+
+    def _run_batch(self, batch: list[_Request]) -> None:
+        live = [request for request in batch if request.future.set_running_or_notify_cancel()]
+        if not live:
+            return
+
+        try:
+            responses = self.batch_call([request.messages for request in live])
+            if len(responses) != len(live):
+                raise ValueError(
+                    f"batch_call returned {len(responses)} responses for {len(live)} requests"
+                )
+        except Exception as e:
+            for request in live:
+                request.future.set_exception(e)
+            return
+
+        for request, response in zip(live, responses, strict=True):
+            request.future.set_result(response)
@@ -9,7 +9,7 @@ AUP does not include provider SDKs. Users bring their own clients and API keys.
 
 from typing import Callable
 
-from aup.models.interfaces import ProviderCall
+from aup.models.interfaces import AsyncProviderCall, ProviderCall
 
 # Type alias for clarity
 BYOClient = ProviderCall
@@ -47,6 +47,33 @@ def call_with_client(
     return client_callable(messages)
 
 
+async def call_with_client_async(
+    client_callable: AsyncProviderCall,
+    messages: list[dict[str, str]],
+) -> str:
+    """
+    Call an async provider client with messages (simple wrapper).
+
+    Args:
+        client_callable: A callable that matches AsyncProviderCall protocol
+        messages: List of message dictionaries
+
+    Returns:
+        Generated text response
+
+    Example:
+        >>> async def openai_call(messages):
+        ...     response = await async_openai_client.chat.completions.create(
+        ...         model="gpt-4",
+        ...         messages=messages
+        ...     )
+        ...     return response.choices[0].message.content
+        ...
+        >>> result = await call_with_client_async(openai_call, messages)
+    """
+    return await client_callable(messages)
+
+
 # Example implementations (commented out - users implement with their SDKs)
 """
 # Example 1: OpenAI (user installs openai package)
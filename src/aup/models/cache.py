@@ -0,0 +1,380 @@
+"""Exact-match response caching for provider calls."""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from aup.models.interfaces import ProviderCall
+
+
+def cache_key(
+    messages: list[dict[str, str]],
+    params: Mapping[str, Any] | None = None,
+) -> str:
+    """
+    Compute a canonical hash for a request.
+
+    Messages and params are serialized as JSON with sorted keys and no
+    insignificant whitespace, so equal requests always hash the same
+    regardless of dict ordering.
+
+    Args:
+        messages: List of message dictionaries
+        params: Model parameters that affect the response (model, temperature, ...)
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    payload = json.dumps(
+        {"messages": messages, "params": params or {}},
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    """
+    Counters for a ResponseCache.
+
+    Attributes:
+        hits: Lookups answered from memory or the persistent store
+        store_hits: Subset of hits answered by the persistent store
+        misses: Lookups that found nothing
+        evictions: Entries evicted from memory for space
+        expirations: Entries dropped because their TTL elapsed
+        entries: Entries currently held in memory
+        size_bytes: UTF-8 size of the responses held in memory
+    """
+
+    hits: int
+    store_hits: int
+    misses: int
+    evictions: int
+    expirations: int
+    entries: int
+    size_bytes: int
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups that were hits."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class SQLiteCacheStore:
+    """
+    Persistent response store backed by a sqlite database file.
+
+    Several processes can share one file; the database runs in WAL mode and
+    each thread gets its own connection. Expiry times are stored as wall-clock
+    timestamps so every process agrees on them.
+
+    Example:
+        >>> store = SQLiteCacheStore("cache/responses.sqlite3")
+        >>> cache = ResponseCache(max_entries=10_000, ttl=3600, store=store)
+    """
+
+    def __init__(self, path: str | Path, timeout: float = 30.0):
+        """
+        Open (and create if needed) the store.
+
+        Args:
+            path: Path of the sqlite database file
+            timeout: Seconds to wait for locks held by other processes
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.timeout = timeout
+        self._local = threading.local()
+
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL)"
+        )
+        conn.commit()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout)
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> tuple[str, float | None] | None:
+        """
+        Look up a response.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Tuple of (response, expiry timestamp or None), or None if absent or expired
+        """
+        row = (
+            self._connection()
+            .execute("SELECT value, expires_at FROM responses WHERE key = ?", (key,))
+            .fetchone()
+        )
+        if row is None:
+            return None
+        value, expires_at = row
+        if expires_at is not None and expires_at <= time.time():
+            self.delete(key)
+            return None
+        return value, expires_at
+
+    def set(self, key: str, value: str, ttl: float | None = None) -> None:
+        """
+        Store a response.
+
+        Args:
+            key: Cache key
+            value: Response text
+            ttl: Time to live in seconds (None never expires)
+        """
+        expires_at = None if ttl is None else time.time() + ttl
+        conn = self._connection()
+        conn.execute(
+            "INSERT OR REPLACE INTO responses (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, value, expires_at),
+        )
+        conn.commit()
+
+    def delete(self, key: str) -> None:
+        """Remove a response."""
+        conn = self._connection()
+        conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+        conn.commit()
+
+    def clear(self) -> None:
+        """Remove every response."""
+        conn = self._connection()
+        conn.execute("DELETE FROM responses")
+        conn.commit()
+
+    def purge_expired(self) -> int:
+        """
+        Delete expired responses.
+
+        Returns:
+            Number of responses deleted
+        """
+        conn = self._connection()
+        cursor = conn.execute(
+            "DELETE FROM responses WHERE expires_at IS NOT NULL AND expires_at <= ?",
+            (time.time(),),
+        )
+        conn.commit()
+        return cursor.rowcount
+
+    def close(self) -> None:
+        """Close this thread's connection."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+class ResponseCache:
+    """
+    In-memory LRU response cache with TTL and size limits.
+
+    Optionally backed by a SQLiteCacheStore: misses in memory fall through
+    to the store, store hits are promoted into memory, and new responses are
+    written to both.
+
+    Example:
+        >>> cache = ResponseCache(max_entries=1000, max_bytes=50_000_000, ttl=600)
+        >>> cached = CachedProviderCall(openai_call, cache, params={"model": "gpt-4"})
+    """
+
+    def __init__(
+        self,
+        max_entries: int | None = 1024,
+        max_bytes: int | None = None,
+        ttl: float | None = None,
+        store: SQLiteCacheStore | None = None,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of responses held in memory (None for no limit)
+            max_bytes: Maximum total UTF-8 size of responses held in memory (None for no limit)
+            ttl: Time to live in seconds for new entries (None never expires)
+            store: Optional persistent store shared with other processes
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.store = store
+
+        self._lock = threading.Lock()
+        # key -> (value, monotonic expiry or None, size in bytes)
+        self._entries: OrderedDict[str, tuple[str, float | None, int]] = OrderedDict()
+        self._size = 0
+        self._hits = 0
+        self._store_hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    def get(self, key: str) -> str | None:
+        """
+        Look up a response.
+
+        Args:
+            key: Cache key (see cache_key)
+
+        Returns:
+            Cached response, or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at, size = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return value
+                del self._entries[key]
+                self._size -= size
+                self._expirations += 1
+
+        if self.store is not None:
+            found = self.store.get(key)
+            if found is not None:
+                value, wall_expiry = found
+                remaining = None if wall_expiry is None else wall_expiry - time.time()
+                with self._lock:
+                    self._insert(key, value, remaining)
+                    self._hits += 1
+                    self._store_hits += 1
+                return value
+
+        with self._lock:
+            self._misses += 1
+        return None
+
+    def set(self, key: str, value: str) -> None:
+        """
+        Store a response.
+
+        Args:
+            key: Cache key (see cache_key)
+            value: Response text
+        """
+        with self._lock:
+            self._insert(key, value, self.ttl)
+        if self.store is not None:
+            self.store.set(key, value, self.ttl)
+
+    def _insert(self, key: str, value: str, ttl: float | None) -> None:
+        """Insert into memory and evict to fit the limits (lock must be held)."""
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._size -= old[2]
+
+        size = len(value.encode("utf-8"))
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        expires_at = None if ttl is None else time.monotonic() + ttl
+        self._entries[key] = (value, expires_at, size)
+        self._size += size
+
+        while (self.max_entries is not None and len(self._entries) > self.max_entries) or (
+            self.max_bytes is not None and self._size > self.max_bytes
+        ):
+            _, (_, _, evicted_size) = self._entries.popitem(last=False)
+            self._size -= evicted_size
+            self._evictions += 1
+
+    def clear(self) -> None:
+        """Remove every entry from memory and from the persistent store."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+        if self.store is not None:
+            self.store.clear()
+
+    def stats(self) -> CacheStats:
+        """Return a snapshot of the cache counters."""
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                store_hits=self._store_hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                expirations=self._expirations,
+                entries=len(self._entries),
+                size_bytes=self._size,
+            )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class CachedProviderCall:
+    """
+    ProviderCall wrapper that answers repeated requests from a ResponseCache.
+
+    Requests are keyed on the messages plus ``params``; pass every model
+    parameter that changes the response (model name, temperature, ...) so
+    requests with different settings never share an entry.
+
+    Set ``bypass`` to True to skip the cache entirely (no reads, no writes),
+    e.g. while debugging or for requests that must be fresh.
+
+    Example:
+        >>> cached = CachedProviderCall(openai_call, params={"model": "gpt-4"})
+        >>> result = call_with_client(cached, messages)
+        >>> cached.cache.stats().hit_rate
+    """
+
+    def __init__(
+        self,
+        call: ProviderCall,
+        cache: ResponseCache | None = None,
+        params: Mapping[str, Any] | None = None,
+        bypass: bool = False,
+    ):
+        """
+        Initialize the wrapper.
+
+        Args:
+            call: ProviderCall to cache
+            cache: Cache to use (a default in-memory ResponseCache if None)
+            params: Model parameters included in the cache key
+            bypass: If True, always call through without touching the cache
+        """
+        self.call = call
+        self.cache = cache if cache is not None else ResponseCache()
+        self.params = dict(params or {})
+        self.bypass = bypass
+
+    def __call__(self, messages: list[dict[str, str]]) -> str:
+        """Return the cached response or call the provider and cache its result."""
+        if self.bypass:
+            return self.call(messages)
+
+        key = cache_key(messages, self.params)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        response = self.call(messages)
+        self.cache.set(key, response)
+        return response
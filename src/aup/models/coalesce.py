@@ -0,0 +1,180 @@
+"""Single-flight coalescing of identical concurrent provider calls."""
+
+import asyncio
+import threading
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import Any
+
+from aup.models.cache import cache_key
+from aup.models.interfaces import AsyncProviderCall, ProviderCall
+
+
+@dataclass(frozen=True)
+class CoalesceStats:
+    """
+    Counters for a single-flight wrapper.
+
+    Attributes:
+        calls: Calls made to the wrapper
+        upstream_calls: Calls actually sent to the provider
+    """
+
+    calls: int
+    upstream_calls: int
+
+    @property
+    def coalesced(self) -> int:
+        """Calls answered by another caller's in-flight request."""
+        return self.calls - self.upstream_calls
+
+
+class _Flight:
+    """An in-flight upstream call shared by every caller with the same key."""
+
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: str | None = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    """
+    ProviderCall wrapper that merges identical concurrent requests.
+
+    The first caller for a given request (the leader) makes the upstream
+    call; callers with the same messages and params that arrive while it is
+    in flight wait for it and receive the same result or exception. Nothing
+    is kept once the call finishes, so unlike a cache this never serves a
+    stale response.
+
+    Example:
+        >>> deduped = SingleFlight(openai_call, params={"model": "gpt-4"})
+        >>> result = call_with_client(deduped, messages)
+    """
+
+    def __init__(self, call: ProviderCall, params: Mapping[str, Any] | None = None):
+        """
+        Initialize the wrapper.
+
+        Args:
+            call: ProviderCall to wrap
+            params: Model parameters included in the request key
+        """
+        self.call = call
+        self.params = dict(params or {})
+        self._lock = threading.Lock()
+        self._flights: dict[str, _Flight] = {}
+        self._calls = 0
+        self._upstream_calls = 0
+
+    def __call__(self, messages: list[dict[str, str]]) -> str:
+        """Join an identical in-flight request or lead a new one."""
+        key = cache_key(messages, self.params)
+        with self._lock:
+            self._calls += 1
+            flight = self._flights.get(key)
+            leader = flight is None
+            if flight is None:
+                flight = self._flights[key] = _Flight()
+                self._upstream_calls += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            assert flight.result is not None
+            return flight.result
+
+        try:
+            flight.result = self.call(messages)
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    def stats(self) -> CoalesceStats:
+        """Return a snapshot of the wrapper's counters."""
+        with self._lock:
+            return CoalesceStats(self._calls, self._upstream_calls)
+
+
+class _AsyncFlight:
+    """An upstream task and the number of callers awaiting it."""
+
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: "asyncio.Task[str]"):
+        self.task = task
+        self.waiters = 0
+
+
+class AsyncSingleFlight:
+    """
+    AsyncProviderCall wrapper that merges identical concurrent requests.
+
+    The upstream call runs as its own task and every caller awaits it through
+    ``asyncio.shield``, so cancelling the caller that started it (the leader)
+    does not cancel the request for the others. The upstream task is only
+    cancelled once every caller waiting on it has been cancelled.
+
+    An instance should be used from a single event loop.
+
+    Example:
+        >>> deduped = AsyncSingleFlight(async_openai_call, params={"model": "gpt-4"})
+        >>> result = await call_with_client_async(deduped, messages)
+    """
+
+    def __init__(self, call: AsyncProviderCall, params: Mapping[str, Any] | None = None):
+        """
+        Initialize the wrapper.
+
+        Args:
+            call: AsyncProviderCall to wrap
+            params: Model parameters included in the request key
+        """
+        self.call = call
+        self.params = dict(params or {})
+        self._flights: dict[str, _AsyncFlight] = {}
+        self._calls = 0
+        self._upstream_calls = 0
+
+    async def __call__(self, messages: list[dict[str, str]]) -> str:
+        """Join an identical in-flight request or start a new one."""
+        key = cache_key(messages, self.params)
+        self._calls += 1
+
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _AsyncFlight(asyncio.ensure_future(self.call(messages)))
+            self._flights[key] = flight
+            self._upstream_calls += 1
+
+            def forget(_: "asyncio.Future[str]", flight: _AsyncFlight = flight) -> None:
+                self._forget(key, flight)
+
+            flight.task.add_done_callback(forget)
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                # Every caller gave up on this request
+                flight.task.cancel()
+                self._forget(key, flight)
+
+    def _forget(self, key: str, flight: _AsyncFlight) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    def stats(self) -> CoalesceStats:
+        """Return a snapshot of the wrapper's counters."""
+        return CoalesceStats(self._calls, self._upstream_calls)
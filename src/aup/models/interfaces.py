@@ -1,5 +1,6 @@
 """Protocols and interfaces for provider calls."""
 
+from collections.abc import AsyncIterator, Iterator
 from typing import Protocol
 
 
@@ -30,3 +31,91 @@ class ProviderCall(Protocol):
             Generated text response
         """
         ...
+
+
+class AsyncProviderCall(Protocol):
+    """
+    Protocol for an asynchronous provider API call.
+
+    The async counterpart of ProviderCall, for SDKs with native asyncio
+    clients. Awaiting many of these concurrently needs no thread per call.
+
+    Example:
+        async def my_openai_call(messages: list[dict[str, str]]) -> str:
+            response = await async_openai_client.chat.completions.create(
+                model="gpt-4",
+                messages=messages
+            )
+            return response.choices[0].message.content
+    """
+
+    async def __call__(self, messages: list[dict[str, str]]) -> str:
+        """
+        Call the provider API with messages.
+
+        Args:
+            messages: List of message dictionaries with 'role' and 'content' keys
+
+        Returns:
+            Generated text response
+        """
+        ...
+
+
+class StreamingProviderCall(Protocol):
+    """
+    Protocol for a streaming provider API call.
+
+    Yields text deltas as the provider generates them, so callers can start
+    rendering before the full response is ready.
+
+    Example:
+        def my_openai_stream(messages: list[dict[str, str]]) -> Iterator[str]:
+            stream = openai_client.chat.completions.create(
+                model="gpt-4",
+                messages=messages,
+                stream=True
+            )
+            for chunk in stream:
+                yield chunk.choices[0].delta.content or ""
+    """
+
+    def __call__(self, messages: list[dict[str, str]]) -> Iterator[str]:
+        """
+        Call the provider API with messages and stream the response.
+
+        Args:
+            messages: List of message dictionaries with 'role' and 'content' keys
+
+        Returns:
+            Iterator of text deltas
+        """
+        ...
+
+
+class AsyncStreamingProviderCall(Protocol):
+    """
+    Protocol for an asynchronous streaming provider API call.
+
+    Example:
+        async def my_openai_stream(messages: list[dict[str, str]]) -> AsyncIterator[str]:
+            stream = await async_openai_client.chat.completions.create(
+                model="gpt-4",
+                messages=messages,
+                stream=True
+            )
+            async for chunk in stream:
+                yield chunk.choices[0].delta.content or ""
+    """
+
+    def __call__(self, messages: list[dict[str, str]]) -> AsyncIterator[str]:
+        """
+        Call the provider API with messages and stream the response.
+
+        Args:
+            messages: List of message dictionaries with 'role' and 'content' keys
+
+        Returns:
+            Async iterator of text deltas
+        """
+        ...
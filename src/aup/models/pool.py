@@ -0,0 +1,254 @@
+"""Pooling of BYO provider client instances."""
+
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+from aup.models.interfaces import ProviderCall
+
+
+@dataclass(frozen=True)
+class PoolStats:
+    """
+    Point-in-time metrics for a ClientPool.
+
+    Attributes:
+        size: Maximum number of clients
+        created: Clients created so far
+        recycled: Clients discarded after errors, age, use count or failed health checks
+        idle: Clients ready for checkout
+        in_use: Clients currently checked out
+        waiting: Callers waiting for a client
+    """
+
+    size: int
+    created: int
+    recycled: int
+    idle: int
+    in_use: int
+    waiting: int
+
+
+class _Member:
+    """A pooled client and its bookkeeping."""
+
+    __slots__ = ("client", "created_at", "uses")
+
+    def __init__(self, client: ProviderCall):
+        self.client = client
+        self.created_at = time.monotonic()
+        self.uses = 0
+
+
+def _close_client(client: ProviderCall) -> None:
+    close = getattr(client, "close", None)
+    if callable(close):
+        try:
+            close()
+        except Exception:
+            pass
+
+
+class ClientPool:
+    """
+    Pool of provider client instances created from a factory.
+
+    Clients are created lazily, up to ``size``, and checked out one per call
+    so concurrent callers never share an instance. A client is discarded and
+    later replaced when a call raises one of ``recycle_on``, when it is older
+    than ``max_age`` or has served ``max_uses`` calls, or when
+    ``health_check`` rejects it at checkout. Discarded clients are closed if
+    they have a ``close()`` method.
+
+    The pool is itself a ProviderCall.
+
+    Example:
+        >>> def make_client():
+        ...     client = OpenAI()
+        ...     def call(messages):
+        ...         response = client.chat.completions.create(model="gpt-4", messages=messages)
+        ...         return response.choices[0].message.content
+        ...     return call
+        ...
+        >>> pool = ClientPool(make_client, size=16, max_age=600)
+        >>> result = call_with_client(pool, messages)
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], ProviderCall],
+        size: int = 8,
+        acquire_timeout: float | None = None,
+        max_age: float | None = None,
+        max_uses: int | None = None,
+        recycle_on: tuple[type[BaseException], ...] = (Exception,),
+        health_check: Callable[[ProviderCall], bool] | None = None,
+    ):
+        """
+        Initialize the pool (no clients are created yet).
+
+        Args:
+            factory: Zero-argument callable creating a new client
+            size: Maximum number of clients
+            acquire_timeout: Maximum seconds to wait for a free client (None waits forever)
+            max_age: Recycle clients older than this many seconds
+            max_uses: Recycle clients after this many calls
+            recycle_on: Exception types that cause the client that raised them to be recycled
+            health_check: Optional check run on idle clients at checkout; False recycles them
+
+        Raises:
+            ValueError: If size is less than 1
+        """
+        if size < 1:
+            raise ValueError("size must be at least 1")
+
+        self.factory = factory
+        self.size = size
+        self.acquire_timeout = acquire_timeout
+        self.max_age = max_age
+        self.max_uses = max_uses
+        self.recycle_on = recycle_on
+        self.health_check = health_check
+
+        self._cond = threading.Condition()
+        self._idle: list[_Member] = []
+        self._total = 0
+        self._waiting = 0
+        self._created = 0
+        self._recycled = 0
+        self._closed = False
+
+    def _expired(self, member: _Member) -> bool:
+        if self.max_age is not None and time.monotonic() - member.created_at > self.max_age:
+            return True
+        return self.max_uses is not None and member.uses >= self.max_uses
+
+    def _discard(self, recycled: bool) -> None:
+        """Free the slot of a dropped client (lock must be held)."""
+        self._total -= 1
+        if recycled:
+            self._recycled += 1
+        self._cond.notify()
+
+    def _checkout(self, timeout: float | None) -> _Member:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        member: _Member | None
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("ClientPool is closed")
+                if self._idle:
+                    # Most recently returned first: its connections are the warmest
+                    member = self._idle.pop()
+                    break
+                if self._total < self.size:
+                    self._total += 1
+                    member = None
+                    break
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError("Timed out waiting for a pooled client")
+                self._waiting += 1
+                try:
+                    self._cond.wait(remaining)
+                finally:
+                    self._waiting -= 1
+
+        if member is not None:
+            healthy = not self._expired(member) and (
+                self.health_check is None or self._safe_health_check(member)
+            )
+            if healthy:
+                return member
+            # Replace the stale client, keeping its slot reserved
+            _close_client(member.client)
+            with self._cond:
+                self._recycled += 1
+
+        try:
+            client = self.factory()
+        except BaseException:
+            with self._cond:
+                self._total -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._created += 1
+        return _Member(client)
+
+    def _safe_health_check(self, member: _Member) -> bool:
+        assert self.health_check is not None
+        try:
+            return bool(self.health_check(member.client))
+        except Exception:
+            return False
+
+    def _checkin(self, member: _Member, error: BaseException | None) -> None:
+        member.uses += 1
+        recycle = (error is not None and isinstance(error, self.recycle_on)) or self._expired(
+            member
+        )
+        with self._cond:
+            # Decide once under the lock; close() may flip _closed right after
+            drop = recycle or self._closed
+            if drop:
+                # Clients returned to a closed pool are closed, not recycled
+                self._discard(recycled=recycle)
+            else:
+                self._idle.append(member)
+                self._cond.notify()
+        if drop:
+            _close_client(member.client)
+
+    @contextmanager
+    def client(self, timeout: float | None = None) -> Iterator[ProviderCall]:
+        """
+        Check out a client for the duration of a block.
+
+        Args:
+            timeout: Maximum seconds to wait (defaults to acquire_timeout)
+
+        Raises:
+            TimeoutError: If no client became free in time
+            RuntimeError: If the pool has been closed
+
+        Example:
+            >>> with pool.client() as call:
+            ...     result = call(messages)
+        """
+        member = self._checkout(self.acquire_timeout if timeout is None else timeout)
+        try:
+            yield member.client
+        except BaseException as e:
+            self._checkin(member, e)
+            raise
+        self._checkin(member, None)
+
+    def __call__(self, messages: list[dict[str, str]]) -> str:
+        """Run one call on a pooled client."""
+        with self.client() as call:
+            return call(messages)
+
+    def stats(self) -> PoolStats:
+        """Return a snapshot of the pool's metrics."""
+        with self._cond:
+            return PoolStats(
+                size=self.size,
+                created=self._created,
+                recycled=self._recycled,
+                idle=len(self._idle),
+                in_use=self._total - len(self._idle),
+                waiting=self._waiting,
+            )
+
+    def close(self) -> None:
+        """Close idle clients and refuse further checkouts; busy clients close on return."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._total -= len(idle)
+            self._cond.notify_all()
+        for member in idle:
+            _close_client(member.client)
@@ -0,0 +1,318 @@
+"""Priority- and tenant-fair scheduling of provider calls."""
+
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, wait
+from dataclasses import dataclass
+
+from aup.errors import DeadlineExceededError
+from aup.models.interfaces import ProviderCall
+
+DEFAULT_WEIGHTS: dict[str, int] = {"interactive": 8, "batch": 1}
+
+
+class _Job:
+    """A queued call."""
+
+    __slots__ = ("call", "messages", "priority", "tenant", "deadline", "enqueued_at", "future")
+
+    def __init__(
+        self,
+        call: ProviderCall,
+        messages: list[dict[str, str]],
+        priority: str,
+        tenant: str,
+        deadline: float | None,
+    ):
+        self.call = call
+        self.messages = messages
+        self.priority = priority
+        self.tenant = tenant
+        self.deadline = deadline
+        self.enqueued_at = time.monotonic()
+        self.future: Future[str] = Future()
+
+
+@dataclass(frozen=True)
+class SchedulerStats:
+    """
+    Point-in-time metrics for a FairScheduler.
+
+    Attributes:
+        in_flight: Calls currently running
+        queued: Queued calls per priority class
+        dispatched: Calls started so far
+        expired: Calls dropped because their deadline passed while queued
+        mean_wait: Mean queue wait in seconds per priority class
+        max_wait: Longest queue wait in seconds per priority class
+    """
+
+    in_flight: int
+    queued: dict[str, int]
+    dispatched: int
+    expired: int
+    mean_wait: dict[str, float]
+    max_wait: dict[str, float]
+
+
+class FairScheduler:
+    """
+    Dispatches provider calls by priority class and tenant under a global concurrency cap.
+
+    Priority classes share capacity by deficit round robin: on each round a
+    class earns credit equal to its weight and spends one credit per call,
+    so with weights ``{"interactive": 8, "batch": 1}`` interactive calls get
+    eight dispatch slots for every batch call while both have work, and
+    either class can use all capacity when the other is idle. Within a class,
+    tenants take turns so one tenant's backlog cannot starve the others.
+
+    Calls submitted with a timeout are dropped with DeadlineExceededError if
+    they are still queued when it passes, before they cost anything. Callers
+    blocked in a scheduled() call get the error as soon as the deadline
+    passes, even while every worker is busy.
+
+    Example:
+        >>> scheduler = FairScheduler(max_concurrency=16)
+        >>> chat = scheduler.scheduled(openai_call, priority="interactive", tenant="acme")
+        >>> result = call_with_client(chat, messages)
+        >>> scheduler.stats().mean_wait
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        weights: dict[str, int] | None = None,
+    ):
+        """
+        Initialize the scheduler and start its workers.
+
+        Args:
+            max_concurrency: Maximum calls running at once
+            weights: Dispatch weight per priority class (defaults to DEFAULT_WEIGHTS).
+                Classes not listed get weight 1.
+
+        Raises:
+            ValueError: If max_concurrency or a weight is less than 1
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.weights = dict(DEFAULT_WEIGHTS if weights is None else weights)
+        if any(weight < 1 for weight in self.weights.values()):
+            raise ValueError("weights must be at least 1")
+
+        self._cond = threading.Condition()
+        self._order: list[str] = list(self.weights)
+        self._queues: dict[str, OrderedDict[str, deque[_Job]]] = {
+            priority: OrderedDict() for priority in self._order
+        }
+        self._deficit: dict[str, float] = dict.fromkeys(self._order, 0.0)
+        self._cursor = 0
+        self._fresh_visit = True
+        self._queued = 0
+        self._in_flight = 0
+        self._closed = False
+
+        self._dispatched = 0
+        self._expired = 0
+        self._wait_total: dict[str, float] = {}
+        self._wait_count: dict[str, int] = {}
+        self._wait_max: dict[str, float] = {}
+
+        self._workers = [
+            threading.Thread(target=self._worker, name=f"aup-scheduler-{i}", daemon=True)
+            for i in range(max_concurrency)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(
+        self,
+        call: ProviderCall,
+        messages: list[dict[str, str]],
+        priority: str = "interactive",
+        tenant: str = "default",
+        timeout: float | None = None,
+    ) -> "Future[str]":
+        """
+        Queue a call.
+
+        Args:
+            call: ProviderCall to run
+            messages: Messages to pass to the call
+            priority: Priority class name
+            tenant: Tenant identifier
+            timeout: Seconds the call may stay queued before it is dropped
+
+        Returns:
+            Future resolving to the response text
+
+        Raises:
+            RuntimeError: If the scheduler has been closed
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        job = _Job(call, messages, priority, tenant, deadline)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("FairScheduler is closed")
+            if priority not in self._queues:
+                self._order.append(priority)
+                self._queues[priority] = OrderedDict()
+                self._deficit[priority] = 0.0
+            tenants = self._queues[priority]
+            if tenant not in tenants:
+                tenants[tenant] = deque()
+            tenants[tenant].append(job)
+            self._queued += 1
+            self._cond.notify()
+        return job.future
+
+    def scheduled(
+        self,
+        call: ProviderCall,
+        priority: str = "interactive",
+        tenant: str = "default",
+        timeout: float | None = None,
+    ) -> ProviderCall:
+        """
+        Wrap a call so every invocation goes through the scheduler.
+
+        Args:
+            call: ProviderCall to wrap
+            priority: Priority class name
+            tenant: Tenant identifier
+            timeout: Seconds each call may stay queued before it is dropped
+
+        Returns:
+            A blocking ProviderCall that raises DeadlineExceededError as soon as
+            ``timeout`` passes with the call still queued
+        """
+
+        def scheduled_call(messages: list[dict[str, str]]) -> str:
+            future = self.submit(call, messages, priority, tenant, timeout)
+            if timeout is not None and not wait([future], timeout).done and self._expire(future):
+                raise DeadlineExceededError(f"Deadline passed after queueing for {timeout:.3f}s")
+            return future.result()
+
+        return scheduled_call
+
+    def _expire(self, future: "Future[str]") -> bool:
+        """Drop a call whose deadline passed; False if it already started."""
+        with self._cond:
+            if not future.cancel():
+                return False
+            self._expired += 1
+            return True
+
+    def _advance(self) -> None:
+        self._cursor = (self._cursor + 1) % len(self._order)
+        self._fresh_visit = True
+
+    def _pop_job(self) -> _Job | None:
+        """Pick the next job by deficit round robin (lock must be held)."""
+        while self._queued:
+            priority = self._order[self._cursor]
+            tenants = self._queues[priority]
+            if not tenants:
+                self._deficit[priority] = 0.0
+                self._advance()
+                continue
+
+            if self._fresh_visit:
+                self._deficit[priority] += self.weights.get(priority, 1)
+                self._fresh_visit = False
+            if self._deficit[priority] < 1:
+                self._advance()
+                continue
+
+            # Serve the tenant at the front, then send it to the back of the line
+            tenant, jobs = next(iter(tenants.items()))
+            job = jobs.popleft()
+            if jobs:
+                tenants.move_to_end(tenant)
+            else:
+                del tenants[tenant]
+            self._queued -= 1
+
+            if job.future.cancelled():
+                continue
+            if job.deadline is not None and time.monotonic() > job.deadline:
+                self._expired += 1
+                job.future.set_exception(
+                    DeadlineExceededError(
+                        f"Deadline passed after queueing for {time.monotonic() - job.enqueued_at:.3f}s"
+                    )
+                )
+                continue
+
+            self._deficit[priority] -= 1
+            return job
+        return None
+
+    def _record_wait(self, job: _Job) -> None:
+        wait = time.monotonic() - job.enqueued_at
+        priority = job.priority
+        self._wait_total[priority] = self._wait_total.get(priority, 0.0) + wait
+        self._wait_count[priority] = self._wait_count.get(priority, 0) + 1
+        self._wait_max[priority] = max(self._wait_max.get(priority, 0.0), wait)
+
+    def _worker(self) -> None:
+        while True:
+            with self._cond:
+                job = self._pop_job()
+                while job is None:
+                    if self._closed:
+                        return
+                    self._cond.wait()
+                    job = self._pop_job()
+                self._in_flight += 1
+                self._dispatched += 1
+                self._record_wait(job)
+
+            try:
+                if job.future.set_running_or_notify_cancel():
+                    try:
+                        job.future.set_result(job.call(job.messages))
+                    except Exception as e:
+                        job.future.set_exception(e)
+            finally:
+                with self._cond:
+                    self._in_flight -= 1
+
+    def stats(self) -> SchedulerStats:
+        """Return a snapshot of the scheduler's metrics."""
+        with self._cond:
+            return SchedulerStats(
+                in_flight=self._in_flight,
+                queued={
+                    priority: sum(len(jobs) for jobs in tenants.values())
+                    for priority, tenants in self._queues.items()
+                },
+                dispatched=self._dispatched,
+                expired=self._expired,
+                mean_wait={
+                    priority: total / self._wait_count[priority]
+                    for priority, total in self._wait_total.items()
+                },
+                max_wait=dict(self._wait_max),
+            )
+
+    def close(self, wait: bool = True) -> None:
+        """
+        Stop accepting calls; queued calls still run.
+
+        Args:
+            wait: If True, block until every queued call has finished
+        """
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if wait:
+            for worker in self._workers:
+                worker.join()
+
+    def __enter__(self) -> "FairScheduler":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
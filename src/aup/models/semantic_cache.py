@@ -0,0 +1,470 @@
+"""
+Semantic response caching with an in-process vector index.
+
+Paraphrased requests miss an exact-match cache. This module embeds the final
+user message through a BYO embedder and reuses the cached response of the
+most similar earlier request when the cosine similarity clears a threshold.
+
+AUP does not include embedding models. Bring your own, e.g.:
+
+    def embed(text: str) -> list[float]:
+        response = client.embeddings.create(model="text-embedding-3-small", input=text)
+        return response.data[0].embedding
+
+Vectors live in contiguous ``array('f')`` buffers. Small caches are searched
+by brute force; once a cache grows past ``ivf_threshold`` entries the vectors
+are partitioned around k-means centroids (an IVF index) and each lookup only
+scans the ``nprobe`` closest partitions. The IVF index is trained on a
+background thread from a snapshot of the vectors; until it is swapped in,
+lookups and inserts keep using the current index.
+"""
+
+import json
+import math
+import random
+import threading
+from array import array
+from collections import OrderedDict
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from operator import mul
+from pathlib import Path
+
+from aup.errors import ValidationError
+from aup.models.interfaces import ProviderCall
+
+# A BYO embedding function: text in, vector out
+Embedder = Callable[[str], Sequence[float]]
+
+
+def _normalize(vector: Sequence[float]) -> array:
+    norm = math.sqrt(sum(x * x for x in vector))
+    if norm == 0:
+        return array("f", vector)
+    return array("f", (x / norm for x in vector))
+
+
+def _dot(a: Sequence[float], b: Sequence[float]) -> float:
+    total: float = sum(map(mul, a, b))
+    return total
+
+
+def _with_extension(path: Path, extension: str) -> Path:
+    """``<path><extension>``, keeping any suffix the path already has."""
+    return path.with_name(path.name + extension)
+
+
+class FlatIndex:
+    """
+    Brute-force vector index over one contiguous float array.
+
+    Vectors are stored back to back in ``array('f')``; removal swaps the last
+    vector into the freed slot so the buffer stays dense.
+    """
+
+    def __init__(self, dim: int):
+        self.dim = dim
+        self.ids: list[int] = []
+        self.vectors = array("f")
+        self._positions: dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def add(self, item_id: int, vector: array) -> None:
+        self._positions[item_id] = len(self.ids)
+        self.ids.append(item_id)
+        self.vectors.extend(vector)
+
+    def remove(self, item_id: int) -> None:
+        pos = self._positions.pop(item_id)
+        last = len(self.ids) - 1
+        if pos != last:
+            moved = self.ids[last]
+            dim = self.dim
+            self.vectors[pos * dim : (pos + 1) * dim] = self.vectors[last * dim : (last + 1) * dim]
+            self.ids[pos] = moved
+            self._positions[moved] = pos
+        self.ids.pop()
+        del self.vectors[last * self.dim :]
+
+    def search(self, query: array) -> tuple[int, float] | None:
+        """Return (id, similarity) of the best match, or None if empty."""
+        best_id, best_score = -1, -2.0
+        dim = self.dim
+        vectors = self.vectors
+        for pos, item_id in enumerate(self.ids):
+            score = _dot(query, vectors[pos * dim : (pos + 1) * dim])
+            if score > best_score:
+                best_id, best_score = item_id, score
+        return None if best_id < 0 else (best_id, best_score)
+
+
+class IVFIndex:
+    """
+    Inverted-file vector index: k-means partitions, each a FlatIndex.
+
+    Lookups scan only the ``nprobe`` partitions whose centroids are closest
+    to the query, trading a little recall for far fewer comparisons.
+    """
+
+    def __init__(self, dim: int, n_lists: int, nprobe: int = 4, seed: int = 0):
+        self.dim = dim
+        self.n_lists = n_lists
+        self.nprobe = nprobe
+        self.seed = seed
+        self.centroids: list[array] = []
+        self.lists: list[FlatIndex] = []
+        self._assignment: dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._assignment)
+
+    def train(self, vectors: list[array], iterations: int = 10) -> None:
+        """Fit centroids with spherical k-means over the given vectors."""
+        rng = random.Random(self.seed)
+        k = min(self.n_lists, len(vectors))
+        centroids = [array("f", v) for v in rng.sample(vectors, k)]
+
+        for _ in range(iterations):
+            sums = [[0.0] * self.dim for _ in range(k)]
+            counts = [0] * k
+            for vector in vectors:
+                c = self._nearest(vector, centroids, 1)[0]
+                counts[c] += 1
+                acc = sums[c]
+                for i, x in enumerate(vector):
+                    acc[i] += x
+            for c in range(k):
+                if counts[c]:
+                    centroids[c] = _normalize(sums[c])
+
+        self.centroids = centroids
+        self.lists = [FlatIndex(self.dim) for _ in centroids]
+
+    @staticmethod
+    def _nearest(vector: array, centroids: list[array], n: int) -> list[int]:
+        scores = sorted(
+            ((_dot(vector, centroid), c) for c, centroid in enumerate(centroids)), reverse=True
+        )
+        return [c for _, c in scores[:n]]
+
+    def add(self, item_id: int, vector: array) -> None:
+        c = self._nearest(vector, self.centroids, 1)[0]
+        self.lists[c].add(item_id, vector)
+        self._assignment[item_id] = c
+
+    def remove(self, item_id: int) -> None:
+        self.lists[self._assignment.pop(item_id)].remove(item_id)
+
+    def search(self, query: array) -> tuple[int, float] | None:
+        best: tuple[int, float] | None = None
+        for c in self._nearest(query, self.centroids, self.nprobe):
+            found = self.lists[c].search(query)
+            if found is not None and (best is None or found[1] > best[1]):
+                best = found
+        return best
+
+
+@dataclass(frozen=True)
+class SemanticCacheStats:
+    """
+    Counters for a SemanticCache.
+
+    Attributes:
+        hits: Lookups answered by a similar cached request
+        misses: Lookups with no match above the threshold
+        evictions: Entries evicted to respect max_entries
+        entries: Entries currently cached
+        index: Index type in use ("flat" or "ivf")
+    """
+
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    index: str
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups that were hits."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class SemanticCache:
+    """
+    Cache of responses keyed by the embedding of the request text.
+
+    Example:
+        >>> cache = SemanticCache(embed, threshold=0.92, max_entries=50_000)
+        >>> cached = SemanticCachedCall(openai_call, cache)
+        >>> result = call_with_client(cached, messages)
+    """
+
+    def __init__(
+        self,
+        embedder: Embedder,
+        threshold: float = 0.9,
+        max_entries: int | None = 10_000,
+        ivf_threshold: int = 2_000,
+        nprobe: int = 4,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            embedder: Function embedding a text into a vector
+            threshold: Minimum cosine similarity for a hit
+            max_entries: Maximum cached entries; least recently used are evicted
+                (None for no limit)
+            ivf_threshold: Entry count at which an IVF index is built in the background
+            nprobe: Partitions scanned per lookup once the IVF index is in use
+        """
+        self.embedder = embedder
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ivf_threshold = ivf_threshold
+        self.nprobe = nprobe
+
+        self._lock = threading.Lock()
+        self._index: FlatIndex | IVFIndex | None = None
+        self._trained_on = 0
+        self._training: threading.Thread | None = None
+        # Bumped by clear() so a training run started before it is discarded
+        self._generation = 0
+        self._vectors: dict[int, array] = {}
+        # id -> (text, response), in least-recently-used order
+        self._entries: OrderedDict[int, tuple[str, str]] = OrderedDict()
+        self._next_id = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def _embed(self, text: str) -> array:
+        vector = _normalize(self.embedder(text))
+        if self._index is not None and len(vector) != self._index.dim:
+            raise ValidationError(
+                f"Embedding dimension {len(vector)} does not match index dimension {self._index.dim}"
+            )
+        return vector
+
+    def lookup(self, text: str) -> str | None:
+        """
+        Find the response cached for the most similar text.
+
+        Args:
+            text: Request text
+
+        Returns:
+            Cached response if a match clears the threshold, otherwise None
+        """
+        query = self._embed(text)
+        with self._lock:
+            found = self._index.search(query) if self._index is not None else None
+            if found is None or found[1] < self.threshold:
+                self._misses += 1
+                return None
+            item_id = found[0]
+            self._entries.move_to_end(item_id)
+            self._hits += 1
+            return self._entries[item_id][1]
+
+    def add(self, text: str, response: str) -> None:
+        """
+        Cache a response for a request text.
+
+        Args:
+            text: Request text
+            response: Response text
+        """
+        vector = self._embed(text)
+        with self._lock:
+            self._insert(text, response, vector)
+
+    def _insert(self, text: str, response: str, vector: array) -> None:
+        if self._index is None:
+            self._index = FlatIndex(len(vector))
+
+        item_id = self._next_id
+        self._next_id += 1
+        self._index.add(item_id, vector)
+        self._vectors[item_id] = vector
+        self._entries[item_id] = (text, response)
+
+        while self.max_entries is not None and len(self._entries) > self.max_entries:
+            evicted, _ = self._entries.popitem(last=False)
+            self._index.remove(evicted)
+            del self._vectors[evicted]
+            self._evictions += 1
+
+        # Build the IVF index once the cache is large enough, and retrain it as it grows
+        size = len(self._index)
+        if self._training is None and (
+            (isinstance(self._index, FlatIndex) and size >= self.ivf_threshold)
+            or (isinstance(self._index, IVFIndex) and size >= 4 * self._trained_on)
+        ):
+            self._training = threading.Thread(
+                target=self._rebuild_ivf,
+                args=(self._index.dim, dict(self._vectors), self._generation),
+                name="aup-semantic-cache-ivf",
+                daemon=True,
+            )
+            self._training.start()
+
+    def _rebuild_ivf(self, dim: int, snapshot: dict[int, array], generation: int) -> None:
+        """Train an IVF index on a snapshot off the lock, then swap it in."""
+        try:
+            n_lists = max(1, int(math.sqrt(len(snapshot))))
+            index = IVFIndex(dim, n_lists, self.nprobe)
+            index.train(list(snapshot.values()))
+            for item_id, vector in snapshot.items():
+                index.add(item_id, vector)
+
+            with self._lock:
+                if generation != self._generation:
+                    return
+                # Replay inserts and evictions that happened during training
+                for item_id in snapshot:
+                    if item_id not in self._vectors:
+                        index.remove(item_id)
+                for item_id, vector in self._vectors.items():
+                    if item_id not in snapshot:
+                        index.add(item_id, vector)
+                self._index = index
+                self._trained_on = len(snapshot)
+        finally:
+            with self._lock:
+                if self._training is threading.current_thread():
+                    self._training = None
+
+    def wait_for_index(self, timeout: float | None = None) -> None:
+        """
+        Block until a background IVF rebuild, if any, has been swapped in.
+
+        Args:
+            timeout: Maximum seconds to wait (None to wait indefinitely)
+        """
+        with self._lock:
+            training = self._training
+        if training is not None:
+            training.join(timeout)
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        with self._lock:
+            self._index = None
+            self._trained_on = 0
+            self._training = None
+            self._generation += 1
+            self._vectors.clear()
+            self._entries.clear()
+
+    def stats(self) -> SemanticCacheStats:
+        """Return a snapshot of the cache counters."""
+        with self._lock:
+            return SemanticCacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                entries=len(self._entries),
+                index="ivf" if isinstance(self._index, IVFIndex) else "flat",
+            )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def save(self, path: str | Path) -> None:
+        """
+        Persist the cache to disk.
+
+        Writes ``<path>.json`` with texts and responses (in LRU order) and
+        ``<path>.f32`` with the raw vectors.
+
+        Args:
+            path: Base path for the two files
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            ids = list(self._entries)
+            meta = {
+                "dim": self._index.dim if self._index is not None else 0,
+                "entries": [list(self._entries[item_id]) for item_id in ids],
+            }
+            vectors = array("f")
+            for item_id in ids:
+                vectors.extend(self._vectors[item_id])
+
+        with _with_extension(path, ".f32").open("wb") as f:
+            vectors.tofile(f)
+        _with_extension(path, ".json").write_text(json.dumps(meta), encoding="utf-8")
+
+    def load(self, path: str | Path) -> None:
+        """
+        Load entries saved with save(), replacing the current contents.
+
+        The embedder is not called; vectors are read back as saved.
+
+        Args:
+            path: Base path used with save()
+        """
+        path = Path(path)
+        meta = json.loads(_with_extension(path, ".json").read_text(encoding="utf-8"))
+        dim = meta["dim"]
+        vectors = array("f")
+        with _with_extension(path, ".f32").open("rb") as f:
+            vectors.fromfile(f, dim * len(meta["entries"]))
+
+        self.clear()
+        with self._lock:
+            for i, (text, response) in enumerate(meta["entries"]):
+                self._insert(text, response, vectors[i * dim : (i + 1) * dim])
+
+
+def _last_user_content(messages: list[dict[str, str]]) -> str | None:
+    for message in reversed(messages):
+        if message.get("role") == "user":
+            return message.get("content", "")
+    return None
+
+
+class SemanticCachedCall:
+    """
+    ProviderCall wrapper that answers near-duplicate requests from a SemanticCache.
+
+    The final user message is embedded and looked up; everything else in the
+    message list is ignored, so use one cache per system prompt / model
+    configuration. Requests without a user message are passed through.
+
+    Example:
+        >>> cached = SemanticCachedCall(openai_call, SemanticCache(embed, threshold=0.92))
+        >>> result = call_with_client(cached, messages)
+    """
+
+    def __init__(self, call: ProviderCall, cache: SemanticCache, bypass: bool = False):
+        """
+        Initialize the wrapper.
+
+        Args:
+            call: ProviderCall to cache
+            cache: SemanticCache to use
+            bypass: If True, always call through without touching the cache
+        """
+        self.call = call
+        self.cache = cache
+        self.bypass = bypass
+
+    def __call__(self, messages: list[dict[str, str]]) -> str:
+        """Return a cached response for a similar request or call the provider."""
+        text = None if self.bypass else _last_user_content(messages)
+        if text is None:
+            return self.call(messages)
+
+        cached = self.cache.lookup(text)
+        if cached is not None:
+            return cached
+
+        response = self.call(messages)
+        self.cache.add(text, response)
+        return response
@@ -0,0 +1,216 @@
+"""Streaming provider calls: latency instrumentation and adapters."""
+
+import time
+from collections.abc import AsyncIterator, Callable, Iterator
+from dataclasses import dataclass, field
+
+from aup.models.interfaces import (
+    AsyncProviderCall,
+    AsyncStreamingProviderCall,
+    ProviderCall,
+    StreamingProviderCall,
+)
+
+
+@dataclass
+class StreamTimings:
+    """
+    Latency measurements for one streamed response.
+
+    All times are ``time.monotonic()`` values or durations in seconds.
+
+    Attributes:
+        start: When the call was made
+        first_token_at: When the first non-empty delta arrived (None if none did)
+        end: When the stream finished, failed or was closed
+        chunks: Number of non-empty deltas received
+        chars: Total characters received
+        inter_token_latencies: Gaps between consecutive non-empty deltas
+        error: Exception that ended the stream, if any
+    """
+
+    start: float
+    first_token_at: float | None = None
+    end: float | None = None
+    chunks: int = 0
+    chars: int = 0
+    inter_token_latencies: list[float] = field(default_factory=list)
+    error: BaseException | None = None
+    _last_at: float = field(default=0.0, repr=False)
+
+    @property
+    def time_to_first_token(self) -> float | None:
+        """Seconds from the call to the first delta."""
+        if self.first_token_at is None:
+            return None
+        return self.first_token_at - self.start
+
+    @property
+    def total_time(self) -> float | None:
+        """Seconds from the call to the end of the stream."""
+        if self.end is None:
+            return None
+        return self.end - self.start
+
+    @property
+    def mean_inter_token_latency(self) -> float | None:
+        """Average gap between deltas, in seconds."""
+        if not self.inter_token_latencies:
+            return None
+        return sum(self.inter_token_latencies) / len(self.inter_token_latencies)
+
+    def _record(self, delta: str, now: float) -> None:
+        if not delta:
+            return
+        if self.first_token_at is None:
+            self.first_token_at = now
+        else:
+            self.inter_token_latencies.append(now - self._last_at)
+        self._last_at = now
+        self.chunks += 1
+        self.chars += len(delta)
+
+
+def instrument_stream(
+    call: StreamingProviderCall,
+    on_complete: Callable[[StreamTimings], None],
+) -> StreamingProviderCall:
+    """
+    Wrap a streaming call to measure time-to-first-token and inter-token latency.
+
+    ``on_complete`` receives the timings once the stream is exhausted, raises,
+    or is closed early by the consumer.
+
+    Args:
+        call: StreamingProviderCall to instrument
+        on_complete: Callback receiving the StreamTimings of each call
+
+    Returns:
+        A StreamingProviderCall yielding the same deltas
+
+    Example:
+        >>> timed = instrument_stream(my_stream, lambda t: print(t.time_to_first_token))
+        >>> for delta in timed(messages):
+        ...     render(delta)
+    """
+
+    def instrumented(messages: list[dict[str, str]]) -> Iterator[str]:
+        timings = StreamTimings(start=time.monotonic())
+        try:
+            for delta in call(messages):
+                timings._record(delta, time.monotonic())
+                yield delta
+        except BaseException as e:
+            if not isinstance(e, GeneratorExit):
+                timings.error = e
+            raise
+        finally:
+            timings.end = time.monotonic()
+            on_complete(timings)
+
+    return instrumented
+
+
+def instrument_stream_async(
+    call: AsyncStreamingProviderCall,
+    on_complete: Callable[[StreamTimings], None],
+) -> AsyncStreamingProviderCall:
+    """
+    Async counterpart of instrument_stream.
+
+    Args:
+        call: AsyncStreamingProviderCall to instrument
+        on_complete: Callback receiving the StreamTimings of each call
+
+    Returns:
+        An AsyncStreamingProviderCall yielding the same deltas
+    """
+
+    async def instrumented(messages: list[dict[str, str]]) -> AsyncIterator[str]:
+        timings = StreamTimings(start=time.monotonic())
+        try:
+            async for delta in call(messages):
+                timings._record(delta, time.monotonic())
+                yield delta
+        except BaseException as e:
+            if not isinstance(e, GeneratorExit):
+                timings.error = e
+            raise
+        finally:
+            timings.end = time.monotonic()
+            on_complete(timings)
+
+    return instrumented
+
+
+def stream_to_call(call: StreamingProviderCall) -> ProviderCall:
+    """
+    Adapt a streaming call to a plain ProviderCall by joining its deltas.
+
+    Lets helpers such as call_with_client and with_retry consume streaming clients.
+
+    Args:
+        call: StreamingProviderCall
+
+    Returns:
+        A ProviderCall returning the full response text
+    """
+
+    def joined(messages: list[dict[str, str]]) -> str:
+        return "".join(call(messages))
+
+    return joined
+
+
+def astream_to_call(call: AsyncStreamingProviderCall) -> AsyncProviderCall:
+    """
+    Adapt an async streaming call to an AsyncProviderCall by joining its deltas.
+
+    Args:
+        call: AsyncStreamingProviderCall
+
+    Returns:
+        An AsyncProviderCall returning the full response text
+    """
+
+    async def joined(messages: list[dict[str, str]]) -> str:
+        return "".join([delta async for delta in call(messages)])
+
+    return joined
+
+
+def call_to_stream(call: ProviderCall) -> StreamingProviderCall:
+    """
+    Adapt a plain ProviderCall to the streaming protocol.
+
+    The whole response arrives as a single delta, so streaming consumers can
+    treat both kinds of client alike.
+
+    Args:
+        call: ProviderCall
+
+    Returns:
+        A StreamingProviderCall yielding one delta
+    """
+
+    def streamed(messages: list[dict[str, str]]) -> Iterator[str]:
+        yield call(messages)
+
+    return streamed
+
+
+def acall_to_stream(call: AsyncProviderCall) -> AsyncStreamingProviderCall:
+    """
+    Adapt an AsyncProviderCall to the async streaming protocol.
+
+    Args:
+        call: AsyncProviderCall
+
+    Returns:
+        An AsyncStreamingProviderCall yielding one delta
+    """
+
+    async def streamed(messages: list[dict[str, str]]) -> AsyncIterator[str]:
+        yield await call(messages)
+
+    return streamed
@@ -1,6 +1,35 @@
 """Prompt template and rendering utilities."""
 
-from aup.prompts.template import PromptTemplate
-
-__all__ = ["PromptTemplate"]
+from aup.prompts.budget import TokenBudget, TruncationPolicy
+from aup.prompts.compiler import ExtendedTemplate, clear_compile_cache
+from aup.prompts.conversation import Conversation, Turn
+from aup.prompts.store import TemplateStore, load_template_file
+from aup.prompts.template import (
+    CompiledTemplate,
+    PrefixAnalysis,
+    PromptTemplate,
+    RenderCacheStats,
+    clear_render_cache,
+    compile_template,
+    render,
+    render_cache_info,
+)
 
+__all__ = [
+    "CompiledTemplate",
+    "Conversation",
+    "ExtendedTemplate",
+    "PrefixAnalysis",
+    "PromptTemplate",
+    "RenderCacheStats",
+    "TemplateStore",
+    "TokenBudget",
+    "TruncationPolicy",
+    "Turn",
+    "clear_compile_cache",
+    "clear_render_cache",
+    "compile_template",
+    "load_template_file",
+    "render",
+    "render_cache_info",
+]
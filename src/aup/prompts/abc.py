@@ -3,12 +3,16 @@
 
 from __future__ import annotations
 
+from collections import OrderedDict
+from collections.abc import Hashable, Iterable, Iterator, Mapping
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Iterable, Optional
+from typing import Any, Optional
 
 DEFAULT_SEED = 42
 DEFAULT_MODEL = "distilbert/distilbert-base-uncased-finetuned-sst-2-english"
+PREP_MEMO_SIZE = 100_000
+PREDICTION_CACHE_SIZE = 200_000
 
 
 @dataclass(frozen=True)
@@ -18,6 +22,50 @@ class DatasetBundle:
     labels: list[int]
 
 
+class LRUCache:
+    """Bounded least-recently-used mapping with hit/miss counters."""
+
+    def __init__(self, maxsize: int):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[Hashable, Any] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def stats(self, since: Mapping[str, Any] | None = None) -> dict[str, Any]:
+        # With ``since`` (an earlier stats()), count only the lookups made after it
+        hits = self.hits - (since["hits"] if since else 0)
+        misses = self.misses - (since["misses"] if since else 0)
+        lookups = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+        }
+
+
 def set_seed(seed: int) -> None:
     import random
 
@@ -34,7 +82,7 @@ def build_classifier(model_name: str = DEFAULT_MODEL, device: Optional[int] = No
 
 
 def predict_proba(clf, texts: Iterable[str]):
-import numpy as np
+    import numpy as np
 
     outs = clf(list(texts), truncation=True)
     probs: list[list[float]] = []
@@ -44,21 +92,63 @@ import numpy as np
     return np.asarray(probs, dtype=float)
 
 
-def truncate_for_model(clf, text: str) -> str:
+def cached_predict_proba(clf, texts: list[str], cache: LRUCache):
+    import numpy as np
+
+    # Look up each distinct text once, send the misses in one batch, then
+    # scatter the rows back into input order
+    rows = {t: cache.get(t) for t in dict.fromkeys(texts)}
+    missing = [t for t, row in rows.items() if row is None]
+    if missing:
+        fresh = predict_proba(clf, missing)
+        for j, t in enumerate(missing):
+            rows[t] = fresh[j].copy()
+            cache.put(t, rows[t])
+    probs = np.empty((len(texts), 2), dtype=float)
+    for i, t in enumerate(texts):
+        probs[i] = rows[t]
+    return probs
+
+
+def model_max_length(clf) -> int:
     max_tokens = getattr(clf.tokenizer, "model_max_length", 512) or 512
     if max_tokens > 10_000:
         max_tokens = 512
-    ids = clf.tokenizer.encode(str(text), truncation=True, max_length=int(max_tokens))
+    return int(max_tokens)
+
+
+def truncate_for_model(clf, text: str) -> str:
+    ids = clf.tokenizer.encode(str(text), truncation=True, max_length=model_max_length(clf))
     return clf.tokenizer.decode(ids, skip_special_tokens=True)
 
 
-def prep_texts(clf, texts: Iterable[str]) -> list[str]:
-    out: list[str] = []
-    for t in texts:
-        s = "" if t is None else str(t).strip()
-        if s:
-            out.append(truncate_for_model(clf, s))
-    return out
+def truncate_batch(clf, texts: list[str]) -> list[str]:
+    # One batched encode/decode instead of a tokenizer round trip per text
+    if not texts:
+        return []
+    encoded = clf.tokenizer(texts, truncation=True, max_length=model_max_length(clf))
+    decoded: list[str] = clf.tokenizer.batch_decode(encoded["input_ids"], skip_special_tokens=True)
+    return decoded
+
+
+def prep_texts(clf, texts: Iterable[str], memo: LRUCache | None = None) -> list[str]:
+    cleaned = [s for s in ("" if t is None else str(t).strip() for t in texts) if s]
+    if memo is None:
+        return truncate_batch(clf, cleaned)
+
+    # One lookup per distinct text, so repeats don't count as extra misses
+    found: dict[str, str] = {}
+    missing: list[str] = []
+    for s in dict.fromkeys(cleaned):
+        t = memo.get(s)
+        if t is None:
+            missing.append(s)
+        else:
+            found[s] = t
+    for s, t in zip(missing, truncate_batch(clf, missing), strict=True):
+        memo.put(s, t)
+        found[s] = t
+    return [found[s] for s in cleaned]
 
 
 def load_datasets(n_per_class: int = 300, seed: int = DEFAULT_SEED) -> list[DatasetBundle]:
@@ -104,47 +194,178 @@ def load_datasets(n_per_class: int = 300, seed: int = DEFAULT_SEED) -> list[Data
     ]
 
 
-def build_global_explainer(clf):
+def build_global_explainer(clf, memo: LRUCache | None = None, cache: LRUCache | None = None):
     import shap
 
     masker = shap.maskers.Text(clf.tokenizer)
+    if memo is None:
+        memo = LRUCache(PREP_MEMO_SIZE)
+    if cache is None:
+        cache = LRUCache(PREDICTION_CACHE_SIZE)
 
     def shap_model(texts):
-        texts = prep_texts(clf, texts)
-        probs = predict_proba(clf, texts)
+        texts = prep_texts(clf, texts, memo)
+        probs = cached_predict_proba(clf, texts, cache)
         return probs[:, 1]
 
     return shap.Explainer(shap_model, masker, algorithm="partition")
 
 
-def extract_token_importance(shap_values) -> list[tuple[str, float]]:
+def _abs_values(shap_values):
     import numpy as np
 
-    tokens = shap_values.data
     vals = np.asarray(shap_values.values)
     if vals.ndim == 2 and vals.shape[1] == 1:
         vals = vals[:, 0]
-    vals = np.abs(vals)
+    return np.abs(vals)
+
+
+def extract_token_importance(shap_values) -> list[tuple[str, float]]:
+    tokens = shap_values.data
+    vals = _abs_values(shap_values)
     pairs: list[tuple[str, float]] = []
-    for t, v in zip(tokens, vals):
+    for t, v in zip(tokens, vals, strict=True):
         if isinstance(t, str) and t.strip():
             pairs.append((t.lower(), float(v)))
     return pairs
 
 
-def global_shap_scores(explainer, texts: list[str], max_samples: int = 20) -> dict[str, float]:
-    import numpy as np
-    from collections import defaultdict
-
-    token_scores: dict[str, list[float]] = defaultdict(list)
-    shap_values = explainer(texts[:max_samples])
-    for sv in shap_values:
-        for tok, val in extract_token_importance(sv):
-            token_scores[tok].append(val)
-    return {tok: float(np.mean(vs)) for tok, vs in token_scores.items()}
-
-
-def top_k_tokens(global_shap: dict[str, float], k: int = 20) -> list[str]:
+class TokenScoreAccumulator:
+    """Running per-token sums and counts over an interned token vocabulary."""
+
+    def __init__(self, capacity: int = 4096):
+        import numpy as np
+
+        self.vocab: dict[str, int] = {}
+        self._sums = np.zeros(capacity, dtype=float)
+        self._counts = np.zeros(capacity, dtype=np.int64)
+
+    def add(self, tokens: Iterable[Any], values) -> None:
+        self.add_many([(tokens, values)])
+
+    def add_many(self, rows: Iterable[tuple[Iterable[Any], Any]]) -> None:
+        import numpy as np
+
+        # Concatenate the rows and bincount once, so the O(vocab) pass is
+        # paid per call rather than per row
+        vocab = self.vocab
+        id_parts, value_parts = [], []
+        for tokens, values in rows:
+            # -1 marks tokens that are skipped (non-strings, whitespace)
+            ids = np.fromiter(
+                (
+                    vocab.setdefault(t.lower(), len(vocab))
+                    if isinstance(t, str) and t.strip()
+                    else -1
+                    for t in tokens
+                ),
+                dtype=np.intp,
+            )
+            keep = ids >= 0
+            id_parts.append(ids[keep])
+            value_parts.append(np.asarray(values, dtype=float)[keep])
+        if not id_parts:
+            return
+        ids = np.concatenate(id_parts)
+        vals = np.concatenate(value_parts)
+
+        n = len(vocab)
+        if n > len(self._sums):
+            size = max(n, 2 * len(self._sums))
+            self._sums = np.concatenate([self._sums, np.zeros(size - len(self._sums))])
+            self._counts = np.concatenate(
+                [self._counts, np.zeros(size - len(self._counts), dtype=np.int64)]
+            )
+        self._sums[:n] += np.bincount(ids, weights=vals, minlength=n)
+        self._counts[:n] += np.bincount(ids, minlength=n)
+
+    def add_explanation(self, shap_values) -> None:
+        self.add(shap_values.data, _abs_values(shap_values))
+
+    def add_explanations(self, explanations: Iterable[Any]) -> None:
+        self.add_many((sv.data, _abs_values(sv)) for sv in explanations)
+
+    def means(self) -> dict[str, float]:
+        n = len(self.vocab)
+        means = self._sums[:n] / self._counts[:n]
+        return dict(zip(self.vocab, means.tolist(), strict=True))
+
+
+def global_shap_scores(
+    explainer, texts: list[str], max_samples: int = 20, batch_size: int = 16
+) -> dict[str, float]:
+    # Explain in batches and fold each into running sums, so per-token
+    # values are never held for the whole sample
+    acc = TokenScoreAccumulator()
+    texts = texts[:max_samples]
+    for start in range(0, len(texts), batch_size):
+        acc.add_explanations(explainer(texts[start : start + batch_size]))
+    return acc.means()
+
+
+class DatasetScores(Mapping[str, float]):
+    """Token -> score mapping over a vocab list and a (memory-mapped) score array."""
+
+    def __init__(self, vocab_path: Path, scores_path: Path):
+        self.vocab_path = vocab_path
+        self.scores_path = scores_path
+        self._tokens: list[str] | None = None
+        self._index: dict[str, int] | None = None
+        self._scores = None
+
+    @property
+    def tokens(self) -> list[str]:
+        if self._tokens is None:
+            import json
+
+            self._tokens = json.loads(self.vocab_path.read_text(encoding="utf-8"))
+        return self._tokens
+
+    @property
+    def index(self) -> dict[str, int]:
+        if self._index is None:
+            self._index = {t: i for i, t in enumerate(self.tokens)}
+        return self._index
+
+    @property
+    def scores(self):
+        if self._scores is None:
+            import numpy as np
+
+            self._scores = np.load(self.scores_path, mmap_mode="r")
+        return self._scores
+
+    def __getitem__(self, token: str) -> float:
+        return float(self.scores[self.index[token]])
+
+    def __contains__(self, token: object) -> bool:
+        return token in self.index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.tokens)
+
+    def __len__(self) -> int:
+        return len(self.tokens)
+
+    def top_k(self, k: int) -> list[str]:
+        import numpy as np
+
+        scores = self.scores
+        k = min(k, len(scores))
+        if k <= 0:
+            return []
+        # Take every token tied with the k-th score, not an arbitrary subset of
+        # them, then order by score with ties in vocab order like sorted()
+        boundary = scores[np.argpartition(-scores, k - 1)[k - 1]]
+        idx = np.flatnonzero(scores >= boundary)
+        order = idx[np.argsort(-scores[idx], kind="stable")][:k]
+        tokens = self.tokens
+        return [tokens[i] for i in order]
+
+
+def top_k_tokens(global_shap: Mapping[str, float], k: int = 20) -> list[str]:
+    if isinstance(global_shap, DatasetScores):
+        return global_shap.top_k(k)
     return [t for t, _ in sorted(global_shap.items(), key=lambda x: -x[1])[:k]]
 
 
@@ -153,24 +374,131 @@ def jaccard(a: Iterable[str], b: Iterable[str]) -> float:
     return 0.0 if not (a_set or b_set) else len(a_set & b_set) / len(a_set | b_set)
 
 
-def spearman_corr(a: dict[str, float], b: dict[str, float]) -> float:
-from scipy.stats import spearmanr
+def _common_values(a: Mapping[str, float], b: Mapping[str, float], common: list[str]):
+    if isinstance(a, DatasetScores) and isinstance(b, DatasetScores):
+        # Gather from the mapped arrays instead of boxing a float per token
+        a_index, b_index = a.index, b.index
+        return a.scores[[a_index[t] for t in common]], b.scores[[b_index[t] for t in common]]
+    return [a[t] for t in common], [b[t] for t in common]
+
+
+def spearman_corr(a: Mapping[str, float], b: Mapping[str, float]) -> float:
+    from scipy.stats import spearmanr
 
     common = sorted(set(a) & set(b))
     if len(common) < 5:
         return float("nan")
-    av = [a[t] for t in common]
-    bv = [b[t] for t in common]
+    av, bv = _common_values(a, b, common)
     corr = spearmanr(av, bv).correlation
     return float(corr) if corr is not None else float("nan")
 
 
+class ShapArtifacts(Mapping[str, DatasetScores]):
+    """Lazily loaded columnar experiment outputs: dataset name -> DatasetScores."""
+
+    def __init__(self, directory: Path):
+        import json
+
+        self.directory = Path(directory)
+        meta = json.loads((self.directory / "summary.json").read_text(encoding="utf-8"))
+        self.summary: dict[str, Any] = meta["summary"]
+        self.names: list[str] = meta["datasets"]
+        self._datasets: dict[str, DatasetScores] = {}
+
+    def __getitem__(self, name: str) -> DatasetScores:
+        if name not in self.names:
+            raise KeyError(name)
+        if name not in self._datasets:
+            self._datasets[name] = DatasetScores(
+                self.directory / f"{name}.vocab.json", self.directory / f"{name}.scores.npy"
+            )
+        return self._datasets[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.names)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+
+def save_artifacts(artifacts: dict[str, Any], directory: Path) -> None:
+    # Layout per dataset: <name>.vocab.json (tokens in id order) and
+    # <name>.scores.npy (float64, loadable with mmap_mode="r"); summary.json
+    # lists the datasets and is written last, once everything else exists
+    import json
+
+    import numpy as np
+
+    directory.mkdir(parents=True, exist_ok=True)
+    global_shap: dict[str, Mapping[str, float]] = artifacts["global_shap"]
+    for name, scores in global_shap.items():
+        tokens = list(scores)
+        values = np.fromiter(scores.values(), dtype=np.float64, count=len(tokens))
+        (directory / f"{name}.vocab.json").write_text(
+            json.dumps(tokens, ensure_ascii=False), encoding="utf-8"
+        )
+        np.save(directory / f"{name}.scores.npy", values)
+    meta = {"datasets": list(global_shap), "summary": artifacts["summary"]}
+    (directory / "summary.json").write_text(json.dumps(meta, indent=2), encoding="utf-8")
+
+
+def load_artifacts(directory: Path) -> ShapArtifacts:
+    return ShapArtifacts(directory)
+
+
 def save_pickle(obj: Any, path: Path) -> None:
+    import os
     import pickle
 
+    # Write then rename, so a crash never leaves a truncated file behind
     path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("wb") as f:
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open("wb") as f:
         pickle.dump(obj, f)
+    os.replace(tmp, path)
+
+
+def load_pickle(path: Path) -> Any:
+    import pickle
+
+    with path.open("rb") as f:
+        return pickle.load(f)
+
+
+# Per-process state for dataset jobs, set up once by _init_worker
+_WORKER: dict[str, Any] = {}
+
+
+def _init_worker(model: str, device: int | None, seed: int) -> None:
+    set_seed(seed)
+    clf = build_classifier(model, device=device)
+    memo = LRUCache(PREP_MEMO_SIZE)
+    cache = LRUCache(PREDICTION_CACHE_SIZE)
+    _WORKER.update(
+        clf=clf,
+        memo=memo,
+        cache=cache,
+        explainer=build_global_explainer(clf, memo=memo, cache=cache),
+    )
+
+
+def _explain_dataset(ds: DatasetBundle, max_samples: int) -> dict[str, Any]:
+    clf, memo, cache = _WORKER["clf"], _WORKER["memo"], _WORKER["cache"]
+    # The caches outlive a dataset; report only this dataset's lookups
+    prep_before, predict_before = memo.stats(), cache.stats()
+    scores = global_shap_scores(
+        _WORKER["explainer"],
+        prep_texts(clf, ds.texts, memo),
+        max_samples=max_samples,
+    )
+    return {
+        "scores": scores,
+        "cache": {"prep": memo.stats(prep_before), "predict": cache.stats(predict_before)},
+    }
+
+
+def checkpoint_path(checkpoint_dir: Path, name: str) -> Path:
+    return checkpoint_dir / f"{name}.pkl"
 
 
 def run_global_stability(
@@ -178,21 +506,65 @@ def run_global_stability(
     seed: int = DEFAULT_SEED,
     n_per_class: int = 300,
     max_samples: int = 20,
-    device: Optional[int] = None,
+    device: int | None = None,
+    workers: int = 1,
+    checkpoint_dir: Path | None = None,
+    resume: bool = False,
 ) -> dict[str, Any]:
     set_seed(seed)
     datasets = load_datasets(n_per_class=n_per_class, seed=seed)
-    clf = build_classifier(model, device=device)
-    explainer = build_global_explainer(clf)
-
-    global_scores: dict[str, dict[str, float]] = {}
-    for ds in datasets:
-        global_scores[ds.name] = global_shap_scores(
-            explainer,
-            prep_texts(clf, ds.texts),
-            max_samples=max_samples,
-        )
-
+    config = {"model": model, "seed": seed, "n_per_class": n_per_class, "max_samples": max_samples}
+
+    results: dict[str, dict[str, Any]] = {}
+    if resume and checkpoint_dir is not None:
+        for ds in datasets:
+            path = checkpoint_path(checkpoint_dir, ds.name)
+            if path.exists():
+                saved = load_pickle(path)
+                # Only reuse checkpoints produced with the same settings
+                if saved.get("config") == config:
+                    results[ds.name] = saved
+    pending = [ds for ds in datasets if ds.name not in results]
+
+    def finish(name: str, result: dict[str, Any]) -> None:
+        result["config"] = config
+        results[name] = result
+        if checkpoint_dir is not None:
+            save_pickle(result, checkpoint_path(checkpoint_dir, name))
+
+    if pending and workers <= 1:
+        try:
+            _init_worker(model, device, seed)
+            for ds in pending:
+                finish(ds.name, _explain_dataset(ds, max_samples))
+        finally:
+            # Don't keep the classifier alive after the run, even on failure
+            _WORKER.clear()
+    elif pending:
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+
+        errors: list[Exception] = []
+        # spawn: forked children cannot safely reuse a parent's CUDA/torch state
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(pending)),
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(model, device, seed),
+        ) as pool:
+            futures = {pool.submit(_explain_dataset, ds, max_samples): ds.name for ds in pending}
+            # Checkpoint every dataset that finished before reporting a failure
+            for future in as_completed(futures):
+                try:
+                    result = future.result()
+                except Exception as e:
+                    errors.append(e)
+                else:
+                    finish(futures[future], result)
+        if errors:
+            raise errors[0]
+
+    global_scores = {ds.name: results[ds.name]["scores"] for ds in datasets}
     tw, im, am = global_scores["twitter"], global_scores["imdb"], global_scores["amazon"]
     summary = {
         "jaccard@100": {
@@ -205,6 +577,7 @@ def run_global_stability(
             "twitter-amazon": spearman_corr(tw, am),
             "imdb-amazon": spearman_corr(im, am),
         },
+        "cache": {ds.name: results[ds.name]["cache"] for ds in datasets},
     }
     return {"global_shap": global_scores, "summary": summary}
 
@@ -219,7 +592,12 @@ def main() -> int:
     p.add_argument("--n-per-class", type=int, default=300)
     p.add_argument("--max-samples", type=int, default=20)
     p.add_argument("--device", type=int, default=None)
-    p.add_argument("--out", type=Path, default=Path("artifacts/shap_experiment_artifacts.pkl"))
+    p.add_argument("--out", type=Path, default=Path("artifacts/shap_experiment"))
+    p.add_argument(
+        "--workers", type=int, default=1, help="Processes explaining datasets in parallel"
+    )
+    p.add_argument("--checkpoint-dir", type=Path, default=Path("artifacts/checkpoints"))
+    p.add_argument("--resume", action="store_true", help="Skip datasets with a matching checkpoint")
     args = p.parse_args()
 
     artifacts = run_global_stability(
@@ -228,8 +606,11 @@ def main() -> int:
         n_per_class=args.n_per_class,
         max_samples=args.max_samples,
         device=args.device,
+        workers=args.workers,
+        checkpoint_dir=args.checkpoint_dir,
+        resume=args.resume,
     )
-    save_pickle(artifacts, args.out)
+    save_artifacts(artifacts, args.out)
     print(json.dumps(artifacts["summary"], indent=2))
     print(f"Saved: {args.out}")
     return 0
@@ -0,0 +1,206 @@
+"""Token budgets for prompt templates."""
+
+import math
+from collections import Counter
+from collections.abc import Iterable, Mapping, Sequence
+from dataclasses import dataclass
+
+from aup.errors import TemplateError, ValidationError
+from aup.tokens.estimate import estimate_tokens
+from aup.tokens.providers import Tokenizer
+
+TRUNCATION_MODES = ("head", "tail", "middle")
+
+
+@dataclass(frozen=True)
+class TruncationPolicy:
+    """
+    How a variable may be shortened to fit a token budget.
+
+    Attributes:
+        variable: Variable name
+        mode: Where text is removed: "head" drops the start (keeps the end),
+            "tail" drops the end (keeps the start), "middle" keeps both ends
+        min_tokens: Never shorten the variable below this many tokens
+        marker: Text inserted where content was removed (left out if it would
+            push the variable below min_tokens)
+    """
+
+    variable: str
+    mode: str = "tail"
+    min_tokens: int = 0
+    marker: str = "..."
+
+    def __post_init__(self) -> None:
+        if self.mode not in TRUNCATION_MODES:
+            raise ValueError(f"mode must be one of {', '.join(TRUNCATION_MODES)}")
+        if self.min_tokens < 0:
+            raise ValueError("min_tokens must be non-negative")
+
+
+class TokenBudget:
+    """
+    Fits template variables into a maximum token count.
+
+    Static text is counted once, segment by segment, when the budget is
+    built; each render counts only the variable values. Counts are summed
+    per segment, so with a real tokenizer the total can differ from a count
+    of the joined text by about a token per segment boundary.
+
+    When the total is over budget, variables are truncated in the order of
+    ``truncation`` until it fits, each truncated value being counted again
+    but nothing else.
+    """
+
+    def __init__(
+        self,
+        literals: Iterable[str],
+        names: Iterable[str],
+        max_tokens: int,
+        tokenizer: Tokenizer | None = None,
+        chars_per_token: float = 4.0,
+        truncation: Sequence[TruncationPolicy] = (),
+    ):
+        """
+        Initialize the budget.
+
+        Args:
+            literals: Static text segments of the template(s)
+            names: Variable name of every placeholder, repeated per occurrence
+            max_tokens: Maximum tokens across all rendered text
+            tokenizer: Tokenizer for exact counts (defaults to estimate_tokens)
+            chars_per_token: Characters per token for the estimator
+            truncation: Policies, in the order variables should be truncated
+
+        Raises:
+            ValueError: If max_tokens is less than 1
+            ValidationError: If a policy names a variable not in the template
+        """
+        if max_tokens < 1:
+            raise ValueError("max_tokens must be at least 1")
+
+        self.max_tokens = max_tokens
+        self.tokenizer = tokenizer
+        self.chars_per_token = chars_per_token
+        self.truncation = tuple(truncation)
+
+        self._occurrences = Counter(names)
+        for policy in self.truncation:
+            if policy.variable not in self._occurrences:
+                raise ValidationError(
+                    f"Truncation variable '{policy.variable}' not found in template(s)"
+                )
+        self.static_tokens = sum(self.count(literal) for literal in literals if literal)
+        self._marker_tokens = {
+            policy.marker: self.count(policy.marker) for policy in self.truncation
+        }
+
+    def count(self, text: str) -> int:
+        """Count the tokens in a piece of text."""
+        if self.tokenizer is not None:
+            return self.tokenizer.count_tokens(text)
+        return estimate_tokens(text, self.chars_per_token)
+
+    def total(self, values: Mapping[str, str]) -> int:
+        """
+        Token count of a render with the given values.
+
+        Placeholders without a value are counted as their placeholder text.
+        """
+        return self.static_tokens + sum(
+            occurrences * self.count(values[name] if name in values else "{{" + name + "}}")
+            for name, occurrences in self._occurrences.items()
+        )
+
+    def fit(self, values: Mapping[str, str]) -> Mapping[str, str]:
+        """
+        Truncate variables until a render fits the budget.
+
+        Args:
+            values: Variable values
+
+        Returns:
+            ``values`` itself if it already fits, else a copy with truncated values
+
+        Raises:
+            TemplateError: If the render cannot be brought within budget
+        """
+        counts = {
+            name: self.count(values[name] if name in values else "{{" + name + "}}")
+            for name in self._occurrences
+        }
+        total = self.static_tokens + sum(
+            occurrences * counts[name] for name, occurrences in self._occurrences.items()
+        )
+        excess = total - self.max_tokens
+        if excess <= 0:
+            return values
+
+        fitted = dict(values)
+        for policy in self.truncation:
+            name = policy.variable
+            if name not in fitted:
+                continue
+            occurrences = self._occurrences[name]
+            current = counts[name]
+            target = max(policy.min_tokens, current - math.ceil(excess / occurrences))
+            if target >= current:
+                continue
+            text, new = self._truncate(fitted[name], target, policy)
+            fitted[name] = text
+            counts[name] = new
+            excess -= occurrences * (current - new)
+            if excess <= 0:
+                return fitted
+
+        raise TemplateError(
+            f"Rendered template ({self.max_tokens + excess} tokens) exceeds "
+            f"max_tokens ({self.max_tokens}) after truncation"
+        )
+
+    def _truncate(self, text: str, target: int, policy: TruncationPolicy) -> tuple[str, int]:
+        """Shorten text to at most ``target`` tokens; returns the text and its count."""
+        attempts = [(policy.marker, target - self._marker_tokens[policy.marker])]
+        if policy.marker:
+            # Fall back to cutting without the marker if it leaves no room above the floor
+            attempts.append(("", target))
+        # Encode once; each attempt below only slices the ids
+        ids = self.tokenizer.encode(text) if self.tokenizer is not None else None
+        for marker, keep in attempts:
+            while keep > 0:
+                truncated = self._cut(text, ids, keep, policy.mode, marker)
+                count = self.count(truncated)
+                if count <= target:
+                    if count >= policy.min_tokens:
+                        return truncated, count
+                    break
+                # Token boundaries shifted at the cut; try again with the overshoot removed
+                keep -= count - target
+        if policy.min_tokens > 0:
+            raise TemplateError(
+                f"Cannot truncate '{policy.variable}' to {target} tokens "
+                f"without going below min_tokens ({policy.min_tokens})"
+            )
+        return "", 0
+
+    def _cut(self, text: str, ids: list[int] | None, keep: int, mode: str, marker: str) -> str:
+        """Keep ``keep`` tokens' worth of text (or of ``ids``, if encoded) and insert the marker."""
+        if self.tokenizer is not None and ids is not None:
+            if mode == "tail":
+                return self.tokenizer.decode(ids[:keep]) + marker
+            if mode == "head":
+                return marker + self.tokenizer.decode(ids[len(ids) - keep :])
+            head = (keep + 1) // 2
+            return (
+                self.tokenizer.decode(ids[:head])
+                + marker
+                + self.tokenizer.decode(ids[len(ids) - (keep - head) :])
+            )
+
+        chars = int(keep * self.chars_per_token)
+        if mode == "tail":
+            return text[:chars] + marker
+        if mode == "head":
+            return marker + text[len(text) - chars :]
+        head = (chars + 1) // 2
+        return text[:head] + marker + text[len(text) - (chars - head) :]
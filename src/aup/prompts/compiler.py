@@ -0,0 +1,373 @@
+"""Extended template language compiled to Python functions."""
+
+import hashlib
+import html
+import json
+import re
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Iterator, Mapping
+from typing import Any
+
+from aup.errors import TemplateError
+
+# {{ expr|filter }}, {% statement %} and {# comment #}
+_TAG_PATTERN = re.compile(r"\{\{(.*?)\}\}|\{%(.*?)%\}|\{#.*?#\}", re.DOTALL)
+_ENDRAW_PATTERN = re.compile(r"\{%\s*endraw\s*%\}")
+_PATH_PATTERN = re.compile(r"[A-Za-z_]\w*(?:\.\w+)*")
+_NAME_PATTERN = re.compile(r"[A-Za-z_]\w*")
+
+FILTERS: dict[str, Callable[[Any], str]] = {
+    "escape": lambda value: html.escape(str(value)),
+    "json": lambda value: json.dumps(value, ensure_ascii=False),
+    "strip": lambda value: str(value).strip(),
+    "upper": lambda value: str(value).upper(),
+    "lower": lambda value: str(value).lower(),
+}
+
+# Number of compiled templates kept by ExtendedTemplate
+COMPILE_CACHE_SIZE = 256
+
+# Generated render function, its Python source, and the context names it reads
+_Compiled = tuple[Callable[[Mapping[str, Any]], str], str, frozenset[str]]
+
+_cache: "OrderedDict[str, _Compiled]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _lookup(context: Mapping[str, Any], name: str) -> Any:
+    try:
+        return context[name]
+    except KeyError:
+        raise TemplateError(f"Undefined variable '{name}'") from None
+
+
+def _attribute(value: Any, key: str) -> Any:
+    if isinstance(value, Mapping):
+        if key in value:
+            return value[key]
+    elif hasattr(value, key):
+        return getattr(value, key)
+    raise TemplateError(f"'{type(value).__name__}' value has no field '{key}'")
+
+
+def _field(value: Any, key: str) -> Any:
+    if isinstance(value, Mapping):
+        return value.get(key)
+    return getattr(value, key, None)
+
+
+def _sequence(value: Any) -> Any:
+    return value if isinstance(value, (list, tuple)) else list(value)
+
+
+class _CodeWriter:
+    """Emits the body of the generated render function."""
+
+    def __init__(self) -> None:
+        self.lines: list[str] = []
+        self.indent = 1
+        self._pending: list[str] = []
+
+    def piece(self, expr: str) -> None:
+        """Queue an output expression; consecutive pieces are emitted together."""
+        self._pending.append(expr)
+
+    def flush(self) -> None:
+        if len(self._pending) == 1:
+            self.line(f"_a({self._pending[0]})")
+        elif self._pending:
+            self.line(f"_e(({', '.join(self._pending)},))")
+        self._pending = []
+
+    def line(self, code: str) -> None:
+        self.lines.append("    " * self.indent + code)
+
+    def statement(self, code: str) -> None:
+        self.flush()
+        self.line(code)
+
+
+class _Compiler:
+    """Single-use translator of template source into Python source."""
+
+    def __init__(self, partials: Mapping[str, str]):
+        self.partials = partials
+        self.writer = _CodeWriter()
+        self.variables: set[str] = set()
+        # Loop variables in scope, innermost last, with their local names
+        self.scope: list[tuple[str, str]] = []
+        self.loops: list[int] = []
+        self.including: list[str] = []
+        self.counter = 0
+
+    def compile(self, source: str) -> str:
+        self.emit(source)
+        self.writer.flush()
+        body = "\n".join(self.writer.lines)
+        return (
+            "def render(_ctx):\n"
+            "    _out = []\n"
+            "    _a = _out.append\n"
+            "    _e = _out.extend\n"
+            f"{body}\n"
+            "    return ''.join(_out)\n"
+        )
+
+    def emit(self, source: str) -> None:
+        """Translate a template (or partial) into statements."""
+        # Open blocks as (keyword, saw_else) so mismatched tags are caught
+        blocks: list[tuple[str, bool]] = []
+        pos = 0
+        while True:
+            match = _TAG_PATTERN.search(source, pos)
+            end = len(source) if match is None else match.start()
+            if end > pos:
+                self.writer.piece(repr(source[pos:end]))
+            if match is None:
+                break
+            pos = match.end()
+
+            expression, statement = match.group(1), match.group(2)
+            if expression is not None:
+                self.writer.piece(self.output(expression.strip()))
+            elif statement is not None:
+                words = statement.split()
+                if words == ["raw"]:
+                    raw_end = _ENDRAW_PATTERN.search(source, pos)
+                    if raw_end is None:
+                        raise TemplateError("Unclosed {% raw %} block")
+                    if raw_end.start() > pos:
+                        self.writer.piece(repr(source[pos : raw_end.start()]))
+                    pos = raw_end.end()
+                else:
+                    self.tag(words, statement.strip(), blocks)
+
+        if blocks:
+            raise TemplateError(f"Unclosed {{% {blocks[-1][0]} %}} block")
+
+    def tag(self, words: list[str], text: str, blocks: list[tuple[str, bool]]) -> None:
+        keyword = words[0] if words else ""
+        writer = self.writer
+        if keyword == "if":
+            writer.statement(f"if {self.condition(words[1:], text)}:")
+            writer.indent += 1
+            blocks.append(("if", False))
+        elif keyword in ("elif", "else"):
+            if not blocks or blocks[-1][0] != "if" or blocks[-1][1]:
+                raise TemplateError(f"Unexpected {{% {text} %}}")
+            writer.statement("pass")
+            writer.indent -= 1
+            if keyword == "elif":
+                writer.statement(f"elif {self.condition(words[1:], text)}:")
+            else:
+                writer.statement("else:")
+                blocks[-1] = ("if", True)
+            writer.indent += 1
+        elif keyword == "for":
+            if len(words) != 4 or words[2] != "in" or not _NAME_PATTERN.fullmatch(words[1]):
+                raise TemplateError(f"Invalid loop: {{% {text} %}}")
+            self.counter += 1
+            loop_id = self.counter
+            iterable = self.path(words[3], strict=True)
+            writer.statement(f"_s{loop_id} = _sequence({iterable})")
+            writer.statement(f"_n{loop_id} = len(_s{loop_id})")
+            writer.statement(f"for _i{loop_id}, _l{loop_id} in enumerate(_s{loop_id}, 1):")
+            writer.indent += 1
+            self.scope.append((words[1], f"_l{loop_id}"))
+            self.loops.append(loop_id)
+            blocks.append(("for", False))
+        elif keyword in ("endif", "endfor"):
+            if not blocks or blocks[-1][0] != keyword[3:]:
+                raise TemplateError(f"Unexpected {{% {text} %}}")
+            blocks.pop()
+            writer.statement("pass")
+            writer.indent -= 1
+            if keyword == "endfor":
+                self.scope.pop()
+                self.loops.pop()
+        elif keyword == "include":
+            if len(words) != 2:
+                raise TemplateError(f"Invalid include: {{% {text} %}}")
+            self.include(words[1].strip("\"'"))
+        else:
+            raise TemplateError(f"Unknown tag: {{% {text} %}}")
+
+    def include(self, name: str) -> None:
+        if name not in self.partials:
+            raise TemplateError(f"Unknown partial '{name}'")
+        if name in self.including:
+            raise TemplateError(f"Recursive include of partial '{name}'")
+        self.including.append(name)
+        self.emit(self.partials[name])
+        self.including.pop()
+
+    def output(self, expression: str) -> str:
+        """Python expression for a {{ ... }} tag."""
+        path, *filters = (part.strip() for part in expression.split("|"))
+        code = self.path(path, strict=True)
+        if not filters:
+            return f"_str({code})"
+        for name in filters:
+            if name not in FILTERS:
+                raise TemplateError(f"Unknown filter '{name}'")
+            code = f"_filters[{name!r}]({code})"
+        return code
+
+    def condition(self, words: list[str], text: str) -> str:
+        """Python expression for an if/elif test: paths joined by not/and/or."""
+        if not words:
+            raise TemplateError(f"Missing condition: {{% {text} %}}")
+        return " ".join(
+            word if word in ("not", "and", "or") else self.path(word, strict=False)
+            for word in words
+        )
+
+    def path(self, path: str, strict: bool) -> str:
+        """
+        Python expression for a dotted name.
+
+        Loop variables are plain locals; ``loop.index``, ``loop.first`` and
+        ``loop.last`` refer to the innermost loop. Other names are read from
+        the context. Missing names and fields raise TemplateError if
+        ``strict``, otherwise they evaluate to None.
+        """
+        if not _PATH_PATTERN.fullmatch(path):
+            raise TemplateError(f"Invalid expression '{path}'")
+        head, *fields = path.split(".")
+
+        local = next((code for name, code in reversed(self.scope) if name == head), None)
+        if head == "loop" and self.loops and local is None:
+            loop_id = self.loops[-1]
+            special = {
+                "index": f"_i{loop_id}",
+                "first": f"(_i{loop_id} == 1)",
+                "last": f"(_i{loop_id} == _n{loop_id})",
+            }
+            if len(fields) != 1 or fields[0] not in special:
+                raise TemplateError(f"Unknown loop attribute '{path}'")
+            return special[fields[0]]
+
+        if local is not None:
+            code = local
+        else:
+            self.variables.add(head)
+            code = f"_lookup(_ctx, {head!r})" if strict else f"_ctx.get({head!r})"
+        accessor = "_attribute" if strict else "_field"
+        for field in fields:
+            code = f"{accessor}({code}, {field!r})"
+        return code
+
+
+def _compile(source: str, partials: Mapping[str, str]) -> _Compiled:
+    """Compile a template, memoized by a hash of its source and partials."""
+    digest = hashlib.sha256(
+        json.dumps([source, sorted(partials.items())], ensure_ascii=False).encode("utf-8")
+    ).hexdigest()
+    with _cache_lock:
+        cached = _cache.get(digest)
+        if cached is not None:
+            _cache.move_to_end(digest)
+            return cached
+
+    compiler = _Compiler(partials)
+    code = compiler.compile(source)
+    namespace: dict[str, Any] = {
+        "_str": str,
+        "_lookup": _lookup,
+        "_attribute": _attribute,
+        "_field": _field,
+        "_sequence": _sequence,
+        "_filters": FILTERS,
+    }
+    exec(compile(code, f"<template {digest[:12]}>", "exec"), namespace)
+    entry = (namespace["render"], code, frozenset(compiler.variables))
+
+    with _cache_lock:
+        _cache[digest] = entry
+        while len(_cache) > COMPILE_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return entry
+
+
+def clear_compile_cache() -> None:
+    """Drop every compiled extended template."""
+    with _cache_lock:
+        _cache.clear()
+
+
+class ExtendedTemplate:
+    """
+    Template with conditionals, loops, partials and filters, compiled to Python.
+
+    Syntax:
+        - ``{{ name }}``, ``{{ item.field }}``: substitution (dotted access
+          works on mappings and attributes)
+        - ``{{ name|escape }}``: filters, chainable; see FILTERS
+        - ``{% if a %}...{% elif not b %}...{% else %}...{% endif %}``:
+          conditions over names joined by ``not``/``and``/``or``; undefined
+          names and missing fields are false
+        - ``{% for x in items %}...{% endfor %}``: loops, with
+          ``loop.index`` (from 1), ``loop.first`` and ``loop.last``
+        - ``{% include "name" %}``: inline a partial from ``partials``
+        - ``{% raw %}...{% endraw %}``: literal text; ``{# ... #}``: comment
+
+    The source is translated once into a Python function that appends
+    literals and values to a list and joins it, so a render does no parsing.
+    Compiled functions are cached by a hash of the source and partials, so
+    constructing the same template again is cheap.
+
+    Example:
+        >>> template = ExtendedTemplate(
+        ...     "{% include 'rules' %}"
+        ...     "{% for ex in examples %}Example {{ loop.index }}: {{ ex.q }} -> {{ ex.a }}\\n{% endfor %}"
+        ...     "{% if context %}Context: {{ context|strip }}\\n{% endif %}"
+        ...     "Q: {{ question }}",
+        ...     partials={"rules": "Answer briefly.\\n"},
+        ... )
+        >>> template.render(examples=[{"q": "1+1", "a": "2"}], question="2+2")
+        'Answer briefly.\\nExample 1: 1+1 -> 2\\nQ: 2+2'
+    """
+
+    def __init__(self, source: str, partials: Mapping[str, str] | None = None):
+        """
+        Compile a template.
+
+        Args:
+            source: Template source
+            partials: Named partial templates available to ``{% include %}``
+
+        Raises:
+            TemplateError: If the source is malformed
+        """
+        self.source = source
+        self._function, self.code, self.variables = _compile(source, partials or {})
+
+    def render(self, **kwargs: Any) -> str:
+        """
+        Render the template.
+
+        Args:
+            **kwargs: Variable values
+
+        Returns:
+            Rendered string
+
+        Raises:
+            TemplateError: If a substituted or looped-over variable is undefined
+        """
+        return self._function(kwargs)
+
+    def render_many(self, rows: Iterable[Mapping[str, Any]]) -> Iterator[str]:
+        """
+        Render the template against many rows of variables, lazily.
+
+        Args:
+            rows: Iterable of variable mappings
+
+        Yields:
+            One rendered string per row
+        """
+        function = self._function
+        for row in rows:
+            yield function(row)
@@ -0,0 +1,216 @@
+"""Incremental chat history with a sliding token window."""
+
+from collections import deque
+from collections.abc import Iterable, Iterator
+
+from aup.errors import ValidationError
+from aup.tokens.estimate import estimate_tokens
+from aup.tokens.providers import Tokenizer
+
+
+class Turn:
+    """A message and its cached token count."""
+
+    __slots__ = ("message", "tokens")
+
+    def __init__(self, message: dict[str, str], tokens: int):
+        self.message = message
+        self.tokens = tokens
+
+    @property
+    def role(self) -> str:
+        """Message role."""
+        return self.message["role"]
+
+    @property
+    def content(self) -> str:
+        """Message content."""
+        return self.message["content"]
+
+
+class Conversation:
+    """
+    Chat history that keeps itself within a token window.
+
+    Each message is counted once, when it is added, and the total is kept
+    as a running sum. When a new message pushes the total over
+    ``max_tokens``, the oldest turns are evicted from the front until it
+    fits; each turn is added and evicted at most once, so upkeep is O(1)
+    amortized per message. The system prompt is never evicted.
+
+    If ``placeholder`` is set, a message with that text stands in for the
+    evicted turns (counted against the budget) and can later be replaced
+    with a real summary via set_summary().
+
+    ``to_messages`` returns a new list each call but reuses the message
+    dicts; treat them as read-only.
+
+    Example:
+        >>> conversation = Conversation(
+        ...     system="You are a helpful assistant.",
+        ...     max_tokens=8000,
+        ...     placeholder="(Earlier conversation omitted.)",
+        ... )
+        >>> conversation.add("user", "Hello!")
+        >>> response = call_with_client(call, conversation.to_messages())
+        >>> conversation.add("assistant", response)
+    """
+
+    def __init__(
+        self,
+        system: str | None = None,
+        max_tokens: int | None = None,
+        tokenizer: Tokenizer | None = None,
+        chars_per_token: float = 4.0,
+        tokens_per_message: int = 4,
+        placeholder: str | None = None,
+        placeholder_role: str = "system",
+    ):
+        """
+        Initialize an empty conversation.
+
+        Args:
+            system: System prompt, always sent first
+            max_tokens: Token window for all messages (None means unbounded)
+            tokenizer: Tokenizer for exact counts (defaults to estimate_tokens)
+            chars_per_token: Characters per token when estimating
+            tokens_per_message: Formatting overhead added to every message's count
+            placeholder: Text of the message standing in for evicted turns
+            placeholder_role: Role of the placeholder message
+
+        Raises:
+            ValidationError: If the system prompt alone exceeds max_tokens
+        """
+        self.max_tokens = max_tokens
+        self.tokenizer = tokenizer
+        self.chars_per_token = chars_per_token
+        self.tokens_per_message = tokens_per_message
+        self.placeholder = placeholder
+        self.placeholder_role = placeholder_role
+
+        self._system = None if system is None else self._turn("system", system)
+        self._placeholder_tokens = (
+            0 if placeholder is None else self._turn(placeholder_role, placeholder).tokens
+        )
+        self._summary: Turn | None = None
+        self._turns: deque[Turn] = deque()
+        self._total = 0 if self._system is None else self._system.tokens
+        self.evicted = 0
+
+        if max_tokens is not None and self._total > max_tokens:
+            raise ValidationError(
+                f"System prompt ({self._total} tokens) exceeds max_tokens ({max_tokens})"
+            )
+
+    def count(self, text: str) -> int:
+        """Count the tokens in a piece of text, without message overhead."""
+        if self.tokenizer is not None:
+            return self.tokenizer.count_tokens(text)
+        return estimate_tokens(text, self.chars_per_token)
+
+    def _turn(self, role: str, content: str) -> Turn:
+        tokens = self.count(content) + self.tokens_per_message
+        return Turn({"role": role, "content": content}, tokens)
+
+    def add(self, role: str, content: str) -> Turn:
+        """
+        Append a message, evicting old turns if the window overflows.
+
+        Args:
+            role: Message role
+            content: Message content
+
+        Returns:
+            The stored Turn
+
+        Raises:
+            ValidationError: If the message cannot fit even with every other turn evicted
+        """
+        turn = self._turn(role, content)
+        if self.max_tokens is not None:
+            fixed = 0 if self._system is None else self._system.tokens
+            if self._total + turn.tokens > self.max_tokens and (self._summary or self._turns):
+                # Fitting evicts something, which brings in the placeholder
+                if self._summary is not None:
+                    fixed += self._summary.tokens
+                elif self.placeholder is not None:
+                    fixed += self._placeholder_tokens
+            if fixed + turn.tokens > self.max_tokens:
+                raise ValidationError(
+                    f"Message ({turn.tokens} tokens) cannot fit in max_tokens ({self.max_tokens})"
+                )
+
+        self._turns.append(turn)
+        self._total += turn.tokens
+        self._evict()
+        return turn
+
+    def extend(self, messages: Iterable[dict[str, str]]) -> None:
+        """Append several messages in order."""
+        for message in messages:
+            self.add(message["role"], message["content"])
+
+    def _evict(self) -> None:
+        """Drop turns from the front until the window fits (the newest turn stays)."""
+        if self.max_tokens is None:
+            return
+        while self._total > self.max_tokens and len(self._turns) > 1:
+            old = self._turns.popleft()
+            self._total -= old.tokens
+            self.evicted += 1
+            if self._summary is None and self.placeholder is not None:
+                self._summary = self._turn(self.placeholder_role, self.placeholder)
+                self._total += self._summary.tokens
+
+    def set_summary(self, content: str) -> None:
+        """
+        Replace the placeholder (or current summary) for evicted turns.
+
+        Turns are evicted again if the new summary is longer.
+
+        Args:
+            content: Summary text
+        """
+        if self._summary is not None:
+            self._total -= self._summary.tokens
+        self._summary = self._turn(self.placeholder_role, content)
+        self._total += self._summary.tokens
+        self._evict()
+
+    @property
+    def total_tokens(self) -> int:
+        """Tokens across every message that to_messages() would return."""
+        return self._total
+
+    @property
+    def turns(self) -> tuple[Turn, ...]:
+        """Turns currently in the window, oldest first."""
+        return tuple(self._turns)
+
+    def to_messages(self) -> list[dict[str, str]]:
+        """
+        Messages to send: system prompt, summary, then the window.
+
+        Returns:
+            List of message dictionaries with 'role' and 'content' keys
+        """
+        messages = []
+        if self._system is not None:
+            messages.append(self._system.message)
+        if self._summary is not None:
+            messages.append(self._summary.message)
+        messages.extend(turn.message for turn in self._turns)
+        return messages
+
+    def clear(self) -> None:
+        """Drop every turn and the summary, keeping the system prompt."""
+        self._turns.clear()
+        self._summary = None
+        self._total = 0 if self._system is None else self._system.tokens
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        return len(self._turns)
+
+    def __iter__(self) -> Iterator[Turn]:
+        return iter(self._turns)
@@ -1,5 +1,5 @@
 """Template rendering utilities (re-exported from template for convenience)."""
 
-from aup.prompts.template import render
+from aup.prompts.template import clear_render_cache, compile_template, render, render_cache_info
 
-__all__ = ["render"]
+__all__ = ["clear_render_cache", "compile_template", "render", "render_cache_info"]
@@ -0,0 +1,215 @@
+"""Directory-backed prompt template store with hot reload."""
+
+import json
+import threading
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+from aup.errors import AUPError, TemplateError
+from aup.prompts.template import PromptTemplate
+
+SUFFIXES = (".txt", ".json")
+
+# (mtime_ns, size) of a file when it was compiled
+_Signature = tuple[int, int]
+
+
+def load_template_file(path: str | Path) -> PromptTemplate:
+    """
+    Build a PromptTemplate from a file.
+
+    ``.txt`` files hold a user template. ``.json`` files hold an object with
+    PromptTemplate arguments: ``system``, ``user``, ``required_vars``,
+    ``max_length`` and ``max_tokens``.
+
+    Args:
+        path: Template file
+
+    Returns:
+        Compiled PromptTemplate
+
+    Raises:
+        TemplateError: If the file cannot be read or does not define a valid template
+    """
+    path = Path(path)
+    try:
+        text = path.read_text(encoding="utf-8")
+        if path.suffix == ".txt":
+            return PromptTemplate(user=text)
+        spec: Any = json.loads(text)
+        if not isinstance(spec, dict):
+            raise TemplateError("expected a JSON object")
+        allowed = {"system", "user", "required_vars", "max_length", "max_tokens"}
+        unknown = set(spec) - allowed
+        if unknown:
+            raise TemplateError(f"unknown keys: {', '.join(sorted(unknown))}")
+        return PromptTemplate(**spec)
+    except (OSError, ValueError, AUPError) as e:
+        raise TemplateError(f"Invalid template file {path}: {e}") from e
+
+
+class TemplateStore:
+    """
+    Prompt templates loaded from a directory and served from memory.
+
+    Every ``.txt`` and ``.json`` file under the directory (see
+    load_template_file) is compiled once and stored under its relative path
+    without suffix, e.g. ``support/greeting.json`` becomes
+    ``"support/greeting"``.
+
+    reload() compares each file's mtime and size with the version in memory,
+    recompiles only changed or new files, and publishes the result by
+    swapping in a new mapping in one assignment, so concurrent get() calls
+    see either the old or the new set, never a mix. A file that fails to
+    compile on reload keeps its previous version and is listed in
+    ``errors``. start() runs reload() periodically on a background thread.
+
+    Example:
+        >>> store = TemplateStore("prompts/").start(interval=2.0)
+        >>> messages = store["support/greeting"].to_messages({"name": "Ada"})
+    """
+
+    def __init__(self, directory: str | Path):
+        """
+        Load and compile every template in a directory.
+
+        Args:
+            directory: Directory to load, searched recursively
+
+        Raises:
+            TemplateError: If the directory is missing or a template is invalid
+        """
+        self.directory = Path(directory)
+        if not self.directory.is_dir():
+            raise TemplateError(f"Template directory not found: {self.directory}")
+
+        self.errors: dict[str, str] = {}
+        self._templates: dict[str, PromptTemplate] = {}
+        self._signatures: dict[str, _Signature] = {}
+        self._reload_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+        self._scan(strict=True)
+
+    def _files(self) -> dict[str, tuple[Path, _Signature]]:
+        files = {}
+        for path in sorted(self.directory.rglob("*")):
+            if path.suffix not in SUFFIXES or not path.is_file():
+                continue
+            name = path.relative_to(self.directory).with_suffix("").as_posix()
+            if name in files:
+                raise TemplateError(f"Template '{name}' is defined by more than one file")
+            stat = path.stat()
+            files[name] = (path, (stat.st_mtime_ns, stat.st_size))
+        return files
+
+    def _scan(self, strict: bool) -> list[str]:
+        with self._reload_lock:
+            files = self._files()
+            templates = dict(self._templates)
+            signatures = dict(self._signatures)
+            changed = []
+
+            for name in set(templates) - set(files):
+                del templates[name]
+                del signatures[name]
+                self.errors.pop(name, None)
+                changed.append(name)
+
+            for name, (path, signature) in files.items():
+                if signatures.get(name) == signature:
+                    continue
+                try:
+                    templates[name] = load_template_file(path)
+                except TemplateError as e:
+                    if strict:
+                        raise
+                    self.errors[name] = str(e)
+                    # Don't retry until the file changes again
+                    signatures[name] = signature
+                    continue
+                signatures[name] = signature
+                self.errors.pop(name, None)
+                changed.append(name)
+
+            # Publish in one assignment; readers never see a partial update
+            self._templates = templates
+            self._signatures = signatures
+            return sorted(changed)
+
+    def reload(self) -> list[str]:
+        """
+        Recompile templates whose files changed since the last load.
+
+        Returns:
+            Names of templates that were added, updated or removed
+        """
+        return self._scan(strict=False)
+
+    def get(self, name: str) -> PromptTemplate:
+        """
+        Look up a template by name.
+
+        Args:
+            name: Relative file path without suffix
+
+        Returns:
+            The compiled PromptTemplate
+
+        Raises:
+            KeyError: If no template has that name
+        """
+        return self._templates[name]
+
+    def __getitem__(self, name: str) -> PromptTemplate:
+        return self._templates[name]
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._templates
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(sorted(self._templates))
+
+    def __len__(self) -> int:
+        return len(self._templates)
+
+    def start(self, interval: float = 1.0) -> "TemplateStore":
+        """
+        Poll for changes on a background thread.
+
+        Args:
+            interval: Seconds between scans
+
+        Returns:
+            The store, for chaining
+        """
+        if self._thread is not None:
+            raise RuntimeError("TemplateStore is already watching")
+        self._stop.clear()
+
+        def watch() -> None:
+            while not self._stop.wait(interval):
+                try:
+                    self.reload()
+                except Exception:
+                    # Keep serving the current templates; try again next tick
+                    pass
+
+        self._thread = threading.Thread(target=watch, name="aup-template-store", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop polling."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> "TemplateStore":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.stop()
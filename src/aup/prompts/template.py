@@ -1,8 +1,108 @@
 """Prompt template implementation."""
 
+import hashlib
+import json
+import re
+import warnings
+from collections.abc import Iterable, Iterator, Mapping, Sequence, Set
+from dataclasses import dataclass
+from functools import lru_cache
 from typing import Any, Optional
 
-from aup.errors import TemplateError, ValidationError
+from aup.errors import PrefixCacheWarning, TemplateError, ValidationError
+from aup.prompts.budget import TokenBudget, TruncationPolicy
+from aup.tokens.providers import Tokenizer
+
+_VARIABLE_PATTERN = re.compile(r"\{\{(\w+)\}\}")
+
+# Rows of variable values, or columns of equal length keyed by variable name
+Rows = Iterable[Mapping[str, str]] | Mapping[str, Sequence[str]]
+
+# Number of distinct template strings kept compiled by render()
+RENDER_CACHE_SIZE = 256
+
+
+class CompiledTemplate:
+    """
+    A template string split once into literal and variable segments.
+
+    ``literals`` always has one more element than ``names``; rendering
+    interleaves them in a single ``"".join``. Substituted values are never
+    scanned for placeholders, and instances are immutable, so one compiled
+    template can be shared freely across threads.
+
+    Example:
+        >>> compiled = CompiledTemplate("Hello {{name}}!")
+        >>> compiled.render({"name": "World"})
+        'Hello World!'
+    """
+
+    __slots__ = ("source", "literals", "names", "variables")
+
+    def __init__(self, source: str):
+        """
+        Compile a template string.
+
+        Args:
+            source: Template string with {{var}} placeholders
+        """
+        parts = _VARIABLE_PATTERN.split(source)
+        self.source = source
+        self.literals: tuple[str, ...] = tuple(parts[0::2])
+        self.names: tuple[str, ...] = tuple(parts[1::2])
+        self.variables: frozenset[str] = frozenset(self.names)
+
+    def render(self, values: Mapping[str, str]) -> str:
+        """
+        Substitute variable values.
+
+        Placeholders without a value are left as-is.
+
+        Args:
+            values: Variable values
+
+        Returns:
+            Rendered string
+        """
+        if not self.names:
+            return self.source
+
+        literals = self.literals
+        out = [literals[0]]
+        for i, name in enumerate(self.names, 1):
+            value = values.get(name)
+            out.append("{{" + name + "}}" if value is None else value)
+            out.append(literals[i])
+        return "".join(out)
+
+
+@dataclass(frozen=True)
+class PrefixAnalysis:
+    """
+    Static-prefix layout of a PromptTemplate.
+
+    The static prefix is every message up to the first variable, plus the
+    literal text in front of that variable. It is byte-identical for every
+    render, so it is what provider-side prompt caches can reuse.
+
+    Attributes:
+        prefix: (role, text) pairs making up the static prefix
+        fingerprint: sha256 hex digest of the prefix, stable across processes
+        prefix_chars: Characters in the static prefix
+        static_chars: Characters of literal text in the whole template
+        first_variable: Name of the variable ending the prefix (None if fully static)
+    """
+
+    prefix: tuple[tuple[str, str], ...]
+    fingerprint: str
+    prefix_chars: int
+    static_chars: int
+    first_variable: str | None
+
+    @property
+    def reuse_ratio(self) -> float:
+        """Share of the template's literal text that falls in the static prefix."""
+        return self.prefix_chars / self.static_chars if self.static_chars else 1.0
 
 
 class PromptTemplate:
@@ -20,6 +120,16 @@ class PromptTemplate:
         ... )
         >>> rendered = template.render(role="teacher", topic="Python")
         >>> messages = template.to_messages(rendered_vars={"role": "teacher", "topic": "Python"})
+
+    With ``max_tokens``, renders that would exceed the budget are fitted by
+    truncating variables per ``truncation`` instead of failing:
+
+        >>> template = PromptTemplate(
+        ...     system="Answer from the document.",
+        ...     user="{{document}}\n\nQuestion: {{question}}",
+        ...     max_tokens=4000,
+        ...     truncation=[TruncationPolicy("document", mode="middle")],
+        ... )
     """
 
     def __init__(
@@ -28,6 +138,10 @@ class PromptTemplate:
         user: Optional[str] = None,
         required_vars: Optional[list[str]] = None,
         max_length: Optional[int] = None,
+        max_tokens: int | None = None,
+        tokenizer: Tokenizer | None = None,
+        chars_per_token: float = 4.0,
+        truncation: list[TruncationPolicy] | None = None,
     ):
         """
         Initialize a prompt template.
@@ -37,9 +151,15 @@ class PromptTemplate:
             user: User prompt template (optional)
             required_vars: List of required variable names
             max_length: Maximum total length of rendered prompts (optional)
+            max_tokens: Maximum total tokens of rendered prompts (optional)
+            tokenizer: Tokenizer used for max_tokens (defaults to estimate_tokens)
+            chars_per_token: Characters per token when estimating
+            truncation: Variables that may be truncated to fit max_tokens, in the
+                order they should be truncated
 
         Raises:
-            ValidationError: If neither system nor user is provided
+            ValidationError: If neither system nor user is provided, or a truncation
+                policy names an unknown variable
         """
         if system is None and user is None:
             raise ValidationError("At least one of 'system' or 'user' must be provided")
@@ -49,19 +169,37 @@ class PromptTemplate:
         self.required_vars = required_vars or []
         self.max_length = max_length
 
+        # Compile each template once; rendering reuses the segments
+        self._compiled: tuple[tuple[str, CompiledTemplate], ...] = tuple(
+            (role, CompiledTemplate(template))
+            for role, template in (("system", system), ("user", user))
+            if template
+        )
+        self._required = frozenset(self.required_vars)
+        self._prefix_analysis: PrefixAnalysis | None = None
+
         # Extract variables from templates
         self._extract_variables()
 
+        self.max_tokens = max_tokens
+        self._budget: TokenBudget | None = None
+        if max_tokens is not None:
+            self._budget = TokenBudget(
+                literals=(lit for _, compiled in self._compiled for lit in compiled.literals),
+                names=(name for _, compiled in self._compiled for name in compiled.names),
+                max_tokens=max_tokens,
+                tokenizer=tokenizer,
+                chars_per_token=chars_per_token,
+                truncation=truncation or [],
+            )
+        elif truncation:
+            raise ValidationError("truncation requires max_tokens")
+
     def _extract_variables(self) -> None:
         """Extract variable names from templates."""
-        import re
-
-        pattern = r"\{\{(\w+)\}\}"
-        found_vars = set()
-
-        for template in [self.system, self.user]:
-            if template:
-                found_vars.update(re.findall(pattern, template))
+        found_vars: set[str] = set()
+        for _, compiled in self._compiled:
+            found_vars.update(compiled.variables)
 
         # Validate that required_vars are present in templates
         for var in self.required_vars:
@@ -82,55 +220,156 @@ class PromptTemplate:
 
         Raises:
             ValidationError: If required variables are missing
-            TemplateError: If rendering exceeds max_length
+            TemplateError: If rendering exceeds max_length, or max_tokens after truncation
         """
-        # Check required variables
-        missing_vars = set(self.required_vars) - set(kwargs.keys())
+        self._check_required(kwargs.keys())
+        values: Mapping[str, str] = kwargs if self._budget is None else self._budget.fit(kwargs)
+        result = {role: compiled.render(values) for role, compiled in self._compiled}
+        if self.max_length:
+            self._check_length(result)
+        return result
+
+    def _check_required(self, names: Set[str], prefix: str = "") -> None:
+        missing_vars = self._required - names
         if missing_vars:
             raise ValidationError(
-                f"Missing required variables: {', '.join(sorted(missing_vars))}"
+                f"{prefix}Missing required variables: {', '.join(sorted(missing_vars))}"
+            )
+
+    def _check_length(self, result: dict[str, str], prefix: str = "") -> None:
+        assert self.max_length is not None
+        total_length = sum(len(v) for v in result.values())
+        if total_length > self.max_length:
+            raise TemplateError(
+                f"{prefix}Rendered template length ({total_length}) exceeds max_length ({self.max_length})"
             )
 
-        result: dict[str, str] = {}
+    def render_many(self, rows: Rows) -> Iterator[dict[str, str]]:
+        """
+        Render the template against many rows of variables, lazily.
 
-        for key, template in [("system", self.system), ("user", self.user)]:
-            if template:
-                rendered = self._render_template(template, kwargs)
-                result[key] = rendered
+        Required variables are checked once per distinct set of row keys
+        rather than once per row, so a stream of uniformly shaped rows (JSONL
+        records, csv.DictReader rows) only pays for substitution and the
+        max_length check.
 
-        # Check max_length
-        if self.max_length:
-            total_length = sum(len(v) for v in result.values())
-            if total_length > self.max_length:
-                raise TemplateError(
-                    f"Rendered template length ({total_length}) exceeds max_length ({self.max_length})"
-                )
+        Args:
+            rows: Iterable of variable mappings, or a mapping of variable name
+                to a sequence of values (all sequences the same length)
 
-        return result
+        Yields:
+            One render() result per row, in order
 
-    def _render_template(self, template: str, vars_dict: dict[str, str]) -> str:
+        Raises:
+            ValidationError: If a row is missing required variables, or columns differ in length
+            TemplateError: If a rendered row exceeds max_length or max_tokens
+
+        Example:
+            >>> with open("eval.jsonl") as f:
+            ...     for rendered in template.render_many(map(json.loads, f)):
+            ...         ...
+        """
+        if isinstance(rows, Mapping):
+            rows = _iter_columns(rows)
+
+        compiled = self._compiled
+        budget = self._budget
+        check_length = bool(self.max_length)
+        schema: Set[str] | None = None
+        for index, row in enumerate(rows):
+            keys = row.keys()
+            if schema is None or keys != schema:
+                self._check_required(keys, prefix=f"Row {index}: ")
+                schema = frozenset(keys)
+            if budget is not None:
+                row = budget.fit(row)
+            result = {role: template.render(row) for role, template in compiled}
+            if check_length:
+                self._check_length(result, prefix=f"Row {index}: ")
+            yield result
+
+    def to_messages_many(self, rows: Rows) -> Iterator[list[dict[str, str]]]:
         """
-        Render a single template string.
+        Render many rows straight to message lists, lazily.
 
         Args:
-            template: Template string with {{var}} placeholders
-            vars_dict: Dictionary of variable values
+            rows: Rows or columns, as accepted by render_many()
+
+        Yields:
+            One to_messages() result per row, in order
+
+        Raises:
+            ValidationError: If a row is missing required variables, or columns differ in length
+            TemplateError: If a rendered row exceeds max_length or max_tokens
+        """
+        for rendered in self.render_many(rows):
+            yield [{"role": role, "content": content} for role, content in rendered.items()]
+
+    def analyze_prefix(self) -> PrefixAnalysis:
+        """
+        Analyze the template into its longest static prefix.
+
+        The result is computed once per template. A PrefixCacheWarning is
+        issued when more literal text follows the first variable than
+        precedes it, i.e. when moving that variable later would let prompt
+        caching reuse most of the static text.
 
         Returns:
-            Rendered string
+            PrefixAnalysis with the prefix and its fingerprint
         """
-        result = template
-        for var_name, var_value in vars_dict.items():
-            placeholder = f"{{{{{var_name}}}}}"
-            result = result.replace(placeholder, var_value)
-        return result
+        if self._prefix_analysis is not None:
+            return self._prefix_analysis
+
+        prefix: list[tuple[str, str]] = []
+        first_variable: str | None = None
+        for role, compiled in self._compiled:
+            if first_variable is None:
+                if compiled.literals[0]:
+                    prefix.append((role, compiled.literals[0]))
+                if compiled.names:
+                    first_variable = compiled.names[0]
+
+        prefix_chars = sum(len(text) for _, text in prefix)
+        static_chars = sum(
+            len(literal) for _, compiled in self._compiled for literal in compiled.literals
+        )
+        canonical = json.dumps(prefix, ensure_ascii=False, separators=(",", ":"))
+        analysis = PrefixAnalysis(
+            prefix=tuple(prefix),
+            fingerprint=hashlib.sha256(canonical.encode("utf-8")).hexdigest(),
+            prefix_chars=prefix_chars,
+            static_chars=static_chars,
+            first_variable=first_variable,
+        )
+        self._prefix_analysis = analysis
+
+        if static_chars - prefix_chars > prefix_chars:
+            warnings.warn(
+                f"Variable '{{{{{first_variable}}}}}' precedes {static_chars - prefix_chars} of "
+                f"{static_chars} static characters; place variables after static text "
+                "so the prompt prefix can be cached",
+                PrefixCacheWarning,
+                stacklevel=2,
+            )
+        return analysis
 
-    def to_messages(self, rendered_vars: Optional[dict[str, str]] = None) -> list[dict[str, str]]:
+    def to_messages(
+        self,
+        rendered_vars: dict[str, str] | None = None,
+        split_prefix: bool = False,
+    ) -> list[dict[str, str]]:
         """
         Convert the template to a list of message dictionaries.
 
+        With ``split_prefix``, the message holding the first variable is split
+        in two: its static head (the tail of the static prefix) and the
+        rendered remainder, both with the same role. The static prefix then
+        consists of whole messages, where providers can place cache
+        breakpoints.
+
         Args:
             rendered_vars: Optional variable values. If provided, template is rendered first.
+            split_prefix: Emit the static prefix as separate leading message(s)
 
         Returns:
             List of message dictionaries with 'role' and 'content' keys
@@ -154,14 +393,92 @@ class PromptTemplate:
         if "user" in rendered:
             messages.append({"role": "user", "content": rendered["user"]})
 
+        if split_prefix:
+            messages = self._split_prefix(messages)
+        return messages
+
+    def _split_prefix(self, messages: list[dict[str, str]]) -> list[dict[str, str]]:
+        """Split the message holding the first variable at the end of the static prefix."""
+        for index, (role, compiled) in enumerate(self._compiled):
+            if not compiled.names:
+                continue
+            head = compiled.literals[0]
+            if not head:
+                return messages
+            rest = messages[index]["content"][len(head) :]
+            split = [{"role": role, "content": head}]
+            if rest:
+                split.append({"role": role, "content": rest})
+            return messages[:index] + split + messages[index + 1 :]
         return messages
 
 
+def _iter_columns(columns: Mapping[str, Sequence[str]]) -> Iterator[dict[str, str]]:
+    """Turn column-oriented variables into row dicts."""
+    names = tuple(columns)
+    lengths = {len(values) for values in columns.values()}
+    if len(lengths) > 1:
+        raise ValidationError("All columns must have the same length")
+    for values in zip(*columns.values(), strict=True):
+        yield dict(zip(names, values, strict=True))
+
+
+@lru_cache(maxsize=RENDER_CACHE_SIZE)
+def compile_template(template: str) -> CompiledTemplate:
+    """
+    Compile a template string, memoized in a bounded LRU keyed by its text.
+
+    Args:
+        template: Template string with {{var}} placeholders
+
+    Returns:
+        Shared CompiledTemplate for the string
+    """
+    return CompiledTemplate(template)
+
+
+@dataclass(frozen=True)
+class RenderCacheStats:
+    """
+    Point-in-time metrics for the compiled-template cache behind render().
+
+    Attributes:
+        hits: Renders that reused a compiled template
+        misses: Renders that had to compile their template
+        size: Compiled templates currently cached
+        max_size: Cache capacity
+    """
+
+    hits: int
+    misses: int
+    size: int
+    max_size: int
+
+
+def render_cache_info() -> RenderCacheStats:
+    """Return a snapshot of the render() cache's metrics."""
+    info = compile_template.cache_info()
+    return RenderCacheStats(
+        hits=info.hits,
+        misses=info.misses,
+        size=info.currsize,
+        max_size=info.maxsize or 0,
+    )
+
+
+def clear_render_cache() -> None:
+    """Drop every compiled template held by the render() cache."""
+    compile_template.cache_clear()
+
+
 # For backward compatibility and convenience
 def render(template: str, **kwargs: str) -> str:
     """
     Simple template rendering function.
 
+    The template is compiled on first use and kept in a bounded LRU, so
+    repeated renders of the same string only pay for substitution.
+
     Args:
         template: Template string with {{var}} placeholders
         **kwargs: Variable values
@@ -169,6 +486,4 @@ def render(template: str, **kwargs: str) -> str:
     Returns:
         Rendered string
     """
-    pt = PromptTemplate(user=template)
-    rendered = pt.render(**kwargs)
-    return rendered.get("user", "")
+    return compile_template(template).render(kwargs)
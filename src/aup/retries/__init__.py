@@ -1,6 +1,20 @@
 """Retry and fallback utilities."""
 
-from aup.retries.retry import fallback_models, with_retry
-
-__all__ = ["with_retry", "fallback_models"]
+from aup.retries.batch import BatchResult, with_retry_many
+from aup.retries.limiter import AdaptiveConcurrencyLimiter, LimiterStats, is_throttle_error
+from aup.retries.rate_limit import RateLimiter, RateLimits, Reservation
+from aup.retries.retry import fallback_models, with_retry, with_retry_async
 
+__all__ = [
+    "with_retry",
+    "with_retry_async",
+    "fallback_models",
+    "with_retry_many",
+    "BatchResult",
+    "AdaptiveConcurrencyLimiter",
+    "LimiterStats",
+    "is_throttle_error",
+    "RateLimiter",
+    "RateLimits",
+    "Reservation",
+]
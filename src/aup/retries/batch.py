@@ -0,0 +1,315 @@
+"""Concurrent batch execution with per-item retry."""
+
+import heapq
+import queue
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass
+from typing import Any, Generic, TypeVar
+
+from aup.retries.retry import backoff_delay
+
+T = TypeVar("T")
+
+# Sentinel put on the results queue by each worker when it exits
+_WORKER_DONE = object()
+
+
+class _WorkerError:
+    """Wraps a non-item failure (e.g. KeyboardInterrupt) raised inside a worker."""
+
+    __slots__ = ("error",)
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+# Upper bound on a single condition wait when an external cancel event is watched
+_CANCEL_POLL_INTERVAL = 0.1
+
+
+@dataclass(frozen=True)
+class BatchResult(Generic[T]):
+    """
+    Outcome of a single item in a with_retry_many batch.
+
+    Attributes:
+        index: Position of the item in the input iterable
+        value: Return value of the item (None if it failed)
+        error: Last exception raised by the item (None if it succeeded)
+        attempts: Number of attempts made for the item
+    """
+
+    index: int
+    value: T | None = None
+    error: Exception | None = None
+    attempts: int = 0
+
+    @property
+    def ok(self) -> bool:
+        """True if the item eventually succeeded."""
+        return self.error is None
+
+
+class _BatchScheduler(Generic[T]):
+    """
+    Shared scheduling state for with_retry_many workers.
+
+    New items are pulled lazily from the input iterator. Items waiting for
+    their backoff to elapse are parked on a heap ordered by due time, so no
+    worker ever sleeps on behalf of a single item: an idle worker either runs
+    the next due retry, starts a new item, or waits on the condition until
+    the earliest retry becomes due.
+    """
+
+    def __init__(
+        self,
+        funcs: Iterable[Callable[[], T]],
+        retries: int,
+        backoff: float,
+        jitter: bool,
+        retry_on: tuple[type[Exception], ...],
+        on_retry: Callable[[Exception, int], None] | None,
+        cancel_event: threading.Event | None,
+    ):
+        self._source = enumerate(funcs)
+        self._source_exhausted = False
+        self._retries = retries
+        self._backoff = backoff
+        self._jitter = jitter
+        self._retry_on = retry_on
+        self._on_retry = on_retry
+        self._cancel_event = cancel_event
+
+        self._cond = threading.Condition()
+        # Heap entries: (due_time, index, next_attempt, func, last_error)
+        self._delayed: list[tuple[float, int, int, Callable[[], T], Exception]] = []
+        self._running = 0
+        self._cancelled = False
+
+        self.results: queue.Queue[Any] = queue.Queue()
+        self.source_error: Exception | None = None
+
+    def cancel(self) -> None:
+        """Stop handing out work; delayed retries are reported as failures."""
+        with self._cond:
+            self._cancelled = True
+            self._cond.notify_all()
+
+    def _is_cancelled(self) -> bool:
+        if self._cancel_event is not None and self._cancel_event.is_set():
+            self._cancelled = True
+        return self._cancelled
+
+    def _flush_delayed(self) -> None:
+        """Report every parked retry with its last error (lock must be held)."""
+        while self._delayed:
+            _, index, attempt, _, error = heapq.heappop(self._delayed)
+            self.results.put(BatchResult(index, error=error, attempts=attempt))
+
+    def _next_task(self) -> tuple[int, Callable[[], T], int] | None:
+        """Block until there is work to run, or return None when the batch is done."""
+        with self._cond:
+            while True:
+                if self._is_cancelled():
+                    self._flush_delayed()
+                    return None
+
+                now = time.monotonic()
+                if self._delayed and self._delayed[0][0] <= now:
+                    _, index, attempt, func, _ = heapq.heappop(self._delayed)
+                    self._running += 1
+                    return index, func, attempt
+
+                if not self._source_exhausted:
+                    try:
+                        index, func = next(self._source)
+                    except StopIteration:
+                        self._source_exhausted = True
+                        continue
+                    except Exception as e:
+                        # A broken input iterator ends the batch
+                        self.source_error = e
+                        self._source_exhausted = True
+                        self._cancelled = True
+                        self._cond.notify_all()
+                        continue
+                    self._running += 1
+                    return index, func, 0
+
+                if self._delayed:
+                    timeout: float | None = self._delayed[0][0] - now
+                elif self._running:
+                    timeout = None
+                else:
+                    # Nothing queued, nothing running, nothing left to pull
+                    self._cond.notify_all()
+                    return None
+
+                if self._cancel_event is not None:
+                    timeout = min(timeout or _CANCEL_POLL_INTERVAL, _CANCEL_POLL_INTERVAL)
+                self._cond.wait(timeout)
+
+    def _attempt(self, index: int, func: Callable[[], T], attempt: int) -> BatchResult[T] | None:
+        """Run one attempt; returns None if the item was parked for a retry."""
+        try:
+            value = func()
+        except self._retry_on as e:
+            if attempt < self._retries and not self._is_cancelled():
+                if self._on_retry:
+                    try:
+                        self._on_retry(e, attempt + 1)
+                    except Exception as callback_error:
+                        return BatchResult(index, error=callback_error, attempts=attempt + 1)
+                due = time.monotonic() + backoff_delay(attempt, self._backoff, self._jitter)
+                with self._cond:
+                    heapq.heappush(self._delayed, (due, index, attempt + 1, func, e))
+                return None
+            return BatchResult(index, error=e, attempts=attempt + 1)
+        except Exception as e:
+            return BatchResult(index, error=e, attempts=attempt + 1)
+        return BatchResult(index, value=value, attempts=attempt + 1)
+
+    def worker(self) -> None:
+        """Worker loop: run tasks until the scheduler runs dry or is cancelled."""
+        try:
+            while True:
+                task = self._next_task()
+                if task is None:
+                    return
+
+                try:
+                    result = self._attempt(*task)
+                except BaseException as e:
+                    # Not an item failure; stop the batch and re-raise it in the consumer
+                    self.results.put(_WorkerError(e))
+                    self.cancel()
+                    return
+                finally:
+                    with self._cond:
+                        self._running -= 1
+                        self._cond.notify_all()
+                if result is not None:
+                    self.results.put(result)
+        finally:
+            self.results.put(_WORKER_DONE)
+
+
+def with_retry_many(
+    funcs: Iterable[Callable[[], T]],
+    max_workers: int = 8,
+    retries: int = 3,
+    backoff: float = 1.0,
+    jitter: bool = True,
+    retry_on: tuple[type[Exception], ...] = (Exception,),
+    on_retry: Callable[[Exception, int], None] | None = None,
+    ordered: bool = False,
+    fail_fast: bool = False,
+    cancel_event: threading.Event | None = None,
+) -> Iterator[BatchResult[T]]:
+    """
+    Run many independent calls concurrently, retrying each one with backoff.
+
+    A fixed pool of ``max_workers`` threads shares one scheduler. Failed items
+    are parked on a timer heap until their backoff elapses instead of sleeping
+    in a worker, so workers stay busy with other items in the meantime. The
+    input iterable is consumed lazily.
+
+    Failures do not stop the batch: an item that exhausts its retries (or
+    raises an exception outside ``retry_on``) is yielded as a BatchResult with
+    ``error`` set.
+
+    Closing the returned iterator (e.g. breaking out of a ``for`` loop) cancels
+    the batch: no new attempts are started and the close waits for calls that
+    are already running to return. Setting ``cancel_event`` has the same effect
+    from another thread; retries that were waiting on backoff are then yielded
+    as failures carrying their last error.
+
+    Args:
+        funcs: Iterable of zero-argument callables, one per item
+        max_workers: Number of worker threads
+        retries: Number of retry attempts per item (total attempts = retries + 1)
+        backoff: Base backoff time in seconds
+        jitter: If True, add random jitter to backoff time
+        retry_on: Tuple of exception types to retry on
+        on_retry: Optional callback called on each retry (receives exception and attempt
+            number); if it raises, the item fails with the callback's error
+        ordered: If True, yield results in input order instead of completion order
+        fail_fast: If True, cancel the batch and raise the error of the first item
+            that fails permanently
+        cancel_event: Optional event that cancels the batch when set
+
+    Returns:
+        Iterator of BatchResult objects
+
+    Raises:
+        ValueError: If max_workers is less than 1
+        Exception: The first permanent item error when fail_fast is True, or any
+            exception raised while iterating ``funcs``
+
+    Example:
+        >>> calls = [lambda c=c: summarize(c) for c in chunks]
+        >>> for result in with_retry_many(calls, max_workers=16, retries=3):
+        ...     if result.ok:
+        ...         summaries[result.index] = result.value
+    """
+    if max_workers < 1:
+        raise ValueError("max_workers must be at least 1")
+
+    scheduler: _BatchScheduler[T] = _BatchScheduler(
+        funcs, retries, backoff, jitter, retry_on, on_retry, cancel_event
+    )
+    return _iterate_results(scheduler, max_workers, ordered, fail_fast)
+
+
+def _iterate_results(
+    scheduler: _BatchScheduler[T],
+    max_workers: int,
+    ordered: bool,
+    fail_fast: bool,
+) -> Iterator[BatchResult[T]]:
+    """Start the workers and stream their results to the caller."""
+    threads = [
+        threading.Thread(target=scheduler.worker, name=f"aup-retry-many-{i}", daemon=True)
+        for i in range(max_workers)
+    ]
+    for thread in threads:
+        thread.start()
+
+    pending: dict[int, BatchResult[T]] = {}
+    next_index = 0
+    finished_workers = 0
+
+    try:
+        while finished_workers < len(threads):
+            item = scheduler.results.get()
+            if item is _WORKER_DONE:
+                finished_workers += 1
+                continue
+            if isinstance(item, _WorkerError):
+                raise item.error
+
+            if fail_fast and item.error is not None:
+                scheduler.cancel()
+                raise item.error
+
+            if not ordered:
+                yield item
+                continue
+
+            pending[item.index] = item
+            while next_index in pending:
+                yield pending.pop(next_index)
+                next_index += 1
+
+        if scheduler.source_error is not None:
+            raise scheduler.source_error
+
+        # Only reachable with gaps after a cancellation; flush what we have
+        for index in sorted(pending):
+            yield pending[index]
+    finally:
+        scheduler.cancel()
+        for thread in threads:
+            thread.join()
@@ -0,0 +1,369 @@
+"""Adaptive (AIMD) concurrency limiting for provider calls."""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Iterator
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass
+
+
+def is_throttle_error(exc: BaseException) -> bool:
+    """
+    Heuristically decide whether an exception means "rate limited".
+
+    Looks for an HTTP 429 status on the common attributes used by provider
+    SDKs and HTTP libraries (``status_code``, ``status``, ``code``).
+
+    Args:
+        exc: Exception raised by a provider call
+
+    Returns:
+        True if the exception carries a 429 status
+    """
+    for attr in ("status_code", "status", "code"):
+        if getattr(exc, attr, None) == 429:
+            return True
+    return False
+
+
+@dataclass(frozen=True)
+class LimiterStats:
+    """
+    Point-in-time metrics for an AdaptiveConcurrencyLimiter.
+
+    Attributes:
+        limit: Current in-flight limit
+        in_flight: Calls currently holding a permit
+        queue_depth: Callers waiting for a permit
+        successes: Total successful calls recorded
+        throttles: Total calls recorded as throttled
+        decreases: Number of times the limit was reduced
+        baseline_latency: Lowest smoothed latency observed, in seconds
+        recent_latency: Smoothed recent latency, in seconds
+    """
+
+    limit: int
+    in_flight: int
+    queue_depth: int
+    successes: int
+    throttles: int
+    decreases: int
+    baseline_latency: float | None
+    recent_latency: float | None
+
+
+class Permit:
+    """A slot held by one in-flight call."""
+
+    __slots__ = ("start", "released")
+
+    def __init__(self, start: float):
+        self.start = start
+        self.released = False
+
+
+class _Waiter:
+    """A queued caller, woken either through an event or an asyncio future."""
+
+    __slots__ = ("event", "loop", "future", "granted")
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop | None = None,
+        future: "asyncio.Future[None] | None" = None,
+    ):
+        self.event = threading.Event() if future is None else None
+        self.loop = loop
+        self.future = future
+        self.granted = False
+
+    def wake(self) -> None:
+        self.granted = True
+        if self.event is not None:
+            self.event.set()
+        elif self.loop is not None and self.future is not None:
+            self.loop.call_soon_threadsafe(_resolve, self.future)
+
+
+def _resolve(future: "asyncio.Future[None]") -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Concurrency limiter that finds the in-flight limit a provider sustains.
+
+    The limit follows AIMD (additive increase, multiplicative decrease):
+    every successful call grows the limit by ``increase / limit`` (about
+    ``increase`` per round of ``limit`` calls), and a throttled call or a
+    call whose latency exceeds ``latency_tolerance`` times the baseline
+    multiplies it by ``backoff_ratio``. Only calls that started after the
+    previous decrease can trigger another one, so a burst of 429s from one
+    congested window shrinks the limit once rather than collapsing it.
+
+    Waiting callers are served in FIFO order, whether they wait from a
+    thread (``acquire``/``slot``) or from a coroutine
+    (``acquire_async``/``slot_async``), so one limiter can be shared by the
+    sync and async retry paths.
+
+    Example:
+        >>> limiter = AdaptiveConcurrencyLimiter(initial_limit=8, max_limit=128)
+        >>> with limiter.slot():
+        ...     response = client_call(messages)
+        >>> limiter.stats().limit
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 256,
+        increase: float = 1.0,
+        backoff_ratio: float = 0.5,
+        latency_tolerance: float | None = 2.0,
+        latency_smoothing: float = 0.2,
+        throttle_on: tuple[type[BaseException], ...] = (),
+    ):
+        """
+        Initialize the limiter.
+
+        Args:
+            initial_limit: Starting in-flight limit
+            min_limit: Lower bound for the limit
+            max_limit: Upper bound for the limit
+            increase: Additive increase per round of ``limit`` successes
+            backoff_ratio: Factor applied to the limit on congestion (0 < ratio < 1)
+            latency_tolerance: Treat latency above baseline * tolerance as congestion.
+                None disables latency-based decreases.
+            latency_smoothing: EWMA weight given to each new latency sample
+            throttle_on: Exception types always treated as throttling, in addition
+                to anything is_throttle_error recognizes
+
+        Raises:
+            ValueError: If the limits or factors are out of range
+        """
+        if min_limit < 1:
+            raise ValueError("min_limit must be at least 1")
+        if max_limit < min_limit:
+            raise ValueError("max_limit must be greater than or equal to min_limit")
+        if not min_limit <= initial_limit <= max_limit:
+            raise ValueError("initial_limit must be between min_limit and max_limit")
+        if not 0 < backoff_ratio < 1:
+            raise ValueError("backoff_ratio must be between 0 and 1")
+        if not 0 < latency_smoothing <= 1:
+            raise ValueError("latency_smoothing must be in (0, 1]")
+
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.backoff_ratio = backoff_ratio
+        self.latency_tolerance = latency_tolerance
+        self.latency_smoothing = latency_smoothing
+        self.throttle_on = throttle_on
+
+        self._lock = threading.Lock()
+        self._limit = float(initial_limit)
+        self._in_flight = 0
+        self._waiters: deque[_Waiter] = deque()
+        self._last_decrease = float("-inf")
+        self._baseline: float | None = None
+        self._recent: float | None = None
+        self._successes = 0
+        self._throttles = 0
+        self._decreases = 0
+
+    @property
+    def limit(self) -> int:
+        """Current in-flight limit."""
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        """Number of calls currently holding a permit."""
+        return self._in_flight
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of callers waiting for a permit."""
+        return len(self._waiters)
+
+    def stats(self) -> LimiterStats:
+        """Return a snapshot of the limiter's metrics."""
+        with self._lock:
+            return LimiterStats(
+                limit=int(self._limit),
+                in_flight=self._in_flight,
+                queue_depth=len(self._waiters),
+                successes=self._successes,
+                throttles=self._throttles,
+                decreases=self._decreases,
+                baseline_latency=self._baseline,
+                recent_latency=self._recent,
+            )
+
+    def _has_capacity(self) -> bool:
+        return self._in_flight < int(self._limit)
+
+    def _grant_waiters(self) -> None:
+        """Hand free slots to queued callers in FIFO order (lock must be held)."""
+        while self._waiters and self._has_capacity():
+            waiter = self._waiters.popleft()
+            self._in_flight += 1
+            waiter.wake()
+
+    def acquire(self, timeout: float | None = None) -> Permit:
+        """
+        Block until a slot is free and take it.
+
+        Args:
+            timeout: Maximum time to wait in seconds (None waits forever)
+
+        Returns:
+            Permit to pass to release()
+
+        Raises:
+            TimeoutError: If no slot became free within timeout
+        """
+        with self._lock:
+            if not self._waiters and self._has_capacity():
+                self._in_flight += 1
+                return Permit(time.monotonic())
+            waiter = _Waiter()
+            self._waiters.append(waiter)
+
+        assert waiter.event is not None
+        if not waiter.event.wait(timeout):
+            with self._lock:
+                if not waiter.granted:
+                    self._waiters.remove(waiter)
+                    raise TimeoutError("Timed out waiting for a concurrency slot")
+        return Permit(time.monotonic())
+
+    async def acquire_async(self) -> Permit:
+        """
+        Wait (without blocking the event loop) until a slot is free and take it.
+
+        Returns:
+            Permit to pass to release()
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if not self._waiters and self._has_capacity():
+                self._in_flight += 1
+                return Permit(time.monotonic())
+            future: asyncio.Future[None] = loop.create_future()
+            waiter = _Waiter(loop, future)
+            self._waiters.append(waiter)
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self._lock:
+                if waiter.granted:
+                    # The slot was handed to us just as we were cancelled
+                    self._in_flight -= 1
+                    self._grant_waiters()
+                else:
+                    self._waiters.remove(waiter)
+            raise
+        return Permit(time.monotonic())
+
+    def release(self, permit: Permit, error: BaseException | None = None) -> None:
+        """
+        Return a slot and feed the call's outcome into the limit.
+
+        Args:
+            permit: Permit returned by acquire() or acquire_async()
+            error: Exception raised by the call, if any. Throttling errors shrink
+                the limit; other errors leave it unchanged.
+        """
+        now = time.monotonic()
+        with self._lock:
+            if permit.released:
+                return
+            permit.released = True
+            self._in_flight -= 1
+
+            if error is None:
+                self._on_success(permit, now)
+            elif isinstance(error, self.throttle_on) or is_throttle_error(error):
+                self._throttles += 1
+                self._decrease(permit, now)
+
+            self._grant_waiters()
+
+    def _on_success(self, permit: Permit, now: float) -> None:
+        self._successes += 1
+        latency = now - permit.start
+
+        if self._recent is None:
+            self._recent = latency
+        else:
+            alpha = self.latency_smoothing
+            self._recent = (1 - alpha) * self._recent + alpha * latency
+
+        if self._baseline is None or self._recent < self._baseline:
+            self._baseline = self._recent
+        else:
+            # Drift slowly upwards so a permanent latency shift is eventually accepted
+            self._baseline += (self._recent - self._baseline) * 0.01
+
+        if (
+            self.latency_tolerance is not None
+            and self._baseline > 0
+            and self._recent > self._baseline * self.latency_tolerance
+        ):
+            self._decrease(permit, now)
+            return
+
+        self._limit = min(float(self.max_limit), self._limit + self.increase / self._limit)
+
+    def _decrease(self, permit: Permit, now: float) -> None:
+        # Calls that started before the last decrease saw the old limit; ignore them
+        if permit.start < self._last_decrease:
+            return
+        self._limit = max(float(self.min_limit), self._limit * self.backoff_ratio)
+        self._last_decrease = now
+        self._decreases += 1
+
+    @contextmanager
+    def slot(self, timeout: float | None = None) -> Iterator[Permit]:
+        """
+        Context manager that holds a slot for the duration of a call.
+
+        Exceptions raised inside the block are recorded and re-raised.
+
+        Args:
+            timeout: Maximum time to wait for a slot in seconds
+
+        Example:
+            >>> with limiter.slot():
+            ...     result = client_call(messages)
+        """
+        permit = self.acquire(timeout)
+        try:
+            yield permit
+        except BaseException as e:
+            self.release(permit, e)
+            raise
+        self.release(permit)
+
+    @asynccontextmanager
+    async def slot_async(self) -> AsyncIterator[Permit]:
+        """
+        Async context manager that holds a slot for the duration of a call.
+
+        Example:
+            >>> async with limiter.slot_async():
+            ...     result = await client_call(messages)
+        """
+        permit = await self.acquire_async()
+        try:
+            yield permit
+        except BaseException as e:
+            self.release(permit, e)
+            raise
+        self.release(permit)
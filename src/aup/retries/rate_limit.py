@@ -0,0 +1,347 @@
+"""Token-bucket rate limiting on requests and tokens per minute."""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+
+from aup.tokens.estimate import estimate_tokens
+
+
+@dataclass(frozen=True)
+class RateLimits:
+    """
+    Per-model rate limits.
+
+    Attributes:
+        requests_per_minute: Maximum requests per minute (None for unlimited)
+        tokens_per_minute: Maximum tokens per minute (None for unlimited)
+    """
+
+    requests_per_minute: float | None = None
+    tokens_per_minute: float | None = None
+
+
+class _TokenBucket:
+    """A bucket holding up to one minute's allowance, refilled continuously."""
+
+    __slots__ = ("capacity", "rate", "level", "updated")
+
+    def __init__(self, per_minute: float, now: float):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = self.capacity
+        self.updated = now
+
+    def refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        # A request larger than the bucket waits for a full bucket rather than forever
+        deficit = min(amount, self.capacity) - self.level
+        return deficit / self.rate if deficit > 0 else 0.0
+
+
+class _ModelState:
+    """Buckets and wait queue for one model."""
+
+    __slots__ = ("requests", "tokens", "queue", "async_waiters")
+
+    def __init__(self, limits: RateLimits, now: float):
+        self.requests = (
+            _TokenBucket(limits.requests_per_minute, now) if limits.requests_per_minute else None
+        )
+        self.tokens = (
+            _TokenBucket(limits.tokens_per_minute, now) if limits.tokens_per_minute else None
+        )
+        self.queue: deque[object] = deque()
+        self.async_waiters: list[tuple[asyncio.AbstractEventLoop, asyncio.Future[None]]] = []
+
+    def delay(self, cost: int, now: float) -> float:
+        """Seconds until a request of ``cost`` tokens fits in both buckets."""
+        delay = 0.0
+        if self.requests is not None:
+            self.requests.refill(now)
+            delay = max(delay, self.requests.wait_time(1))
+        if self.tokens is not None:
+            self.tokens.refill(now)
+            delay = max(delay, self.tokens.wait_time(cost))
+        return delay
+
+    def take(self, cost: int) -> None:
+        if self.requests is not None:
+            self.requests.level -= 1
+        if self.tokens is not None:
+            self.tokens.level -= cost
+
+
+@dataclass
+class Reservation:
+    """
+    Capacity taken for one request.
+
+    Attributes:
+        model: Model the request was charged against
+        tokens: Tokens currently charged for the request
+    """
+
+    model: str
+    tokens: int
+    _limiter: "RateLimiter" = field(repr=False, compare=False)
+
+    def reconcile(self, actual_tokens: int) -> None:
+        """Correct the token charge once the actual usage is known."""
+        self._limiter.reconcile(self, actual_tokens)
+
+
+def _resolve(future: "asyncio.Future[None]") -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class RateLimiter:
+    """
+    Paces calls to stay under per-model request and token rate limits.
+
+    Each model gets two token buckets, one for requests per minute and one
+    for tokens per minute. A request's token cost is pre-charged from an
+    estimate (``estimate_tokens`` over the message contents, unless given
+    explicitly) and corrected afterwards with ``Reservation.reconcile``.
+    Buckets may go negative after reconciliation; later callers then wait
+    for the debt to refill.
+
+    Callers waiting on the same model are served strictly in arrival order,
+    whether they wait with ``acquire`` (blocking) or ``acquire_async``.
+
+    Example:
+        >>> limiter = RateLimiter({
+        ...     "gpt-4": RateLimits(requests_per_minute=500, tokens_per_minute=30_000),
+        ... })
+        >>> reservation = limiter.acquire("gpt-4", messages)
+        >>> response = client_call(messages)
+        >>> reservation.reconcile(response.usage.total_tokens)
+    """
+
+    def __init__(
+        self,
+        limits: dict[str, RateLimits],
+        default: RateLimits | None = None,
+        chars_per_token: float = 4.0,
+    ):
+        """
+        Initialize the rate limiter.
+
+        Args:
+            limits: Mapping of model name to its limits
+            default: Limits for models not listed in ``limits`` (None rejects them)
+            chars_per_token: Characters per token used when estimating request cost
+        """
+        self.limits = dict(limits)
+        self.default = default
+        self.chars_per_token = chars_per_token
+        self._cond = threading.Condition()
+        self._states: dict[str, _ModelState] = {}
+
+    def _state(self, model: str) -> _ModelState:
+        state = self._states.get(model)
+        if state is None:
+            limits = self.limits.get(model, self.default)
+            if limits is None:
+                raise ValueError(f"No rate limits configured for model '{model}'")
+            state = self._states[model] = _ModelState(limits, time.monotonic())
+        return state
+
+    def estimate(self, messages: list[dict[str, str]]) -> int:
+        """
+        Estimate the token cost of a message list.
+
+        Args:
+            messages: List of message dictionaries
+
+        Returns:
+            Estimated token count
+        """
+        text = "".join(message.get("content", "") for message in messages)
+        return estimate_tokens(text, self.chars_per_token)
+
+    def _cost(self, messages: list[dict[str, str]] | None, tokens: int | None) -> int:
+        if tokens is not None:
+            return tokens
+        return self.estimate(messages) if messages else 0
+
+    def _notify(self, state: _ModelState) -> None:
+        """Wake every waiter on a model (lock must be held)."""
+        self._cond.notify_all()
+        for loop, future in state.async_waiters:
+            loop.call_soon_threadsafe(_resolve, future)
+        state.async_waiters.clear()
+
+    def _try_take(self, state: _ModelState, waiter: object, cost: int) -> float | None:
+        """
+        Charge the request if it is at the head of the queue and fits.
+
+        Returns None when the request was charged, otherwise the time to wait
+        (or infinity when other callers are ahead of it).
+        """
+        if state.queue[0] is not waiter:
+            return float("inf")
+        delay = state.delay(cost, time.monotonic())
+        if delay > 0:
+            return delay
+        state.take(cost)
+        state.queue.popleft()
+        self._notify(state)
+        return None
+
+    def acquire(
+        self,
+        model: str,
+        messages: list[dict[str, str]] | None = None,
+        tokens: int | None = None,
+        timeout: float | None = None,
+    ) -> Reservation:
+        """
+        Block until the request fits within the model's limits, then charge it.
+
+        Args:
+            model: Model name
+            messages: Messages used to estimate the token cost
+            tokens: Explicit token cost (overrides the estimate)
+            timeout: Maximum time to wait in seconds (None waits forever)
+
+        Returns:
+            Reservation for the charged capacity
+
+        Raises:
+            ValueError: If the model has no configured limits
+            TimeoutError: If the request could not be admitted within timeout
+        """
+        cost = self._cost(messages, tokens)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        waiter = object()
+
+        with self._cond:
+            state = self._state(model)
+            state.queue.append(waiter)
+            try:
+                while True:
+                    delay = self._try_take(state, waiter, cost)
+                    if delay is None:
+                        return Reservation(model, cost, self)
+                    if deadline is not None:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            raise TimeoutError(f"Timed out waiting for rate limit on '{model}'")
+                        delay = min(delay, remaining)
+                    self._cond.wait(None if delay == float("inf") else delay)
+            except BaseException:
+                if waiter in state.queue:
+                    state.queue.remove(waiter)
+                    self._notify(state)
+                raise
+
+    def try_acquire(
+        self,
+        model: str,
+        messages: list[dict[str, str]] | None = None,
+        tokens: int | None = None,
+    ) -> Reservation | None:
+        """
+        Charge the request only if it can be admitted immediately.
+
+        Never jumps ahead of callers that are already waiting.
+
+        Args:
+            model: Model name
+            messages: Messages used to estimate the token cost
+            tokens: Explicit token cost (overrides the estimate)
+
+        Returns:
+            Reservation if admitted, otherwise None
+        """
+        cost = self._cost(messages, tokens)
+        with self._cond:
+            state = self._state(model)
+            if state.queue or state.delay(cost, time.monotonic()) > 0:
+                return None
+            state.take(cost)
+            return Reservation(model, cost, self)
+
+    async def acquire_async(
+        self,
+        model: str,
+        messages: list[dict[str, str]] | None = None,
+        tokens: int | None = None,
+    ) -> Reservation:
+        """
+        Wait without blocking the event loop until the request fits, then charge it.
+
+        Wrap in ``asyncio.timeout`` to bound the wait.
+
+        Args:
+            model: Model name
+            messages: Messages used to estimate the token cost
+            tokens: Explicit token cost (overrides the estimate)
+
+        Returns:
+            Reservation for the charged capacity
+
+        Raises:
+            ValueError: If the model has no configured limits
+        """
+        cost = self._cost(messages, tokens)
+        loop = asyncio.get_running_loop()
+        waiter = object()
+
+        with self._cond:
+            state = self._state(model)
+            state.queue.append(waiter)
+
+        try:
+            while True:
+                with self._cond:
+                    delay = self._try_take(state, waiter, cost)
+                    if delay is None:
+                        return Reservation(model, cost, self)
+                    future: asyncio.Future[None] = loop.create_future()
+                    # Drop futures left behind by earlier timed-out waits
+                    state.async_waiters = [w for w in state.async_waiters if not w[1].done()]
+                    state.async_waiters.append((loop, future))
+
+                try:
+                    await asyncio.wait_for(future, None if delay == float("inf") else delay)
+                except TimeoutError:
+                    pass
+        except BaseException:
+            with self._cond:
+                if waiter in state.queue:
+                    state.queue.remove(waiter)
+                    self._notify(state)
+            raise
+
+    def reconcile(self, reservation: Reservation, actual_tokens: int) -> None:
+        """
+        Replace a reservation's estimated token charge with the actual usage.
+
+        Args:
+            reservation: Reservation returned by an acquire method
+            actual_tokens: Tokens the request actually consumed
+        """
+        with self._cond:
+            state = self._state(reservation.model)
+            if state.tokens is not None:
+                bucket = state.tokens
+                bucket.refill(time.monotonic())
+                bucket.level = min(
+                    bucket.capacity, bucket.level + reservation.tokens - actual_tokens
+                )
+            reservation.tokens = actual_tokens
+            self._notify(state)
+
+    def queue_depth(self, model: str) -> int:
+        """Number of callers waiting on a model."""
+        with self._cond:
+            state = self._states.get(model)
+            return len(state.queue) if state else 0
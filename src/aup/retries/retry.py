@@ -1,13 +1,34 @@
 """Retry logic with backoff and jitter."""
 
+import asyncio
 import random
 import time
-from collections.abc import Callable
+from collections.abc import Awaitable, Callable
 from typing import Any, TypeVar
 
+from aup.retries.limiter import AdaptiveConcurrencyLimiter
+
 T = TypeVar("T")
 
 
+def backoff_delay(attempt: int, backoff: float = 1.0, jitter: bool = True) -> float:
+    """
+    Compute the wait before the next attempt.
+
+    Args:
+        attempt: Zero-based index of the attempt that just failed
+        backoff: Base backoff time in seconds
+        jitter: If True, add random jitter (0 to 0.3 * wait time)
+
+    Returns:
+        Wait time in seconds
+    """
+    wait_time: float = backoff * (2**attempt)
+    if jitter:
+        wait_time += random.uniform(0, wait_time * 0.3)
+    return wait_time
+
+
 def with_retry(
     func: Callable[[], T],
     retries: int = 3,
@@ -15,6 +36,7 @@ def with_retry(
     jitter: bool = True,
     retry_on: tuple[type[Exception], ...] = (Exception,),
     on_retry: Callable[[Exception, int], None] | None = None,
+    limiter: AdaptiveConcurrencyLimiter | None = None,
 ) -> T:
     """
     Retry a function call with exponential backoff and optional jitter.
@@ -26,6 +48,8 @@ def with_retry(
         jitter: If True, add random jitter to backoff time
         retry_on: Tuple of exception types to retry on
         on_retry: Optional callback called on each retry (receives exception and attempt number)
+        limiter: Optional concurrency limiter; each attempt holds one of its slots
+            (backoff sleeps do not) and reports its outcome to it
 
     Returns:
         Result from successful function call
@@ -46,18 +70,15 @@ def with_retry(
 
     for attempt in range(retries + 1):
         try:
-            return func()
+            if limiter is None:
+                return func()
+            with limiter.slot():
+                return func()
         except retry_on as e:
             last_exception = e
 
             if attempt < retries:
-                # Calculate backoff time
-                wait_time = backoff * (2**attempt)
-
-                if jitter:
-                    # Add random jitter (0 to 0.3 * wait_time)
-                    jitter_amount = random.uniform(0, wait_time * 0.3)
-                    wait_time += jitter_amount
+                wait_time = backoff_delay(attempt, backoff, jitter)
 
                 if on_retry:
                     on_retry(e, attempt + 1)
@@ -73,10 +94,66 @@ def with_retry(
     raise RuntimeError("Unexpected error in with_retry")
 
 
+async def with_retry_async(
+    func: Callable[[], Awaitable[T]],
+    retries: int = 3,
+    backoff: float = 1.0,
+    jitter: bool = True,
+    retry_on: tuple[type[Exception], ...] = (Exception,),
+    on_retry: Callable[[Exception, int], None] | None = None,
+    limiter: AdaptiveConcurrencyLimiter | None = None,
+) -> T:
+    """
+    Async counterpart of with_retry.
+
+    Backoff waits use ``asyncio.sleep`` so the event loop keeps serving other
+    calls while this one waits.
+
+    Args:
+        func: Zero-argument callable returning an awaitable (e.g. ``lambda: client(messages)``)
+        retries: Number of retry attempts (total attempts = retries + 1)
+        backoff: Base backoff time in seconds
+        jitter: If True, add random jitter to backoff time
+        retry_on: Tuple of exception types to retry on
+        on_retry: Optional callback called on each retry (receives exception and attempt number)
+        limiter: Optional concurrency limiter; each attempt holds one of its slots
+
+    Returns:
+        Result from successful function call
+
+    Raises:
+        Last exception raised by func if all retries are exhausted
+
+    Example:
+        >>> result = await with_retry_async(
+        ...     lambda: async_call_api(),
+        ...     retries=3,
+        ...     retry_on=(ConnectionError,)
+        ... )
+    """
+    for attempt in range(retries + 1):
+        try:
+            if limiter is None:
+                return await func()
+            async with limiter.slot_async():
+                return await func()
+        except retry_on as e:
+            if attempt >= retries:
+                raise
+
+            wait_time = backoff_delay(attempt, backoff, jitter)
+            if on_retry:
+                on_retry(e, attempt + 1)
+            await asyncio.sleep(wait_time)
+
+    raise RuntimeError("Unexpected error in with_retry_async")
+
+
 def fallback_models(
     models: list[str],
     call_func: Callable[[str], T],
     retries_per_model: int = 1,
+    backoff: float = 1.0,
 ) -> T:
     """
     Try multiple models in sequence as fallbacks.
@@ -88,6 +165,7 @@ def fallback_models(
         models: List of model names to try in order
         call_func: Function that takes a model name and returns a result
         retries_per_model: Number of retries for each model before falling back
+        backoff: Base backoff time in seconds between retries of the same model
 
     Returns:
         Result from first successful model call
@@ -115,6 +193,7 @@ def fallback_models(
             return with_retry(
                 lambda m=model: call_func(m),
                 retries=retries_per_model,
+                backoff=backoff,
             )
         except Exception as e:
             last_exception = e
@@ -0,0 +1,122 @@
+"""Tests for the micro-batching dispatcher."""
+
+import asyncio
+import threading
+
+import pytest
+
+from aup.models import MicroBatcher
+
+
+def upper_batch(batches_seen):
+    def batch_call(batch):
+        batches_seen.append(len(batch))
+        return [messages[-1]["content"].upper() for messages in batch]
+
+    return batch_call
+
+
+def message(text):
+    return [{"role": "user", "content": text}]
+
+
+def test_results_routed_to_callers():
+    """Test that each caller receives its own response from a shared batch."""
+    batches = []
+    with MicroBatcher(upper_batch(batches), max_batch_size=10, max_wait=0.05) as batcher:
+        futures = [batcher.submit(message(f"item {i}")) for i in range(10)]
+        results = [f.result() for f in futures]
+
+    assert results == [f"ITEM {i}" for i in range(10)]
+    assert batches == [10]
+
+
+def test_max_batch_size():
+    """Test that batches never exceed max_batch_size."""
+    batches = []
+    with MicroBatcher(upper_batch(batches), max_batch_size=3, max_wait=0.05) as batcher:
+        futures = [batcher.submit(message("x")) for _ in range(7)]
+        for future in futures:
+            future.result()
+    assert max(batches) <= 3
+    assert sum(batches) == 7
+
+
+def test_max_batch_tokens():
+    """Test that batches are split by estimated tokens."""
+    batches = []
+    with MicroBatcher(upper_batch(batches), max_wait=0.05, max_batch_tokens=10) as batcher:
+        futures = [batcher.submit(message("x" * 20)) for _ in range(4)]  # 5 tokens each
+        for future in futures:
+            future.result()
+    assert batches == [2, 2]
+
+
+def test_sync_call_from_threads():
+    """Test the blocking ProviderCall interface from many threads."""
+    batches = []
+    results = []
+    with MicroBatcher(upper_batch(batches), max_wait=0.02) as batcher:
+        threads = [
+            threading.Thread(target=lambda: results.append(batcher(message("a")))) for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    assert results == ["A"] * 5
+    assert sum(batches) == 5
+
+
+def test_async_front_end():
+    """Test awaiting responses from an event loop."""
+    batches = []
+    batcher = MicroBatcher(upper_batch(batches), max_wait=0.02)
+
+    async def main():
+        return await asyncio.gather(*(batcher.acall(message(str(i))) for i in range(3)))
+
+    assert asyncio.run(main()) == ["0", "1", "2"]
+    batcher.close()
+
+
+def test_batch_errors_propagate():
+    """Test that a failing batch fails every request in it."""
+
+    def broken(batch):
+        raise ConnectionError("down")
+
+    with MicroBatcher(broken, max_wait=0.01) as batcher:
+        future = batcher.submit(message("x"))
+        with pytest.raises(ConnectionError):
+            future.result()
+
+
+def test_wrong_response_count():
+    """Test that a response count mismatch is reported."""
+    with MicroBatcher(lambda batch: [], max_wait=0.01) as batcher:
+        with pytest.raises(ValueError, match="responses"):
+            batcher(message("x"))
+
+
+def test_submit_after_close():
+    """Test error when submitting to a closed batcher."""
+    batcher = MicroBatcher(lambda batch: ["x"] * len(batch))
+    batcher.close()
+    with pytest.raises(RuntimeError, match="closed"):
+        batcher.submit(message("x"))
+
+
+def test_close_without_wait_still_answers_queued_requests():
+    """Test that close(wait=False) lets queued requests finish in the background."""
+    release = threading.Event()
+
+    def slow_batch(batch):
+        release.wait(5)
+        return [messages[-1]["content"] for messages in batch]
+
+    batcher = MicroBatcher(slow_batch, max_batch_size=2, max_wait=0.01, max_concurrent_batches=1)
+    futures = [batcher.submit(message(str(i))) for i in range(5)]
+    batcher.close(wait=False)
+    release.set()
+    assert [f.result(timeout=5) for f in futures] == ["0", "1", "2", "3", "4"]
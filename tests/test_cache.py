@@ -0,0 +1,98 @@
+"""Tests for exact-match response caching."""
+
+import time
+
+from aup.models import CachedProviderCall, ResponseCache, SQLiteCacheStore, cache_key
+
+MESSAGES = [{"role": "user", "content": "Hello"}]
+
+
+def counting_call():
+    calls = []
+
+    def call(messages):
+        calls.append(messages)
+        return f"response {len(calls)}"
+
+    return call, calls
+
+
+def test_cache_key_is_canonical():
+    """Test that key order does not change the hash but content does."""
+    a = cache_key([{"role": "user", "content": "Hi"}], {"model": "m", "temperature": 0})
+    b = cache_key([{"content": "Hi", "role": "user"}], {"temperature": 0, "model": "m"})
+    assert a == b
+    assert a != cache_key([{"role": "user", "content": "Hi"}], {"model": "other"})
+
+
+def test_cached_call_hits():
+    """Test that repeated requests are served from the cache."""
+    call, calls = counting_call()
+    cached = CachedProviderCall(call)
+    assert cached(MESSAGES) == "response 1"
+    assert cached(MESSAGES) == "response 1"
+    assert len(calls) == 1
+    stats = cached.cache.stats()
+    assert (stats.hits, stats.misses) == (1, 1)
+    assert stats.hit_rate == 0.5
+
+
+def test_bypass():
+    """Test that bypass skips the cache."""
+    call, calls = counting_call()
+    cached = CachedProviderCall(call, bypass=True)
+    cached(MESSAGES)
+    cached(MESSAGES)
+    assert len(calls) == 2
+    assert len(cached.cache) == 0
+
+
+def test_lru_eviction():
+    """Test that the least recently used entry is evicted."""
+    cache = ResponseCache(max_entries=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    cache.get("a")
+    cache.set("c", "3")
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+    assert cache.stats().evictions == 1
+
+
+def test_size_eviction():
+    """Test eviction by total size."""
+    cache = ResponseCache(max_entries=None, max_bytes=10)
+    cache.set("a", "x" * 6)
+    cache.set("b", "y" * 6)
+    assert cache.get("a") is None
+    assert cache.stats().size_bytes == 6
+
+
+def test_ttl_expiry():
+    """Test that entries expire after their TTL."""
+    cache = ResponseCache(ttl=0.01)
+    cache.set("a", "1")
+    time.sleep(0.02)
+    assert cache.get("a") is None
+    assert cache.stats().expirations == 1
+
+
+def test_sqlite_store_shared(tmp_path):
+    """Test that a second cache reads entries persisted by the first."""
+    path = tmp_path / "cache.sqlite3"
+    call, calls = counting_call()
+    CachedProviderCall(call, ResponseCache(store=SQLiteCacheStore(path)))(MESSAGES)
+
+    other = ResponseCache(store=SQLiteCacheStore(path))
+    assert CachedProviderCall(call, other)(MESSAGES) == "response 1"
+    assert len(calls) == 1
+    assert other.stats().store_hits == 1
+
+
+def test_sqlite_store_ttl(tmp_path):
+    """Test that expired entries are not returned by the store."""
+    store = SQLiteCacheStore(tmp_path / "cache.sqlite3")
+    store.set("a", "1", ttl=-1)
+    assert store.get("a") is None
+    store.set("b", "2", ttl=-1)
+    assert store.purge_expired() == 1
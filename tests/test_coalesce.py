@@ -0,0 +1,129 @@
+"""Tests for single-flight request coalescing."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from aup.models import AsyncSingleFlight, SingleFlight
+
+MESSAGES = [{"role": "user", "content": "Hello"}]
+
+
+def test_concurrent_identical_calls_share_one_upstream_call():
+    """Test that concurrent identical requests make one upstream call."""
+    calls = []
+
+    def slow(messages):
+        calls.append(messages)
+        time.sleep(0.05)
+        return "shared"
+
+    deduped = SingleFlight(slow)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(deduped(MESSAGES))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == ["shared"] * 8
+    assert len(calls) == 1
+    assert deduped.stats().coalesced == 7
+
+
+def test_errors_fan_out():
+    """Test that every waiter receives the leader's error."""
+
+    def failing(messages):
+        time.sleep(0.05)
+        raise ConnectionError("down")
+
+    deduped = SingleFlight(failing)
+    errors = []
+
+    def worker():
+        try:
+            deduped(MESSAGES)
+        except ConnectionError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(errors) == 4
+
+
+def test_sequential_calls_are_not_cached():
+    """Test that finished calls are not reused."""
+    calls = []
+    deduped = SingleFlight(lambda m: calls.append(m) or str(len(calls)))
+    assert deduped(MESSAGES) == "1"
+    assert deduped(MESSAGES) == "2"
+
+
+def test_async_coalescing():
+    """Test async coalescing of identical requests."""
+    calls = []
+
+    async def slow(messages):
+        calls.append(messages)
+        await asyncio.sleep(0.01)
+        return "shared"
+
+    deduped = AsyncSingleFlight(slow)
+
+    async def main():
+        return await asyncio.gather(*(deduped(MESSAGES) for _ in range(5)))
+
+    assert asyncio.run(main()) == ["shared"] * 5
+    assert len(calls) == 1
+
+
+def test_async_leader_cancellation_keeps_request_alive():
+    """Test that cancelling the leader does not cancel other waiters."""
+
+    async def slow(messages):
+        await asyncio.sleep(0.02)
+        return "shared"
+
+    deduped = AsyncSingleFlight(slow)
+
+    async def main():
+        leader = asyncio.ensure_future(deduped(MESSAGES))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(deduped(MESSAGES))
+        await asyncio.sleep(0)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert asyncio.run(main()) == "shared"
+
+
+def test_async_all_waiters_cancelled_cancels_upstream():
+    """Test that the upstream call is cancelled once nobody waits for it."""
+    cancelled = []
+
+    async def slow(messages):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+        return "never"
+
+    deduped = AsyncSingleFlight(slow)
+
+    async def main():
+        task = asyncio.ensure_future(deduped(MESSAGES))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        await asyncio.sleep(0.01)
+
+    asyncio.run(main())
+    assert cancelled == [True]
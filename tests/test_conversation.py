@@ -0,0 +1,105 @@
+"""Tests for the sliding-window conversation builder."""
+
+import pytest
+
+from aup.errors import ValidationError
+from aup.prompts import Conversation
+
+
+class WordTokenizer:
+    """One token per whitespace-separated word, counting calls."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def encode(self, text):
+        return list(range(len(text.split())))
+
+    def decode(self, token_ids):
+        return " ".join("w" for _ in token_ids)
+
+    def count_tokens(self, text):
+        self.calls += 1
+        return len(text.split())
+
+
+def test_running_total_and_messages():
+    """Test that messages are counted once and emitted in order."""
+    tokenizer = WordTokenizer()
+    conversation = Conversation(system="be nice", tokenizer=tokenizer, tokens_per_message=1)
+    conversation.add("user", "hi there")
+    conversation.add("assistant", "hello")
+    assert conversation.total_tokens == 3 + 3 + 2
+    assert conversation.to_messages() == [
+        {"role": "system", "content": "be nice"},
+        {"role": "user", "content": "hi there"},
+        {"role": "assistant", "content": "hello"},
+    ]
+    calls = tokenizer.calls
+    conversation.to_messages()
+    assert tokenizer.calls == calls
+
+
+def test_messages_are_reused():
+    """Test that to_messages does not copy unchanged messages."""
+    conversation = Conversation()
+    conversation.add("user", "hi")
+    first = conversation.to_messages()
+    conversation.add("assistant", "hello")
+    second = conversation.to_messages()
+    assert second[0] is first[0]
+
+
+def test_sliding_window_eviction():
+    """Test that the oldest turns are evicted to fit the window."""
+    conversation = Conversation(
+        system="sys", max_tokens=6, tokenizer=WordTokenizer(), tokens_per_message=0
+    )
+    for word in ["a b", "c d", "e f", "g h i"]:
+        conversation.add("user", word)
+    assert [turn.content for turn in conversation] == ["e f", "g h i"]
+    assert conversation.evicted == 2
+    assert conversation.total_tokens == 6
+
+
+def test_placeholder_and_summary():
+    """Test the placeholder for evicted turns and replacing it with a summary."""
+    conversation = Conversation(
+        max_tokens=5,
+        tokenizer=WordTokenizer(),
+        tokens_per_message=0,
+        placeholder="[omitted]",
+    )
+    conversation.extend(
+        [{"role": "user", "content": "a b"}, {"role": "assistant", "content": "c d"}]
+    )
+    conversation.add("user", "e f")
+    messages = conversation.to_messages()
+    assert messages[0] == {"role": "system", "content": "[omitted]"}
+    assert [m["content"] for m in messages[1:]] == ["c d", "e f"]
+    assert conversation.total_tokens == 5
+
+    conversation.set_summary("user said a b twice")
+    assert [m["content"] for m in conversation.to_messages()] == ["user said a b twice", "e f"]
+    assert conversation.total_tokens == 7
+
+
+def test_oversized_message_rejected():
+    """Test that a message that can never fit is rejected."""
+    conversation = Conversation(
+        system="s", max_tokens=3, tokenizer=WordTokenizer(), tokens_per_message=0
+    )
+    with pytest.raises(ValidationError, match="cannot fit"):
+        conversation.add("user", "one two three four")
+    assert len(conversation) == 0
+
+
+def test_message_that_fits_without_eviction_is_accepted():
+    """Test that the placeholder is only charged when the new message forces an eviction."""
+    conversation = Conversation(
+        system="s" * 36, max_tokens=100, tokens_per_message=0, placeholder="p" * 80
+    )
+    conversation.add("user", "u" * 20)
+    conversation.add("assistant", "a" * 300)
+    assert conversation.total_tokens == 89
+    assert conversation.evicted == 0
@@ -0,0 +1,130 @@
+"""Tests for adaptive concurrency limiting."""
+
+import asyncio
+import threading
+
+import pytest
+
+from aup.retries import AdaptiveConcurrencyLimiter, is_throttle_error, with_retry, with_retry_async
+
+
+class RateLimited(Exception):
+    """Fake provider 429 error."""
+
+    status_code = 429
+
+
+def test_is_throttle_error():
+    """Test detection of 429-style errors."""
+    assert is_throttle_error(RateLimited())
+    assert not is_throttle_error(ValueError())
+
+
+def test_additive_increase():
+    """Test that successes grow the limit."""
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=2, max_limit=10, latency_tolerance=None)
+    for _ in range(10):
+        with limiter.slot():
+            pass
+    assert limiter.limit > 2
+
+
+def test_multiplicative_decrease_on_throttle():
+    """Test that a throttling error halves the limit."""
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=8)
+    with pytest.raises(RateLimited):
+        with limiter.slot():
+            raise RateLimited()
+    assert limiter.limit == 4
+    assert limiter.stats().throttles == 1
+
+
+def test_other_errors_do_not_shrink_limit():
+    """Test that non-throttling errors leave the limit unchanged."""
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=8)
+    with pytest.raises(ValueError):
+        with limiter.slot():
+            raise ValueError()
+    assert limiter.limit == 8
+
+
+def test_one_decrease_per_congestion_window():
+    """Test that calls started before a decrease do not shrink the limit again."""
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=8)
+    permits = [limiter.acquire() for _ in range(4)]
+    for permit in permits:
+        limiter.release(permit, RateLimited())
+    assert limiter.limit == 4
+    assert limiter.stats().decreases == 1
+
+
+def test_blocks_at_limit():
+    """Test that acquire waits once the limit is reached."""
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=1, max_limit=1)
+    permit = limiter.acquire()
+    with pytest.raises(TimeoutError):
+        limiter.acquire(timeout=0.01)
+
+    acquired = threading.Event()
+
+    def waiter():
+        limiter.release(limiter.acquire())
+        acquired.set()
+
+    thread = threading.Thread(target=waiter)
+    thread.start()
+    assert not acquired.wait(0.02)
+    assert limiter.queue_depth == 1
+    limiter.release(permit)
+    thread.join(1)
+    assert acquired.is_set()
+    assert limiter.in_flight == 0
+
+
+def test_async_slot():
+    """Test that async callers share the limit."""
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=2, max_limit=2)
+    peak = [0]
+
+    async def call():
+        async with limiter.slot_async():
+            peak[0] = max(peak[0], limiter.in_flight)
+            await asyncio.sleep(0.005)
+
+    async def main():
+        await asyncio.gather(*(call() for _ in range(10)))
+
+    asyncio.run(main())
+    assert peak[0] == 2
+    assert limiter.in_flight == 0
+
+
+def test_with_retry_reports_to_limiter():
+    """Test with_retry integration."""
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=8)
+    attempts = [0]
+
+    def func():
+        attempts[0] += 1
+        if attempts[0] == 1:
+            raise RateLimited()
+        return "ok"
+
+    assert with_retry(func, retries=2, backoff=0.01, limiter=limiter) == "ok"
+    assert limiter.limit == 4
+    assert limiter.in_flight == 0
+
+
+def test_with_retry_async():
+    """Test async retry with backoff."""
+    attempts = [0]
+
+    async def func():
+        attempts[0] += 1
+        if attempts[0] < 3:
+            raise ConnectionError("down")
+        return "ok"
+
+    result = asyncio.run(with_retry_async(func, retries=3, backoff=0.01))
+    assert result == "ok"
+    assert attempts[0] == 3
@@ -0,0 +1,143 @@
+"""Tests for the mock provider and load-test harness."""
+
+import json
+
+import pytest
+
+from aup.loadtest import (
+    LatencyModel,
+    MockHTTPServer,
+    MockProvider,
+    MockProviderError,
+    http_provider,
+    http_stream_provider,
+    load_trace,
+    percentile,
+    run_load,
+)
+from aup.retries import is_throttle_error
+
+MESSAGES = [{"role": "user", "content": "Hello"}]
+FAST = LatencyModel("fixed", mean=0.0)
+
+
+def test_mock_provider_echo_and_stream():
+    """Test plain and streaming responses."""
+    provider = MockProvider(latency=FAST, chunk_size=3)
+    assert provider(MESSAGES) == "Echo: Hello"
+    assert "".join(provider.stream(MESSAGES)) == "Echo: Hello"
+    assert list(provider.stream(MESSAGES))[0] == "Ech"
+
+
+def test_mock_provider_is_deterministic_with_seed():
+    """Test that failures are reproducible with a seed."""
+
+    def outcomes(seed):
+        provider = MockProvider(latency=FAST, throttle_rate=0.3, error_rate=0.2, seed=seed)
+        result = []
+        for _ in range(50):
+            try:
+                provider(MESSAGES)
+                result.append(200)
+            except MockProviderError as e:
+                result.append(e.status_code)
+        return result
+
+    assert outcomes(1) == outcomes(1)
+    assert {429, 500, 200} == set(outcomes(1))
+
+
+def test_throttle_errors_are_recognized():
+    """Test that injected 429s look like throttling to the limiter."""
+    provider = MockProvider(latency=FAST, throttle_rate=1.0)
+    with pytest.raises(MockProviderError) as exc_info:
+        provider(MESSAGES)
+    assert is_throttle_error(exc_info.value)
+
+
+def test_latency_distributions():
+    """Test latency sampling."""
+    import random
+
+    rng = random.Random(0)
+    samples = [LatencyModel("lognormal", mean=0.1, spread=0.3).sample(rng) for _ in range(2000)]
+    assert 0.09 < sum(samples) / len(samples) < 0.11
+    assert LatencyModel("fixed", mean=0.2).sample(rng) == 0.2
+    with pytest.raises(ValueError):
+        LatencyModel("bogus").sample(rng)
+
+
+def test_http_server_round_trip():
+    """Test the HTTP front-end for plain, streaming and failing calls."""
+    with MockHTTPServer(MockProvider(latency=FAST, chunk_size=2)) as server:
+        assert http_provider(server.url)(MESSAGES) == "Echo: Hello"
+        deltas = list(http_stream_provider(server.url)(MESSAGES))
+        assert "".join(deltas) == "Echo: Hello"
+        assert len(deltas) > 1
+
+    with MockHTTPServer(MockProvider(latency=FAST, throttle_rate=1.0)) as server:
+        with pytest.raises(MockProviderError) as exc_info:
+            http_provider(server.url)(MESSAGES)
+        assert exc_info.value.status_code == 429
+
+
+def test_run_load_modes(tmp_path):
+    """Test replaying a JSONL trace in each mode."""
+    trace = tmp_path / "trace.jsonl"
+    trace.write_text(
+        "\n".join(
+            json.dumps({"messages": [{"role": "user", "content": str(i)}]}) for i in range(40)
+        )
+    )
+    assert len(load_trace(trace)) == 40
+
+    flaky = MockProvider(latency=FAST, throttle_rate=0.3, seed=3)
+    plain = run_load(trace, flaky, concurrency=4)
+    assert plain.requests == 40
+    assert plain.failures > 0
+    assert plain.errors["MockProviderError"] == plain.failures
+
+    retried = run_load(
+        trace,
+        MockProvider(latency=FAST, throttle_rate=0.3, seed=3),
+        mode="retry",
+        retries=5,
+        backoff=0.0,
+    )
+    assert retried.failures == 0
+
+    models = {
+        "primary": MockProvider(latency=FAST, error_rate=1.0),
+        "backup": MockProvider(latency=FAST),
+    }
+    fallback = run_load(trace, mode="fallback", models=models, retries=0)
+    assert fallback.successes == 40
+    assert fallback.p50 <= fallback.p95 <= fallback.p99
+
+
+def test_fallback_mode_uses_backoff():
+    """Test that run_load's backoff applies to per-model retries in fallback mode."""
+    trace = [MESSAGES] * 3
+    models = {
+        "primary": MockProvider(latency=FAST, error_rate=1.0),
+        "backup": MockProvider(latency=FAST),
+    }
+    report = run_load(trace, mode="fallback", models=models, retries=2, backoff=0.0)
+    assert report.successes == 3
+    assert report.p99 < 0.5
+
+
+def test_run_load_validation():
+    """Test argument validation."""
+    with pytest.raises(ValueError, match="mode"):
+        run_load([], MockProvider(), mode="bogus")
+    with pytest.raises(ValueError, match="models"):
+        run_load([], mode="fallback")
+
+
+def test_percentile():
+    """Test nearest-rank percentiles."""
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile([], 50) == 0.0
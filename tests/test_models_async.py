@@ -0,0 +1,97 @@
+"""Tests for async provider calls and sync/async adapters."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from aup.models import (
+    LoopThread,
+    async_to_sync,
+    call_with_client,
+    call_with_client_async,
+    sync_to_async,
+)
+
+MESSAGES = [{"role": "user", "content": "Hello"}]
+
+
+def echo(messages):
+    return messages[-1]["content"]
+
+
+async def async_echo(messages):
+    await asyncio.sleep(0)
+    return messages[-1]["content"]
+
+
+def test_call_with_client_async():
+    """Test awaiting an async client."""
+    assert asyncio.run(call_with_client_async(async_echo, MESSAGES)) == "Hello"
+
+
+def test_sync_to_async_is_bounded():
+    """Test that the executor bounds concurrent blocking calls."""
+    active = [0]
+    peak = [0]
+    lock = threading.Lock()
+
+    def slow(messages):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.01)
+        with lock:
+            active[0] -= 1
+        return "done"
+
+    async_call = sync_to_async(slow, max_workers=2)
+
+    async def main():
+        return await asyncio.gather(*(async_call(MESSAGES) for _ in range(6)))
+
+    assert asyncio.run(main()) == ["done"] * 6
+    assert peak[0] == 2
+
+
+def test_async_to_sync():
+    """Test calling an async client from sync code."""
+    sync_call = async_to_sync(async_echo)
+    assert call_with_client(sync_call, MESSAGES) == "Hello"
+
+
+def test_async_to_sync_from_many_threads():
+    """Test that one loop thread serves concurrent sync callers."""
+    loop_thread = LoopThread()
+
+    async def slow(messages):
+        await asyncio.sleep(0.05)
+        return "done"
+
+    sync_call = async_to_sync(slow, loop_thread=loop_thread)
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(sync_call(MESSAGES))) for _ in range(10)
+    ]
+    start = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == ["done"] * 10
+    assert time.monotonic() - start < 0.4
+    loop_thread.stop()
+
+
+def test_loop_thread_timeout():
+    """Test that a timed-out call raises TimeoutError."""
+    loop_thread = LoopThread()
+
+    async def hang(messages):
+        await asyncio.sleep(10)
+        return "never"
+
+    with pytest.raises(TimeoutError):
+        async_to_sync(hang, loop_thread=loop_thread, timeout=0.01)(MESSAGES)
+    loop_thread.stop()
@@ -0,0 +1,118 @@
+"""Tests for the client-instance pool."""
+
+import threading
+import time
+
+import pytest
+
+from aup.models import ClientPool
+
+MESSAGES = [{"role": "user", "content": "Hello"}]
+
+
+class FakeClient:
+    """Client that records concurrent use and whether it was closed."""
+
+    instances = []
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.busy = False
+        self.closed = False
+        FakeClient.instances.append(self)
+
+    def __call__(self, messages):
+        assert not self.busy, "client shared between concurrent callers"
+        self.busy = True
+        time.sleep(0.005)
+        self.busy = False
+        if self.fail:
+            raise ConnectionError("broken client")
+        return "ok"
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture(autouse=True)
+def reset_instances():
+    FakeClient.instances = []
+
+
+def test_lazy_creation_and_reuse():
+    """Test that clients are created on demand and reused."""
+    pool = ClientPool(FakeClient, size=4)
+    assert pool.stats().created == 0
+    for _ in range(3):
+        assert pool(MESSAGES) == "ok"
+    assert pool.stats().created == 1
+
+
+def test_concurrent_callers_get_separate_clients():
+    """Test that no client is shared and the size bound holds."""
+    pool = ClientPool(FakeClient, size=3)
+    threads = [threading.Thread(target=pool, args=(MESSAGES,)) for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert 1 <= pool.stats().created <= 3
+
+
+def test_recycle_after_error():
+    """Test that a client that raised is closed and replaced."""
+    pool = ClientPool(lambda: FakeClient(fail=not FakeClient.instances), size=1)
+    with pytest.raises(ConnectionError):
+        pool(MESSAGES)
+    assert FakeClient.instances[0].closed
+    assert pool(MESSAGES) == "ok"
+    assert pool.stats().recycled == 1
+
+
+def test_max_uses():
+    """Test recycling after a number of calls."""
+    pool = ClientPool(FakeClient, size=1, max_uses=2)
+    for _ in range(4):
+        pool(MESSAGES)
+    assert pool.stats().created == 2
+
+
+def test_health_check_rejects_idle_client():
+    """Test that unhealthy idle clients are replaced at checkout."""
+    pool = ClientPool(
+        FakeClient, size=1, health_check=lambda client: client is not FakeClient.instances[0]
+    )
+    pool(MESSAGES)
+    pool(MESSAGES)
+    assert len(FakeClient.instances) == 2
+    assert FakeClient.instances[0].closed
+
+
+def test_acquire_timeout():
+    """Test bounded waiting for a free client."""
+    pool = ClientPool(FakeClient, size=1, acquire_timeout=0.01)
+    with pool.client():
+        with pytest.raises(TimeoutError):
+            pool(MESSAGES)
+        assert pool.stats().in_use == 1
+
+
+def test_close():
+    """Test that closing the pool closes idle clients."""
+    pool = ClientPool(FakeClient, size=2)
+    pool(MESSAGES)
+    pool.close()
+    assert FakeClient.instances[0].closed
+    with pytest.raises(RuntimeError, match="closed"):
+        pool(MESSAGES)
+
+
+def test_close_does_not_count_returned_clients_as_recycled():
+    """Test that a client returned to a closed pool is closed but not counted as recycled."""
+    pool = ClientPool(FakeClient, size=2)
+    with pool.client() as call:
+        pool.close()
+        call(MESSAGES)
+    assert FakeClient.instances[0].closed
+    assert pool.stats().recycled == 0
+    assert pool.stats().in_use == 0
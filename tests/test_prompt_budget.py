@@ -0,0 +1,145 @@
+"""Tests for token-budgeted prompt templates."""
+
+import pytest
+
+from aup.errors import TemplateError, ValidationError
+from aup.prompts import PromptTemplate, TruncationPolicy
+
+
+class WordTokenizer:
+    """One token per whitespace-separated word, counting calls."""
+
+    def __init__(self):
+        self.counted: list[str] = []
+
+    def encode(self, text):
+        return list(range(len(text.split())))
+
+    def decode(self, token_ids):
+        return " ".join(f"w{i}" for i in token_ids)
+
+    def count_tokens(self, text):
+        self.counted.append(text)
+        return len(text.split())
+
+
+def test_fits_without_truncation():
+    """Test that a render within budget is unchanged."""
+    template = PromptTemplate(user="Say {{x}}", max_tokens=5, tokenizer=WordTokenizer())
+    assert template.render(x="hello there")["user"] == "Say hello there"
+
+
+def test_truncation_modes():
+    """Test head, tail and middle truncation with the estimator (3 tokens = 12 chars)."""
+    text = "abcdefghijklmnopqrstuvwxyz" * 2
+    for mode, expected in [
+        ("tail", "abcdefghijkl..."),
+        ("head", "...opqrstuvwxyz"),
+        ("middle", "abcdef...uvwxyz"),
+    ]:
+        template = PromptTemplate(
+            user="{{doc}}",
+            max_tokens=3,
+            chars_per_token=4.0,
+            truncation=[TruncationPolicy("doc", mode=mode)],
+        )
+        assert template.render(doc=text)["user"] == expected
+
+
+def test_priority_order_and_min_tokens():
+    """Test that policies apply in order and respect min_tokens."""
+    tokenizer = WordTokenizer()
+    template = PromptTemplate(
+        system="Context: {{context}}",
+        user="Question: {{question}}",
+        max_tokens=8,
+        tokenizer=tokenizer,
+        truncation=[
+            TruncationPolicy("context", min_tokens=3, marker=""),
+            TruncationPolicy("question", marker=""),
+        ],
+    )
+    rendered = template.render(context="a b c d e f", question="q1 q2 q3 q4")
+    # Static text is 2 tokens; context stops at 3, question takes the rest
+    assert rendered["system"] == "Context: w0 w1 w2"
+    assert rendered["user"] == "Question: w0 w1 w2"
+
+
+def test_min_tokens_kept_when_marker_does_not_fit():
+    """Test that the floor is kept, without the marker, when the marker leaves no room."""
+    template = PromptTemplate(
+        user="Doc: {{doc}} Q: {{q}}",
+        max_tokens=4,
+        tokenizer=WordTokenizer(),
+        truncation=[TruncationPolicy("doc", min_tokens=1, marker=" [cut] ")],
+    )
+    assert template.render(doc="a b c d", q="why")["user"] == "Doc: w0 Q: why"
+
+
+def test_truncated_value_encoded_once():
+    """Test that retries after a boundary shift slice the ids instead of re-encoding."""
+
+    class MergingTokenizer(WordTokenizer):
+        """Counts a marker glued to a word as two extra tokens, forcing a retry."""
+
+        def __init__(self):
+            super().__init__()
+            self.encoded = 0
+
+        def encode(self, text):
+            self.encoded += 1
+            return super().encode(text)
+
+        def count_tokens(self, text):
+            return super().count_tokens(text) + (2 if "~" in text and text != "~" else 0)
+
+    tokenizer = MergingTokenizer()
+    template = PromptTemplate(
+        user="{{doc}}",
+        max_tokens=3,
+        tokenizer=tokenizer,
+        truncation=[TruncationPolicy("doc", mode="tail", marker="~")],
+    )
+    assert template.render(doc="a b c d e f")["user"] == "w0~"
+    assert tokenizer.encoded == 1
+
+
+def test_static_text_counted_once():
+    """Test that renders only count variable values."""
+    tokenizer = WordTokenizer()
+    template = PromptTemplate(
+        system="A long static system prompt", user="{{q}}", max_tokens=100, tokenizer=tokenizer
+    )
+    tokenizer.counted.clear()
+    template.render(q="one two")
+    template.render(q="three")
+    assert tokenizer.counted == ["one two", "three"]
+
+
+def test_over_budget_without_policy():
+    """Test that an unfittable render raises TemplateError."""
+    template = PromptTemplate(user="{{x}}", max_tokens=1, tokenizer=WordTokenizer())
+    with pytest.raises(TemplateError, match="max_tokens"):
+        template.render(x="too many words")
+
+
+def test_invalid_policies():
+    """Test validation of truncation configuration."""
+    with pytest.raises(ValidationError, match="not found"):
+        PromptTemplate(user="{{x}}", max_tokens=5, truncation=[TruncationPolicy("y")])
+    with pytest.raises(ValidationError, match="requires max_tokens"):
+        PromptTemplate(user="{{x}}", truncation=[TruncationPolicy("x")])
+    with pytest.raises(ValueError):
+        TruncationPolicy("x", mode="sideways")
+
+
+def test_render_many_fits_each_row():
+    """Test that batch rendering applies the budget per row."""
+    template = PromptTemplate(
+        user="{{x}}",
+        max_tokens=2,
+        tokenizer=WordTokenizer(),
+        truncation=[TruncationPolicy("x", marker="")],
+    )
+    rows = [{"x": "a"}, {"x": "a b c"}]
+    assert [r["user"] for r in template.render_many(rows)] == ["a", "w0 w1"]
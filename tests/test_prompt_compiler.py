@@ -0,0 +1,111 @@
+"""Tests for the extended template compiler."""
+
+import pytest
+
+from aup.errors import TemplateError
+from aup.prompts import ExtendedTemplate
+
+
+def test_substitution_and_attributes():
+    """Test plain and dotted substitution."""
+
+    class User:
+        name = "Ada"
+
+    template = ExtendedTemplate("Hi {{ user.name }}, {{ meta.lang }}")
+    assert template.render(user=User(), meta={"lang": "en"}) == "Hi Ada, en"
+    assert template.variables == {"user", "meta"}
+
+
+def test_conditionals():
+    """Test if/elif/else with undefined names treated as false."""
+    template = ExtendedTemplate(
+        "{% if urgent %}Now{% elif not quiet and polite %}Please{% else %}Later{% endif %}"
+    )
+    assert template.render(urgent=True) == "Now"
+    assert template.render(polite=True) == "Please"
+    assert template.render(polite=True, quiet=True) == "Later"
+    assert template.render() == "Later"
+
+
+def test_conditions_on_missing_fields():
+    """Test that dotted conditions over undefined names or missing fields are false."""
+
+    class User:
+        name = "Ada"
+
+    template = ExtendedTemplate("{% if user.name %}{{ user.name }}{% else %}anon{% endif %}")
+    assert template.render() == "anon"
+    assert template.render(user={}) == "anon"
+    assert template.render(user=object()) == "anon"
+    assert template.render(user=User()) == "Ada"
+    assert ExtendedTemplate("{% if not a.b.c %}none{% endif %}").render(a={}) == "none"
+
+
+def test_loops():
+    """Test loops, loop attributes and nested loop scoping."""
+    template = ExtendedTemplate(
+        "{% for ex in examples %}{{ loop.index }}. {{ ex.q }}"
+        "{% for tag in ex.tags %}[{{ tag }}]{% endfor %}"
+        "{% if not loop.last %}; {% endif %}{% endfor %}"
+    )
+    examples = [{"q": "a", "tags": ["x", "y"]}, {"q": "b", "tags": []}]
+    assert template.render(examples=examples) == "1. a[x][y]; 2. b"
+    assert template.render(examples=iter([])) == ""
+
+
+def test_partials_filters_raw_and_comments():
+    """Test includes, filters, raw blocks and comments."""
+    template = ExtendedTemplate(
+        "{# header #}{% include 'rules' %}{{ text|strip|escape }} "
+        "{{ data|json }} {% raw %}{{ not_a_var }}{% endraw %}",
+        partials={"rules": "Rules for {{ who|upper }}. "},
+    )
+    rendered = template.render(who="bots", text="  <b>  ", data={"k": 1})
+    assert rendered == 'Rules for BOTS. &lt;b&gt; {"k": 1} {{ not_a_var }}'
+
+
+def test_values_are_not_reinterpreted():
+    """Test that substituted values containing tags are output verbatim."""
+    template = ExtendedTemplate("{{ a }}")
+    assert template.render(a="{{ b }}{% if x %}") == "{{ b }}{% if x %}"
+
+
+def test_undefined_variable():
+    """Test that substituting an undefined variable raises."""
+    with pytest.raises(TemplateError, match="Undefined variable 'name'"):
+        ExtendedTemplate("Hi {{ name }}").render()
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        "{% if a %}open",
+        "{% endfor %}",
+        "{% else %}",
+        "{% if a %}{% else %}{% else %}{% endif %}",
+        "{% while a %}",
+        "{{ a|nope }}",
+        "{{ a + b }}",
+        "{% include 'missing' %}",
+        "{% raw %}unterminated",
+    ],
+)
+def test_malformed_templates(source):
+    """Test that malformed templates fail at compile time."""
+    with pytest.raises(TemplateError):
+        ExtendedTemplate(source)
+
+
+def test_recursive_partial():
+    """Test that recursive includes are rejected."""
+    with pytest.raises(TemplateError, match="Recursive"):
+        ExtendedTemplate("{% include 'a' %}", partials={"a": "{% include 'a' %}"})
+
+
+def test_compiled_function_is_cached():
+    """Test that identical sources share one compiled function."""
+    first = ExtendedTemplate("{% for x in xs %}{{ x }}{% endfor %}")
+    second = ExtendedTemplate("{% for x in xs %}{{ x }}{% endfor %}")
+    assert first._function is second._function
+    assert list(first.render_many([{"xs": [1, 2]}, {"xs": ["a"]}])) == ["12", "a"]
@@ -2,8 +2,14 @@
 
 import pytest
 
-from aup.errors import TemplateError, ValidationError
-from aup.prompts import PromptTemplate
+from aup.errors import PrefixCacheWarning, TemplateError, ValidationError
+from aup.prompts import (
+    CompiledTemplate,
+    PromptTemplate,
+    clear_render_cache,
+    render,
+    render_cache_info,
+)
 
 
 def test_basic_template():
@@ -101,3 +107,131 @@ def test_system_only_template():
     messages = template.to_messages()
     assert len(messages) == 1
     assert messages[0]["role"] == "system"
+
+
+def test_compiled_template_segments():
+    """Test that templates are split into literal and variable segments once."""
+    compiled = CompiledTemplate("Hi {{name}}, {{name}} likes {{topic}}.")
+    assert compiled.literals == ("Hi ", ", ", " likes ", ".")
+    assert compiled.names == ("name", "name", "topic")
+    assert compiled.variables == {"name", "topic"}
+    assert compiled.render({"name": "Ada", "topic": "maths"}) == "Hi Ada, Ada likes maths."
+
+
+def test_unsupplied_placeholder_kept():
+    """Test that placeholders without a value are left as-is."""
+    template = PromptTemplate(user="{{greeting}} {{name}}", required_vars=["name"])
+    assert template.render(name="Bob")["user"] == "{{greeting}} Bob"
+
+
+def test_values_not_rescanned():
+    """Test that substituted values are never treated as placeholders."""
+    template = PromptTemplate(user="{{a}} and {{b}}")
+    rendered = template.render(a="{{b}}", b="two")
+    assert rendered["user"] == "{{b}} and two"
+
+
+def test_template_without_variables():
+    """Test rendering a template that has no placeholders."""
+    compiled = CompiledTemplate("static text")
+    assert compiled.render({"unused": "x"}) == "static text"
+
+
+def test_render_reuses_compiled_template():
+    """Test that render() compiles each template string once."""
+    clear_render_cache()
+    assert render("Hello {{name}}", name="A") == "Hello A"
+    assert render("Hello {{name}}", name="B") == "Hello B"
+    info = render_cache_info()
+    assert info.misses == 1
+    assert info.hits == 1
+
+    clear_render_cache()
+    assert render_cache_info().size == 0
+
+
+def test_render_many_rows():
+    """Test rendering a stream of row dicts."""
+    template = PromptTemplate(
+        system="You are a {{role}}",
+        user="Explain {{topic}}",
+        required_vars=["role", "topic"],
+    )
+    rows = iter([{"role": "teacher", "topic": "Python"}, {"role": "poet", "topic": "rain"}])
+    rendered = list(template.render_many(rows))
+    assert rendered == [
+        {"system": "You are a teacher", "user": "Explain Python"},
+        {"system": "You are a poet", "user": "Explain rain"},
+    ]
+
+
+def test_render_many_columns():
+    """Test rendering column-oriented variables."""
+    template = PromptTemplate(user="{{q}} -> {{a}}", required_vars=["q", "a"])
+    columns = {"q": ["1+1", "2+2"], "a": ["2", "4"]}
+    assert [r["user"] for r in template.render_many(columns)] == ["1+1 -> 2", "2+2 -> 4"]
+
+    with pytest.raises(ValidationError, match="same length"):
+        list(template.render_many({"q": ["x"], "a": []}))
+
+
+def test_render_many_validates_each_schema():
+    """Test that a row with a different key set is validated."""
+    template = PromptTemplate(user="Hello {{name}}", required_vars=["name"])
+    rows = [{"name": "A"}, {"name": "B"}, {"other": "C"}]
+    results = template.render_many(rows)
+    assert next(results)["user"] == "Hello A"
+    assert next(results)["user"] == "Hello B"
+    with pytest.raises(ValidationError, match="Row 2: Missing required variables"):
+        next(results)
+
+
+def test_render_many_max_length():
+    """Test that max_length is enforced per row."""
+    template = PromptTemplate(user="{{text}}", max_length=5)
+    with pytest.raises(TemplateError, match="Row 1"):
+        list(template.render_many([{"text": "short"}, {"text": "too long"}]))
+
+
+def test_to_messages_many():
+    """Test streaming rows straight to message lists."""
+    template = PromptTemplate(system="Be brief", user="Explain {{topic}}")
+    messages = list(template.to_messages_many({"topic": ["Python", "Rust"]}))
+    assert messages[1] == [
+        {"role": "system", "content": "Be brief"},
+        {"role": "user", "content": "Explain Rust"},
+    ]
+
+
+def test_analyze_prefix():
+    """Test static-prefix analysis and fingerprint stability."""
+    template = PromptTemplate(system="You are helpful.", user="Context: {{doc}} Answer.")
+    analysis = template.analyze_prefix()
+    assert analysis.prefix == (("system", "You are helpful."), ("user", "Context: "))
+    assert analysis.first_variable == "doc"
+    assert analysis.prefix_chars == len("You are helpful.Context: ")
+    assert len(analysis.fingerprint) == 64
+
+    same = PromptTemplate(system="You are helpful.", user="Context: {{doc}} Question: {{q}}")
+    assert same.analyze_prefix().fingerprint == analysis.fingerprint
+    other = PromptTemplate(system="You are terse.", user="Context: {{doc}}")
+    assert other.analyze_prefix().fingerprint != analysis.fingerprint
+
+
+def test_analyze_prefix_warns_on_early_variable():
+    """Test that a variable ahead of most static text triggers a warning."""
+    template = PromptTemplate(system="Today is {{date}}. " + "Follow these rules. " * 10)
+    with pytest.warns(PrefixCacheWarning, match="date"):
+        analysis = template.analyze_prefix()
+    assert analysis.reuse_ratio < 0.5
+
+
+def test_to_messages_split_prefix():
+    """Test emitting the static prefix as its own leading message."""
+    template = PromptTemplate(system="Be brief.", user="Long instructions. Now: {{q}}")
+    messages = template.to_messages(rendered_vars={"q": "why?"}, split_prefix=True)
+    assert messages == [
+        {"role": "system", "content": "Be brief."},
+        {"role": "user", "content": "Long instructions. Now: "},
+        {"role": "user", "content": "why?"},
+    ]
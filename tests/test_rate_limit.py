@@ -0,0 +1,86 @@
+"""Tests for token-bucket rate limiting."""
+
+import asyncio
+import time
+
+import pytest
+
+from aup.retries import RateLimiter, RateLimits
+
+
+def test_requests_per_minute():
+    """Test that the request bucket admits a minute's allowance then blocks."""
+    limiter = RateLimiter({"m": RateLimits(requests_per_minute=2)})
+    assert limiter.try_acquire("m") is not None
+    assert limiter.try_acquire("m") is not None
+    assert limiter.try_acquire("m") is None
+
+
+def test_tokens_estimated_from_messages():
+    """Test that the token cost is pre-charged from an estimate."""
+    limiter = RateLimiter({"m": RateLimits(tokens_per_minute=100)})
+    messages = [{"role": "user", "content": "x" * 200}]
+    reservation = limiter.try_acquire("m", messages)
+    assert reservation is not None
+    assert reservation.tokens == 50
+    assert limiter.try_acquire("m", tokens=60) is None
+
+
+def test_reconcile_refunds_unused_tokens():
+    """Test that reconciling with lower actual usage frees capacity."""
+    limiter = RateLimiter({"m": RateLimits(tokens_per_minute=100)})
+    reservation = limiter.try_acquire("m", tokens=100)
+    assert limiter.try_acquire("m", tokens=50) is None
+    reservation.reconcile(40)
+    assert limiter.try_acquire("m", tokens=50) is not None
+
+
+def test_blocking_acquire_waits_for_refill():
+    """Test that acquire waits for the bucket to refill."""
+    limiter = RateLimiter({"m": RateLimits(requests_per_minute=600)})  # 10 per second
+    for _ in range(600):
+        limiter.acquire("m")
+    start = time.monotonic()
+    limiter.acquire("m")
+    assert time.monotonic() - start >= 0.05
+
+
+def test_acquire_timeout():
+    """Test that acquire raises when the wait exceeds the timeout."""
+    limiter = RateLimiter({"m": RateLimits(requests_per_minute=1)})
+    limiter.acquire("m")
+    with pytest.raises(TimeoutError):
+        limiter.acquire("m", timeout=0.01)
+    assert limiter.queue_depth("m") == 0
+
+
+def test_async_acquire_in_order():
+    """Test that async waiters are admitted in arrival order."""
+    limiter = RateLimiter({"m": RateLimits(requests_per_minute=1200)})  # 20 per second
+    for _ in range(1200):
+        limiter.acquire("m")
+    order = []
+
+    async def call(i):
+        await limiter.acquire_async("m")
+        order.append(i)
+
+    async def main():
+        await asyncio.gather(*(call(i) for i in range(3)))
+
+    asyncio.run(main())
+    assert order == [0, 1, 2]
+
+
+def test_unknown_model():
+    """Test error for models without configured limits."""
+    limiter = RateLimiter({"m": RateLimits(requests_per_minute=1)})
+    with pytest.raises(ValueError, match="No rate limits"):
+        limiter.acquire("other")
+
+
+def test_default_limits():
+    """Test that default limits apply to unlisted models."""
+    limiter = RateLimiter({}, default=RateLimits(requests_per_minute=1))
+    assert limiter.try_acquire("any") is not None
+    assert limiter.try_acquire("any") is None
@@ -0,0 +1,177 @@
+"""Tests for concurrent batch retry functionality."""
+
+import threading
+import time
+
+import pytest
+
+from aup.retries import with_retry_many
+
+
+def test_all_items_succeed():
+    """Test that every item is yielded exactly once."""
+    funcs = [lambda i=i: i * 2 for i in range(20)]
+    results = list(with_retry_many(funcs, max_workers=4, retries=0))
+    assert sorted(r.index for r in results) == list(range(20))
+    assert all(r.ok and r.value == r.index * 2 for r in results)
+
+
+def test_ordered_mode():
+    """Test that ordered mode yields results in input order."""
+
+    def make(i):
+        def func():
+            time.sleep(0.001 * (10 - i))
+            return i
+
+        return func
+
+    results = list(with_retry_many([make(i) for i in range(10)], max_workers=5, ordered=True))
+    assert [r.value for r in results] == list(range(10))
+
+
+def test_per_item_retry():
+    """Test that flaky items are retried independently."""
+    attempts = [0, 0]
+
+    def flaky(i):
+        def func():
+            attempts[i] += 1
+            if attempts[i] < 3:
+                raise ConnectionError("flaky")
+            return "ok"
+
+        return func
+
+    results = list(with_retry_many([flaky(0), flaky(1)], retries=3, backoff=0.01, jitter=False))
+    assert all(r.ok for r in results)
+    assert all(r.attempts == 3 for r in results)
+    assert attempts == [3, 3]
+
+
+def test_partial_failure():
+    """Test that permanent failures are reported without stopping the batch."""
+
+    def fail():
+        raise ValueError("broken")
+
+    funcs = [lambda: "a", fail, lambda: "c"]
+    results = list(with_retry_many(funcs, retries=1, backoff=0.01, ordered=True))
+    assert [r.ok for r in results] == [True, False, True]
+    assert isinstance(results[1].error, ValueError)
+    assert results[1].attempts == 2
+
+
+def test_non_retryable_error_not_retried():
+    """Test that errors outside retry_on fail immediately."""
+
+    def fail():
+        raise ValueError("broken")
+
+    (result,) = with_retry_many([fail], retries=3, backoff=0.01, retry_on=(ConnectionError,))
+    assert result.attempts == 1
+
+
+def test_fail_fast():
+    """Test that fail_fast raises the first permanent error."""
+
+    def fail():
+        raise ValueError("broken")
+
+    with pytest.raises(ValueError, match="broken"):
+        list(with_retry_many([fail], retries=0, fail_fast=True))
+
+
+def test_backoff_does_not_block_workers():
+    """Test that a single worker keeps running other items during a backoff."""
+    order = []
+    failed = [False]
+
+    def slow_retry():
+        if not failed[0]:
+            failed[0] = True
+            raise ConnectionError("retry me")
+        order.append("retried")
+        return "retried"
+
+    def quick(i):
+        def func():
+            order.append(i)
+            return i
+
+        return func
+
+    funcs = [slow_retry] + [quick(i) for i in range(3)]
+    results = list(with_retry_many(funcs, max_workers=1, backoff=0.05, jitter=False))
+    assert len(results) == 4
+    assert order == [0, 1, 2, "retried"]
+
+
+def test_close_cancels_remaining_items():
+    """Test that closing the iterator stops new items from starting."""
+    started = []
+
+    def make(i):
+        def func():
+            started.append(i)
+            time.sleep(0.01)
+            return i
+
+        return func
+
+    iterator = with_retry_many((make(i) for i in range(100)), max_workers=2)
+    next(iterator)
+    iterator.close()
+    count = len(started)
+    time.sleep(0.05)
+    assert len(started) == count < 100
+
+
+def test_cancel_event_reports_waiting_retries():
+    """Test that a cancel event reports items waiting on backoff as failures."""
+    cancel = threading.Event()
+
+    def fail():
+        cancel.set()
+        raise ConnectionError("down")
+
+    (result,) = with_retry_many([fail], retries=5, backoff=10.0, cancel_event=cancel)
+    assert isinstance(result.error, ConnectionError)
+    assert result.attempts == 1
+
+
+def test_invalid_max_workers():
+    """Test error with invalid max_workers."""
+    with pytest.raises(ValueError, match="max_workers"):
+        with_retry_many([], max_workers=0)
+
+
+@pytest.mark.parametrize("max_workers", [1, 4])
+def test_raising_on_retry_fails_item(max_workers):
+    """Test that an on_retry callback that raises fails its item without hanging."""
+
+    def flaky():
+        raise ConnectionError("flaky")
+
+    def on_retry(error, attempt):
+        raise RuntimeError("callback broke")
+
+    funcs = [flaky, lambda: "b", flaky]
+    results = list(
+        with_retry_many(funcs, max_workers=max_workers, retries=2, on_retry=on_retry, ordered=True)
+    )
+    assert [r.index for r in results] == [0, 1, 2]
+    assert [r.ok for r in results] == [False, True, False]
+    assert isinstance(results[0].error, RuntimeError)
+    assert results[0].attempts == 1
+
+
+def test_base_exception_reaches_consumer():
+    """Test that a BaseException in an item stops the batch and is re-raised."""
+
+    def interrupt():
+        raise KeyboardInterrupt
+
+    funcs = [interrupt] + [lambda: "x"] * 5
+    with pytest.raises(KeyboardInterrupt):
+        list(with_retry_many(funcs, max_workers=2, retries=0))
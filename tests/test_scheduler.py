@@ -0,0 +1,137 @@
+"""Tests for the priority- and tenant-fair scheduler."""
+
+import threading
+import time
+
+import pytest
+
+from aup.errors import DeadlineExceededError
+from aup.models import FairScheduler
+
+MESSAGES = [{"role": "user", "content": "Hello"}]
+
+
+def blocked_scheduler(**kwargs):
+    """Scheduler with one worker held busy until the returned event is set."""
+    scheduler = FairScheduler(max_concurrency=1, **kwargs)
+    release = threading.Event()
+    started = threading.Event()
+
+    def gate(messages):
+        started.set()
+        release.wait()
+        return "gate"
+
+    scheduler.submit(gate, MESSAGES)
+    started.wait()
+    return scheduler, release
+
+
+def recorder(order, label):
+    def call(messages):
+        order.append(label)
+        return label
+
+    return call
+
+
+def test_weighted_priority_dispatch():
+    """Test that the heavier class gets proportionally more dispatch slots."""
+    scheduler, release = blocked_scheduler(weights={"interactive": 3, "batch": 1})
+    order = []
+    futures = [
+        scheduler.submit(recorder(order, "batch"), MESSAGES, priority="batch") for _ in range(4)
+    ]
+    futures += [scheduler.submit(recorder(order, "interactive"), MESSAGES) for _ in range(6)]
+    release.set()
+    for future in futures:
+        future.result()
+    scheduler.close()
+
+    assert order[:4].count("interactive") == 3
+    assert order.count("batch") == 4
+
+
+def test_tenants_take_turns():
+    """Test round robin between tenants of the same class."""
+    scheduler, release = blocked_scheduler()
+    order = []
+    futures = [scheduler.submit(recorder(order, "a"), MESSAGES, tenant="a") for _ in range(3)]
+    futures += [scheduler.submit(recorder(order, "b"), MESSAGES, tenant="b") for _ in range(3)]
+    release.set()
+    for future in futures:
+        future.result()
+    scheduler.close()
+
+    assert order == ["a", "b", "a", "b", "a", "b"]
+
+
+def test_expired_calls_are_dropped():
+    """Test that calls past their deadline never run."""
+    scheduler, release = blocked_scheduler()
+    calls = []
+    future = scheduler.submit(recorder(calls, "late"), MESSAGES, timeout=0.01)
+    time.sleep(0.02)
+    release.set()
+    with pytest.raises(DeadlineExceededError):
+        future.result()
+    scheduler.close()
+
+    assert calls == []
+    assert scheduler.stats().expired == 1
+
+
+def test_scheduled_call_fails_on_deadline():
+    """Test that a blocked scheduled() caller fails when its deadline passes."""
+    scheduler, release = blocked_scheduler()
+    calls = []
+    scheduled = scheduler.scheduled(recorder(calls, "late"), timeout=0.05)
+    start = time.monotonic()
+    with pytest.raises(DeadlineExceededError):
+        scheduled(MESSAGES)
+    assert time.monotonic() - start < 1.0
+    release.set()
+    scheduler.close()
+
+    assert calls == []
+    assert scheduler.stats().expired == 1
+
+
+def test_concurrency_cap_and_wait_metric():
+    """Test the global concurrency cap and queue wait metrics."""
+    active = [0]
+    peak = [0]
+    lock = threading.Lock()
+
+    def slow(messages):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.01)
+        with lock:
+            active[0] -= 1
+        return "ok"
+
+    with FairScheduler(max_concurrency=2) as scheduler:
+        call = scheduler.scheduled(slow, priority="batch")
+        threads = [threading.Thread(target=call, args=(MESSAGES,)) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        stats = scheduler.stats()
+
+    assert peak[0] == 2
+    assert stats.dispatched == 6
+    assert stats.max_wait["batch"] > 0
+
+
+def test_errors_propagate():
+    """Test that call errors reach the caller."""
+
+    def fail(messages):
+        raise ConnectionError("down")
+
+    with FairScheduler() as scheduler:
+        with pytest.raises(ConnectionError):
+            scheduler.scheduled(fail)(MESSAGES)
@@ -0,0 +1,133 @@
+"""Tests for semantic response caching."""
+
+import threading
+
+import pytest
+
+from aup.errors import ValidationError
+from aup.models import SemanticCache, SemanticCachedCall
+from aup.models.semantic_cache import IVFIndex
+
+VOCAB = ["refund", "password", "shipping", "order", "reset", "cancel", "track", "account"]
+
+
+def bag_of_words(text):
+    """Tiny deterministic embedder: word counts over a fixed vocabulary."""
+    words = text.lower().replace("?", "").split()
+    return [float(words.count(w)) for w in VOCAB]
+
+
+def user(text):
+    return [{"role": "system", "content": "Support bot"}, {"role": "user", "content": text}]
+
+
+def test_paraphrase_hits():
+    """Test that a similar question reuses the cached response."""
+    calls = []
+
+    def call(messages):
+        calls.append(messages)
+        return f"answer {len(calls)}"
+
+    cached = SemanticCachedCall(call, SemanticCache(bag_of_words, threshold=0.9))
+    assert cached(user("How do I reset my password?")) == "answer 1"
+    assert cached(user("password reset how?")) == "answer 1"
+    assert cached(user("Where is my shipping order?")) == "answer 2"
+    assert len(calls) == 2
+    assert cached.cache.stats().hits == 1
+
+
+def test_threshold_miss():
+    """Test that dissimilar text misses."""
+    cache = SemanticCache(bag_of_words, threshold=0.95)
+    cache.add("reset password", "a")
+    assert cache.lookup("reset account") is None
+
+
+def test_lru_eviction():
+    """Test that the least recently used entry is evicted."""
+    cache = SemanticCache(bag_of_words, threshold=0.99, max_entries=2)
+    cache.add("refund", "1")
+    cache.add("password", "2")
+    cache.lookup("refund")
+    cache.add("shipping", "3")
+    assert cache.lookup("password") is None
+    assert cache.lookup("refund") == "1"
+    assert cache.stats().evictions == 1
+
+
+def test_switches_to_ivf_index():
+    """Test that large caches use the IVF index and still find exact matches."""
+    cache = SemanticCache(bag_of_words, threshold=0.99, ivf_threshold=20, nprobe=8)
+    texts = [" ".join(VOCAB[i % 8] for i in range(n, n + 1 + n % 3)) for n in range(40)]
+    for i, text in enumerate(texts):
+        cache.add(text, str(i))
+    cache.wait_for_index()
+    assert cache.stats().index == "ivf"
+    assert cache.lookup("refund") is not None
+
+
+def test_ivf_trained_in_background(monkeypatch):
+    """Test that the flat index keeps serving while the IVF index trains."""
+    release = threading.Event()
+    train = IVFIndex.train
+
+    def slow_train(self, vectors, iterations=10):
+        release.wait(5)
+        train(self, vectors, iterations)
+
+    monkeypatch.setattr(IVFIndex, "train", slow_train)
+    cache = SemanticCache(bag_of_words, threshold=0.99, max_entries=25, ivf_threshold=20)
+    for i in range(20):
+        cache.add(" ".join(VOCAB[: 1 + i % 7]) + " x" * i, str(i))
+    # Training is blocked; inserts and evictions still go to the flat index
+    cache.add("track", "track")
+    for i in range(5):
+        cache.add("cancel " * (i + 2), str(i))
+    assert cache.stats().index == "flat"
+    assert cache.lookup("track") == "track"
+
+    release.set()
+    cache.wait_for_index()
+    assert cache.stats().index == "ivf"
+    assert cache.lookup("track") == "track"
+    assert len(cache) == 25
+
+
+def test_save_and_load(tmp_path):
+    """Test persisting the cache to disk."""
+    cache = SemanticCache(bag_of_words, threshold=0.9)
+    cache.add("reset password", "a")
+    cache.add("track order", "b")
+    cache.save(tmp_path / "semantic")
+
+    restored = SemanticCache(bag_of_words, threshold=0.9)
+    restored.load(tmp_path / "semantic")
+    assert len(restored) == 2
+    assert restored.lookup("order track") == "b"
+
+
+def test_save_appends_extensions(tmp_path):
+    """Test that saving keeps the caller's suffix, so versioned paths don't collide."""
+    for version, response in (("v1", "a"), ("v2", "b")):
+        cache = SemanticCache(bag_of_words)
+        cache.add("reset password", response)
+        cache.save(tmp_path / f"cache.{version}")
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "cache.v1.f32",
+        "cache.v1.json",
+        "cache.v2.f32",
+        "cache.v2.json",
+    ]
+    restored = SemanticCache(bag_of_words)
+    restored.load(tmp_path / "cache.v1")
+    assert restored.lookup("reset password") == "a"
+
+
+def test_dimension_mismatch():
+    """Test error when the embedder changes dimension."""
+    dims = iter([3, 4])
+    cache = SemanticCache(lambda text: [1.0] * next(dims))
+    cache.add("a", "1")
+    with pytest.raises(ValidationError, match="dimension"):
+        cache.lookup("b")
@@ -0,0 +1,235 @@
+"""Tests for the lightweight helpers of the SHAP experiment module."""
+
+import concurrent.futures
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from aup.prompts import abc
+
+
+class FakeTokenizer:
+    """Word-level tokenizer recording how often it is called."""
+
+    model_max_length = 3
+
+    def __init__(self):
+        self.batch_calls = 0
+        self.encoded = 0
+
+    def __call__(self, texts, truncation, max_length):
+        self.batch_calls += 1
+        self.encoded += len(texts)
+        return {"input_ids": [text.split()[:max_length] for text in texts]}
+
+    def batch_decode(self, ids, skip_special_tokens):
+        return [" ".join(words) for words in ids]
+
+
+class FakeClassifier:
+    def __init__(self):
+        self.tokenizer = FakeTokenizer()
+
+
+def test_lru_cache():
+    cache = abc.LRUCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+    assert len(cache) == 2
+
+
+def test_prep_texts_batches_and_memoizes():
+    clf = FakeClassifier()
+    memo = abc.LRUCache(100)
+    texts = ["  one two three four ", None, "", "a b", "a b"]
+    assert abc.prep_texts(clf, texts, memo) == ["one two three", "a b", "a b"]
+    assert clf.tokenizer.batch_calls == 1
+    assert clf.tokenizer.encoded == 2
+    assert memo.stats()["misses"] == 2
+
+    assert abc.prep_texts(clf, ["a b", "c"], memo) == ["a b", "c"]
+    assert clf.tokenizer.encoded == 3
+    assert abc.prep_texts(clf, ["a b", "c"], memo) == ["a b", "c"]
+    assert clf.tokenizer.batch_calls == 2
+
+
+def test_prep_texts_without_memo():
+    clf = FakeClassifier()
+    assert abc.prep_texts(clf, ["x y z w", " "]) == ["x y z"]
+    assert clf.tokenizer.batch_calls == 1
+
+
+def test_cached_predict_proba():
+    np = pytest.importorskip("numpy")
+
+    class Pipeline(FakeClassifier):
+        def __init__(self):
+            super().__init__()
+            self.seen: list[str] = []
+
+        def __call__(self, texts, truncation):
+            self.seen.extend(texts)
+            return [
+                [
+                    {"label": "NEGATIVE", "score": 1 - len(t) / 10},
+                    {"label": "POSITIVE", "score": len(t) / 10},
+                ]
+                for t in texts
+            ]
+
+    clf = Pipeline()
+    cache = abc.LRUCache(10)
+    probs = abc.cached_predict_proba(clf, ["ab", "abcd", "ab"], cache)
+    assert np.allclose(probs[:, 1], [0.2, 0.4, 0.2])
+    assert clf.seen == ["ab", "abcd"]
+    # The repeated "ab" is one lookup, not two misses
+    assert cache.stats()["misses"] == 2
+
+    probs = abc.cached_predict_proba(clf, ["abcd", "a"], cache)
+    assert np.allclose(probs[:, 1], [0.4, 0.1])
+    assert clf.seen == ["ab", "abcd", "a"]
+
+
+def test_run_global_stability_checkpoints_and_resume(tmp_path, monkeypatch):
+    explained: list[str] = []
+    loads: list[str] = []
+    datasets = [abc.DatasetBundle(name, [name], [1]) for name in ("twitter", "imdb", "amazon")]
+
+    monkeypatch.setattr(abc, "load_datasets", lambda n_per_class, seed: datasets)
+    monkeypatch.setattr(
+        abc, "build_classifier", lambda model, device: loads.append(model) or FakeClassifier()
+    )
+    monkeypatch.setattr(abc, "build_global_explainer", lambda clf, memo, cache: None)
+    monkeypatch.setattr(abc, "spearman_corr", lambda a, b: 0.0)
+
+    def fake_scores(explainer, texts, max_samples):
+        explained.append(texts[0])
+        return {texts[0]: 1.0, "shared": 0.5}
+
+    monkeypatch.setattr(abc, "global_shap_scores", fake_scores)
+
+    out = abc.run_global_stability(checkpoint_dir=tmp_path)
+    assert explained == ["twitter", "imdb", "amazon"]
+    assert len(loads) == 1
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["amazon.pkl", "imdb.pkl", "twitter.pkl"]
+    assert out["summary"]["jaccard@100"]["twitter-imdb"] == 1 / 3
+    assert set(out["summary"]["cache"]) == {"twitter", "imdb", "amazon"}
+    # Stats are per dataset, not cumulative for the worker
+    assert [
+        out["summary"]["cache"][name]["prep"]["misses"] for name in out["summary"]["cache"]
+    ] == [1, 1, 1]
+
+    (tmp_path / "imdb.pkl").unlink()
+    explained.clear()
+    resumed = abc.run_global_stability(checkpoint_dir=tmp_path, resume=True)
+    assert explained == ["imdb"]
+    assert resumed["global_shap"] == out["global_shap"]
+
+    # Checkpoints from other settings are not reused
+    explained.clear()
+    abc.run_global_stability(checkpoint_dir=tmp_path, resume=True, max_samples=5)
+    assert explained == ["twitter", "imdb", "amazon"]
+
+
+class ThreadPool(ThreadPoolExecutor):
+    """Stand-in for ProcessPoolExecutor that runs jobs on threads."""
+
+    def __init__(self, max_workers, mp_context, initializer, initargs):
+        super().__init__(max_workers, initializer=initializer, initargs=initargs)
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_run_global_stability_failure_keeps_checkpoints(tmp_path, monkeypatch, workers):
+    datasets = [abc.DatasetBundle(name, [name], [1]) for name in ("twitter", "imdb", "amazon")]
+    monkeypatch.setattr(abc, "load_datasets", lambda n_per_class, seed: datasets)
+    monkeypatch.setattr(abc, "build_classifier", lambda model, device: FakeClassifier())
+    monkeypatch.setattr(abc, "build_global_explainer", lambda clf, memo, cache: None)
+    monkeypatch.setattr(concurrent.futures, "ProcessPoolExecutor", ThreadPool)
+
+    def fake_scores(explainer, texts, max_samples):
+        if texts[0] == "amazon":
+            raise RuntimeError("explainer failed")
+        return {texts[0]: 1.0}
+
+    monkeypatch.setattr(abc, "global_shap_scores", fake_scores)
+
+    with pytest.raises(RuntimeError, match="explainer failed"):
+        abc.run_global_stability(checkpoint_dir=tmp_path, workers=workers)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["imdb.pkl", "twitter.pkl"]
+    if workers == 1:
+        assert abc._WORKER == {}
+
+
+def test_token_score_accumulator_matches_per_token_mean():
+    np = pytest.importorskip("numpy")
+
+    class Explanation:
+        def __init__(self, data, values):
+            self.data = np.array(data, dtype=object)
+            self.values = np.array(values)
+
+    batches = [
+        [Explanation(["Good", " ", "movie", 3], [[0.5], [9.0], [-0.25], [9.0]])],
+        [Explanation(["good", "plot"], [-1.5, 2.0]), Explanation(["MOVIE"], [0.75])],
+    ]
+
+    class Explainer:
+        def __init__(self):
+            self.calls = 0
+
+        def __call__(self, texts):
+            self.calls += 1
+            return batches[self.calls - 1]
+
+    explainer = Explainer()
+    scores = abc.global_shap_scores(explainer, ["a", "b", "c", "d"], max_samples=3, batch_size=2)
+    assert explainer.calls == 2
+    assert scores == pytest.approx({"good": 1.0, "movie": 0.5, "plot": 2.0})
+
+    acc = abc.TokenScoreAccumulator(capacity=1)
+    acc.add([f"t{i}" for i in range(10)], np.arange(10.0))
+    acc.add(["t9"], [1.0])
+    assert acc.means()["t9"] == pytest.approx(5.0)
+
+
+def test_columnar_artifacts_round_trip(tmp_path):
+    pytest.importorskip("numpy")
+
+    artifacts = {
+        "global_shap": {
+            "twitter": {"good": 0.9, "bad": 0.8, "meh": 0.1, "okay": 0.8},
+            "imdb": {"plot": 0.5},
+        },
+        "summary": {"jaccard@100": {"twitter-imdb": 0.0}},
+    }
+    abc.save_artifacts(artifacts, tmp_path / "run")
+
+    loaded = abc.load_artifacts(tmp_path / "run")
+    assert list(loaded) == ["twitter", "imdb"]
+    assert loaded.summary == artifacts["summary"]
+
+    twitter = loaded["twitter"]
+    assert dict(twitter) == pytest.approx(artifacts["global_shap"]["twitter"])
+    assert "meh" in twitter and "plot" not in twitter
+    assert abc.top_k_tokens(twitter, 3) == abc.top_k_tokens(artifacts["global_shap"]["twitter"], 3)
+    assert abc.top_k_tokens(twitter, 3) == ["good", "bad", "okay"]
+    with pytest.raises(KeyError):
+        loaded["amazon"]
+
+
+def test_top_k_ties_at_boundary_match_dict_path(tmp_path):
+    pytest.importorskip("numpy")
+
+    rng = random.Random(0)
+    for trial in range(50):
+        scores = {f"t{i}": float(rng.randint(0, 3)) for i in range(30)}
+        abc.save_artifacts({"global_shap": {"d": scores}, "summary": {}}, tmp_path / str(trial))
+        columnar = abc.load_artifacts(tmp_path / str(trial))["d"]
+        for k in (1, 5, 12, 30):
+            assert abc.top_k_tokens(columnar, k) == abc.top_k_tokens(scores, k)
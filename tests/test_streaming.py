@@ -0,0 +1,100 @@
+"""Tests for streaming provider calls."""
+
+import asyncio
+import time
+
+import pytest
+
+from aup.models import (
+    acall_to_stream,
+    astream_to_call,
+    call_to_stream,
+    call_with_client,
+    instrument_stream,
+    instrument_stream_async,
+    stream_to_call,
+)
+
+MESSAGES = [{"role": "user", "content": "Hello"}]
+
+
+def fake_stream(messages):
+    for delta in ["Hel", "", "lo", " world"]:
+        time.sleep(0.005)
+        yield delta
+
+
+async def fake_async_stream(messages):
+    for delta in ["Hel", "lo"]:
+        await asyncio.sleep(0.005)
+        yield delta
+
+
+def test_instrument_stream_timings():
+    """Test time-to-first-token and inter-token measurements."""
+    timings = []
+    stream = instrument_stream(fake_stream, timings.append)
+    assert list(stream(MESSAGES)) == ["Hel", "", "lo", " world"]
+
+    (t,) = timings
+    assert t.chunks == 3
+    assert t.chars == len("Hello world")
+    assert t.time_to_first_token >= 0.005
+    assert len(t.inter_token_latencies) == 2
+    assert t.total_time >= t.time_to_first_token
+    assert t.error is None
+
+
+def test_instrument_stream_records_errors():
+    """Test that a failing stream reports its error."""
+
+    def broken(messages):
+        yield "a"
+        raise ConnectionError("dropped")
+
+    timings = []
+    with pytest.raises(ConnectionError):
+        list(instrument_stream(broken, timings.append)(MESSAGES))
+    assert isinstance(timings[0].error, ConnectionError)
+
+
+def test_instrument_stream_early_close():
+    """Test that closing the stream early still reports timings."""
+    timings = []
+    stream = instrument_stream(fake_stream, timings.append)(MESSAGES)
+    next(stream)
+    stream.close()
+    assert timings[0].chunks == 1
+    assert timings[0].error is None
+
+
+def test_instrument_stream_async():
+    """Test async stream instrumentation."""
+    timings = []
+    stream = instrument_stream_async(fake_async_stream, timings.append)
+
+    async def main():
+        return [delta async for delta in stream(MESSAGES)]
+
+    assert asyncio.run(main()) == ["Hel", "lo"]
+    assert timings[0].time_to_first_token is not None
+
+
+def test_stream_adapters():
+    """Test conversion between streaming and plain calls."""
+    assert call_with_client(stream_to_call(fake_stream), MESSAGES) == "Hello world"
+    assert list(call_to_stream(lambda m: "full")(MESSAGES)) == ["full"]
+
+
+def test_async_stream_adapters():
+    """Test conversion between async streaming and async plain calls."""
+
+    async def full(messages):
+        return "full"
+
+    async def main():
+        joined = await astream_to_call(fake_async_stream)(MESSAGES)
+        streamed = [d async for d in acall_to_stream(full)(MESSAGES)]
+        return joined, streamed
+
+    assert asyncio.run(main()) == ("Hello", ["full"])
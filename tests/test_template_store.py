@@ -0,0 +1,89 @@
+"""Tests for the directory-backed template store."""
+
+import json
+import os
+import time
+
+import pytest
+
+from aup.errors import TemplateError
+from aup.prompts import TemplateStore
+
+
+def write(path, content, mtime=None):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content, encoding="utf-8")
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+
+
+@pytest.fixture
+def prompts(tmp_path):
+    write(tmp_path / "greeting.txt", "Hello {{name}}", mtime=1000)
+    write(
+        tmp_path / "support" / "triage.json",
+        json.dumps(
+            {"system": "You triage tickets.", "user": "{{ticket}}", "required_vars": ["ticket"]}
+        ),
+        mtime=1000,
+    )
+    write(tmp_path / "notes.md", "ignored")
+    return tmp_path
+
+
+def test_loads_directory(prompts):
+    """Test that txt and json templates are loaded by relative name."""
+    store = TemplateStore(prompts)
+    assert list(store) == ["greeting", "support/triage"]
+    assert store["greeting"].render(name="Ada")["user"] == "Hello Ada"
+    assert store.get("support/triage").render(ticket="Help")["system"] == "You triage tickets."
+    assert "notes" not in store
+
+
+def test_reload_only_changed(prompts):
+    """Test that reload recompiles only changed, new and removed files."""
+    store = TemplateStore(prompts)
+    triage = store["support/triage"]
+
+    write(prompts / "greeting.txt", "Hi {{name}}!", mtime=2000)
+    write(prompts / "farewell.txt", "Bye", mtime=2000)
+    assert store.reload() == ["farewell", "greeting"]
+    assert store["greeting"].render(name="Bo")["user"] == "Hi Bo!"
+    assert store["support/triage"] is triage
+    assert store.reload() == []
+
+    (prompts / "farewell.txt").unlink()
+    assert store.reload() == ["farewell"]
+    assert "farewell" not in store
+
+
+def test_bad_edit_keeps_previous_version(prompts):
+    """Test that a file failing on reload keeps serving its old version."""
+    store = TemplateStore(prompts)
+    write(prompts / "support" / "triage.json", "{not json", mtime=2000)
+    assert store.reload() == []
+    assert store["support/triage"].render(ticket="x")["user"] == "x"
+    assert "support/triage" in store.errors
+
+    write(prompts / "support" / "triage.json", json.dumps({"user": "T: {{ticket}}"}), mtime=3000)
+    assert store.reload() == ["support/triage"]
+    assert store.errors == {}
+
+
+def test_invalid_on_initial_load(tmp_path):
+    """Test that invalid templates fail the initial load."""
+    write(tmp_path / "bad.json", json.dumps({"user": "x", "colour": "red"}))
+    with pytest.raises(TemplateError, match="unknown keys"):
+        TemplateStore(tmp_path)
+    with pytest.raises(TemplateError, match="not found"):
+        TemplateStore(tmp_path / "missing")
+
+
+def test_background_polling(prompts):
+    """Test that start() picks up changes without explicit reloads."""
+    with TemplateStore(prompts).start(interval=0.01) as store:
+        write(prompts / "greeting.txt", "Yo {{name}}", mtime=5000)
+        deadline = time.monotonic() + 2
+        while store["greeting"].render(name="A")["user"] != "Yo A":
+            assert time.monotonic() < deadline
+            time.sleep(0.01)